@@ -0,0 +1,211 @@
+import numpy as np
+import sympy as sp
+import sys
+import time
+
+try:
+    import numexpr
+except ImportError:
+    numexpr = None
+
+# Curve parameter and the angular frequency used by the circular-motion cells
+t = sp.Symbol('t', real=True)
+omega = sp.Symbol('omega', real=True)
+
+# Vector-valued curves worked through in sample.ipynb, as component tuples
+NOTEBOOK_CURVES = {
+    "sec_tan": (sp.sec(t), sp.tan(t)),
+    "exp_log": (sp.exp(-t) * sp.cos(t), sp.exp(-t) * sp.sin(t), sp.log(sp.Abs(t))),
+    "sin_cos": (t, 2 * sp.sin(t), 3 * sp.cos(t)),
+    "circle": (sp.cos(omega * t), sp.sin(omega * t)),
+    "helix": (2 * sp.sin(3 * t), 2 * sp.cos(3 * t), 8 * t),
+    "integrand": (sp.cos(2 * t), sp.sin(2 * t), t * sp.sin(t)),
+}
+
+# Parameters besides t that each notebook curve takes, in call order
+NOTEBOOK_PARAMETERS = {"circle": (omega,)}
+
+# Expressions a kernel is compiled for; speed is a scalar, the rest vectors
+KERNELS = ("position", "velocity", "acceleration", "jerk", "speed", "tangent")
+
+
+def curve_variable(components, parameters=(), variable=None):
+    """
+    The curve parameter of components: variable if given, else the one free
+    symbol that is not a parameter.
+    """
+    if variable is not None:
+        return variable
+    free = set().union(*(sp.sympify(c).free_symbols for c in components)) - set(parameters)
+    if len(free) != 1:
+        raise ValueError(f"Cannot tell the curve parameter from {sorted(map(str, free))}; pass variable")
+    return free.pop()
+
+
+def as_real(components, variable):
+    """Components with variable replaced by a real symbol of the same name, so |t| differentiates to sign(t)"""
+    real = sp.Symbol(variable.name, real=True)
+    return tuple(sp.sympify(c).subs(variable, real) for c in components), real
+
+
+def _numexpr_ready(expression):
+    # numexpr has no sec/csc/cot or sign, so spell them with what it has
+    expression = expression.replace(sp.sec, lambda x: 1 / sp.cos(x)).replace(
+        sp.csc, lambda x: 1 / sp.sin(x)).replace(sp.cot, lambda x: sp.cos(x) / sp.sin(x))
+    return expression.replace(sp.sign, lambda x: sp.Piecewise((1, x > 0), (-1, x < 0), (0, True)))
+
+
+def _compile(expressions, arguments, backend):
+    """
+    One callable per expression returning an array or scalar.
+
+    The NumPy backend compiles all expressions together with common
+    subexpressions shared; numexpr gets one evaluate() per expression.
+    """
+    if backend == "numexpr":
+        return [sp.lambdify(arguments, _numexpr_ready(e), modules="numexpr") for e in expressions]
+    return sp.lambdify(arguments, list(expressions), modules="numpy", cse=True)
+
+
+class CurveKernel:
+    """
+    Vectorized NumPy evaluation of a curve and the quantities derived from it.
+
+    The derivatives r'(t), r''(t) and r'''(t), the speed |r'(t)| and the
+    unit tangent T(t) = r'(t) / |r'(t)| are derived symbolically once, then
+    lambdified into code that takes a whole array of t values per call
+    instead of one .subs() per point. Vector results are contiguous (n, dim) arrays and the
+    speed is an (n,) array; constant components are broadcast to n rows.
+
+    Parameters:
+    - components: SymPy expressions of the curve's components
+    - parameters: Other symbols the components use, e.g. omega; their values
+      follow the t array in every call, in this order (default: ())
+    - variable: The curve parameter; found from the components when there is
+      only one free symbol besides the parameters (default: None)
+    - backend: "numpy", "numexpr", or "auto" for numexpr when it is installed (default: "numpy")
+    """
+
+    def __init__(self, components, parameters=(), variable=None, backend="numpy"):
+        variable = curve_variable(components, parameters, variable)
+        self.components, self.variable = as_real(components, variable)
+        self.parameters = tuple(parameters)
+        self.dim = len(self.components)
+
+        if backend == "auto":
+            backend = "numexpr" if numexpr is not None else "numpy"
+        if backend == "numexpr" and numexpr is None:
+            print("numexpr is not installed; using the NumPy backend")
+            backend = "numpy"
+        self.backend = backend
+
+        # Derive everything once
+        r = sp.Matrix(self.components)
+        velocity = r.diff(self.variable)
+        acceleration = velocity.diff(self.variable)
+        jerk = acceleration.diff(self.variable)
+        speed = sp.sqrt(sum(v ** 2 for v in velocity))
+        tangent = velocity / speed
+        self.expressions = {
+            "position": tuple(r),
+            "velocity": tuple(velocity),
+            "acceleration": tuple(acceleration),
+            "jerk": tuple(jerk),
+            "speed": (speed,),
+            "tangent": tuple(tangent),
+        }
+
+        arguments = (self.variable,) + self.parameters
+        self._functions = {name: _compile(expressions, arguments, backend)
+                           for name, expressions in self.expressions.items()}
+
+    def evaluate(self, name, t_values, *parameter_values):
+        """Evaluate one of KERNELS at every t; (n, dim) for vectors, (n,) for the speed"""
+        t_values = np.asarray(t_values, dtype=np.float64)
+        function = self._functions[name]
+        if self.backend == "numexpr":
+            values = [f(t_values, *parameter_values) for f in function]
+        else:
+            values = function(t_values, *parameter_values)
+
+        out = np.empty((t_values.size, len(values)))
+        for i, value in enumerate(values):
+            # Constant components come back as scalars and broadcast here
+            out[:, i] = np.ravel(value) if np.ndim(value) else value
+        return out[:, 0] if name == "speed" else out
+
+    def position(self, t_values, *parameter_values):
+        return self.evaluate("position", t_values, *parameter_values)
+
+    def velocity(self, t_values, *parameter_values):
+        return self.evaluate("velocity", t_values, *parameter_values)
+
+    def acceleration(self, t_values, *parameter_values):
+        return self.evaluate("acceleration", t_values, *parameter_values)
+
+    def jerk(self, t_values, *parameter_values):
+        return self.evaluate("jerk", t_values, *parameter_values)
+
+    def speed(self, t_values, *parameter_values):
+        return self.evaluate("speed", t_values, *parameter_values)
+
+    def tangent(self, t_values, *parameter_values):
+        return self.evaluate("tangent", t_values, *parameter_values)
+
+
+def notebook_kernel(name, backend="numpy"):
+    """Kernel for one of NOTEBOOK_CURVES"""
+    return CurveKernel(NOTEBOOK_CURVES[name], NOTEBOOK_PARAMETERS.get(name, ()), t, backend)
+
+
+def benchmark(samples=1_000_000, subs_points=200):
+    """
+    Compare .subs() point by point with one kernel call for each notebook curve.
+
+    Also checks the kernels against .subs() at a few points, including the
+    helix at t = pi/2.
+    """
+    print(f"{'curve':<10}{'compile (ms)':>14}{'subs (us/pt)':>14}{'kernel (ns/pt)':>16}{'speedup':>10}"
+          f"{'max error':>12}")
+    for name in NOTEBOOK_CURVES:
+        parameters = NOTEBOOK_PARAMETERS.get(name, ())
+        values = (2.0,) * len(parameters)
+        bindings = dict(zip(parameters, values))
+
+        start = time.perf_counter()
+        kernel = notebook_kernel(name)
+        compile_ms = (time.perf_counter() - start) * 1000
+
+        # Points clear of sec/tan's poles and of log|t| at 0
+        t_check = np.linspace(0.1, 1.2, subs_points)
+        velocity = sp.Matrix(kernel.expressions["velocity"])
+        start = time.perf_counter()
+        reference = np.array([[float(v) for v in velocity.subs(bindings).subs(kernel.variable, value)]
+                              for value in t_check])
+        subs_us = (time.perf_counter() - start) * 1e6 / subs_points
+        error = np.abs(kernel.velocity(t_check, *values) - reference).max()
+
+        t_values = np.linspace(0.1, 1.2, samples)
+        start = time.perf_counter()
+        kernel.velocity(t_values, *values)
+        kernel_ns = (time.perf_counter() - start) * 1e9 / samples
+
+        print(f"{name:<10}{compile_ms:>14.1f}{subs_us:>14.1f}{kernel_ns:>16.1f}{subs_us * 1000 / kernel_ns:>9.0f}x"
+              f"{error:>12.2e}")
+
+    # The notebook's helix values at t = pi/2
+    helix = notebook_kernel("helix")
+    print("helix at pi/2: v =", np.round(helix.velocity([np.pi / 2])[0], 6),
+          "a =", np.round(helix.acceleration([np.pi / 2])[0], 6),
+          "|v| =", np.round(helix.speed([np.pi / 2])[0], 6))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark the compiled curve kernels against .subs()")
+    parser.add_argument("--samples", type=int, default=1_000_000, help="t samples per kernel call")
+    parser.add_argument("--subs-points", type=int, default=200, help="points evaluated with .subs()")
+    args = parser.parse_args()
+    benchmark(args.samples, args.subs_points)
+    sys.exit()
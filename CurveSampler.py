@@ -0,0 +1,238 @@
+import numpy as np
+import sympy as sp
+import sys
+import time
+from collections import namedtuple
+from sympy.calculus.singularities import singularities
+
+from CurveKernels import CurveKernel, NOTEBOOK_CURVES, t
+from VectorCurve import VectorCurve
+
+# t values and points of the sampled curve: points has a NaN row wherever one
+# branch ends and the next begins, so it plots directly with matplotlib or
+# splits with branches(); poles are the singular t values that were found
+CurveSamples = namedtuple("CurveSamples", ["t", "points", "poles"])
+
+
+def find_poles(components, variable, t_start, t_end):
+    """Singular t values of the components strictly inside (t_start, t_end), where SymPy can list them"""
+    poles = set()
+    for component in components:
+        try:
+            found = singularities(component, variable, sp.Interval(t_start, t_end))
+        except (NotImplementedError, TypeError, ValueError):
+            continue
+        if isinstance(found, sp.FiniteSet):
+            poles.update(float(pole) for pole in found if pole.is_real and t_start < pole < t_end)
+    return sorted(poles)
+
+
+def _position_function(curve, parameter_values):
+    """A vectorized r(t) and the curve's SymPy components (None for a plain callable)"""
+    if isinstance(curve, VectorCurve):
+        return _position_function(curve.kernel(), parameter_values)
+    if isinstance(curve, CurveKernel):
+        return lambda t_values: curve.position(t_values, *parameter_values), curve
+    if callable(curve):
+        return lambda t_values: np.asarray(curve(t_values), dtype=np.float64).reshape(len(t_values), -1), None
+    return _position_function(CurveKernel(curve), parameter_values)
+
+
+def sample_curve(curve, t_start, t_end, limit=10.0, tolerance=None, max_angle=0.1, initial=32, max_depth=24,
+                 max_points=200_000, parameter_values=()):
+    """
+    Sample a plane curve with points placed where its shape needs them.
+
+    An interval is split at its midpoint while the midpoint strays more than
+    tolerance from the chord, or the curve turns by more than max_angle
+    there, so flat stretches keep few points and tight bends get many. All
+    intervals of one refinement level are evaluated in a single vectorized
+    call.
+
+    Points that are not finite or fall outside the box |x|, |y| <= limit
+    break the curve into branches. Intervals running from an inside point to
+    an outside one are bisected until the inside end is within tolerance of
+    the box edge, so every branch reaches it. For SymPy curves the poles are also found symbolically and
+    put on the initial grid, so none can fall between two samples. An
+    interval that still jumps by more than 10 * tolerance at max_depth is
+    treated as a discontinuity, which catches poles numerically for plain
+    callables.
+
+    Parameters:
+    - curve: SymPy components, a VectorCurve or CurveKernel, or a callable
+      mapping a t array to (n, 2) points
+    - t_start, t_end: Parameter range
+    - limit: Half-width of the box points must stay in (default: 10.0)
+    - tolerance: Allowed chord error; default limit / 1000
+    - max_angle: Allowed turn between neighbouring segments in radians (default: 0.1)
+    - initial: Intervals in the starting grid (default: 32)
+    - max_depth: Maximum number of halvings of a starting interval (default: 24)
+    - max_points: Refinement stops once this many points were evaluated (default: 200000)
+    - parameter_values: Values of the curve's other parameters, e.g. omega (default: ())
+
+    Returns a CurveSamples.
+    """
+    if tolerance is None:
+        tolerance = limit / 1000
+    position, kernel = _position_function(curve, parameter_values)
+
+    poles = []
+    if kernel is not None:
+        poles = find_poles(kernel.components, kernel.variable, t_start, t_end)
+
+    def evaluate(t_values):
+        # Poles and logs of zero are expected here and end up as invalid points
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            points = position(t_values)
+            valid = np.isfinite(points).all(axis=1) & (np.abs(points).max(axis=1) <= limit)
+        return points, valid
+
+    # Starting grid, with any poles as grid points
+    grid = np.union1d(np.linspace(t_start, t_end, initial + 1), poles)
+    points, valid = evaluate(grid)
+    all_t, all_points, all_valid = [grid], [points], [valid]
+
+    # Intervals still being refined, as arrays of their ends
+    t0, t1 = grid[:-1], grid[1:]
+    p0, p1 = points[:-1], points[1:]
+    v0, v1 = valid[:-1], valid[1:]
+    evaluated = len(grid)
+
+    for depth in range(max_depth + 1):
+        if len(t0) == 0:
+            break
+        tm = (t0 + t1) / 2
+        pm, vm = evaluate(tm)
+        evaluated += len(tm)
+
+        with np.errstate(invalid="ignore"):
+            # Distance of the midpoint from the chord's midpoint
+            error = np.linalg.norm(pm - (p0 + p1) / 2, axis=1)
+            # Turning angle between the two half-segments, ignoring ones already below tolerance
+            d0, d1 = pm - p0, p1 - pm
+            cross = d0[:, 0] * d1[:, 1] - d0[:, 1] * d1[:, 0]
+            dot = (d0 * d1).sum(axis=1)
+            angle = np.abs(np.arctan2(cross, dot))
+            long_enough = np.linalg.norm(p1 - p0, axis=1) > tolerance
+            inside = v0 & v1 & vm
+            split = inside & ((error > tolerance) | (long_enough & (angle > max_angle)))
+            # Chase the box edge on mixed intervals until the inside end is within
+            # tolerance of it; dips outside get bisected as well
+            inside_end = np.where(v0[:, np.newaxis], p0, p1)
+            at_edge = limit - np.abs(inside_end).max(axis=1) <= tolerance
+            split |= ((v0 != v1) & ~at_edge) | ((v0 | v1) & ~vm) | (~v0 & ~v1 & vm)
+
+        if depth == max_depth or evaluated >= max_points:
+            # Intervals that still jump at the finest level are discontinuities
+            jump = inside & (error > 10 * tolerance)
+            vm = vm & ~jump
+            split[:] = False
+
+        keep = ~(~v0 & ~v1 & ~vm)
+        all_t.append(tm[keep])
+        all_points.append(pm[keep])
+        all_valid.append(vm[keep])
+
+        t0, t1 = np.concatenate([t0[split], tm[split]]), np.concatenate([tm[split], t1[split]])
+        p0, p1 = np.concatenate([p0[split], pm[split]]), np.concatenate([pm[split], p1[split]])
+        v0, v1 = np.concatenate([v0[split], vm[split]]), np.concatenate([vm[split], v1[split]])
+
+    if evaluated >= max_points:
+        print(f"Stopped refining at {evaluated} points; raise max_points or tolerance")
+
+    # Every evaluated midpoint is a vertex of the finished refinement
+    t_values = np.concatenate(all_t)
+    order = np.argsort(t_values, kind="stable")
+    t_values = t_values[order]
+    points = np.concatenate(all_points)[order]
+    valid = np.concatenate(all_valid)[order]
+
+    # Invalid points become single NaN separators between branches
+    separator = ~valid & np.concatenate([[True], valid[:-1]])
+    keep = valid | separator
+    t_values, points, valid = t_values[keep], points[keep].copy(), valid[keep]
+    points[~valid] = np.nan
+    return CurveSamples(t_values, points, poles)
+
+
+def branches(samples):
+    """Split CurveSamples into a list of (t, points) pairs, one per continuous branch"""
+    broken = np.flatnonzero(np.isnan(samples.points[:, 0]))
+    result = []
+    for t_values, points in zip(np.split(samples.t, broken), np.split(samples.points, broken)):
+        finite = np.isfinite(points[:, 0])
+        if finite.sum() >= 2:
+            result.append((t_values[finite], points[finite]))
+    return result
+
+
+def uniform_samples(position, t_start, t_end, count, limit=10.0):
+    """The notebooks' approach: a uniform grid with out-of-range points dropped, as CurveSamples"""
+    t_values = np.linspace(t_start, t_end, count)
+    points = position(t_values)
+    with np.errstate(invalid="ignore"):
+        valid = np.isfinite(points).all(axis=1) & (np.abs(points).max(axis=1) <= limit)
+    points[~valid] = np.nan
+    return CurveSamples(t_values, points, [])
+
+
+def max_deviation(position, samples, t_start, t_end, limit=10.0, reference_points=1_000_000):
+    """
+    Largest distance from the true curve inside the box to the sampled polyline.
+
+    Dense reference points are compared with the segment whose ends bracket
+    them in t. Where that segment is missing because a branch ends early, the
+    distance to the branch's last point counts instead, so stopping short of
+    the box edge shows up as error too.
+    """
+    t_reference = np.linspace(t_start, t_end, reference_points)
+    true = position(t_reference)
+    with np.errstate(invalid="ignore"):
+        inside = np.isfinite(true).all(axis=1) & (np.abs(true).max(axis=1) <= limit)
+    t_reference, true = t_reference[inside], true[inside]
+
+    index = np.clip(np.searchsorted(samples.t, t_reference) - 1, 0, len(samples.t) - 2)
+    a, b = samples.points[index], samples.points[index + 1]
+    # A missing end falls back to the other end, so the "segment" is a single point
+    a = np.where(np.isnan(a), b, a)
+    b = np.where(np.isnan(b), a, b)
+    ab = b - a
+    length = (ab * ab).sum(axis=1)
+    along = np.clip(((true - a) * ab).sum(axis=1) / np.where(length > 0, length, 1), 0, 1)
+    distance = np.linalg.norm(true - (a + ab * along[:, np.newaxis]), axis=1)
+    return np.nanmax(distance)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compare adaptive sampling of sec t i + tan t j with uniform grids")
+    parser.add_argument("--limit", type=float, default=10.0, help="half-width of the plotted box")
+    parser.add_argument("--tolerances", type=float, nargs="+", default=[0.1, 0.01, 0.001],
+                        help="chord tolerances to sample with")
+    args = parser.parse_args()
+
+    kernel = CurveKernel(NOTEBOOK_CURVES["sec_tan"], variable=t)
+    position = kernel.position
+    t_start, t_end = 0.0, 2 * np.pi
+
+    print(f"{'sampler':<24}{'points':>10}{'branches':>10}{'max error':>12}{'time (ms)':>11}")
+    for tolerance in args.tolerances:
+        start = time.perf_counter()
+        adaptive = sample_curve(kernel, t_start, t_end, args.limit, tolerance)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"{f'adaptive, tol {tolerance:g}':<24}{np.isfinite(adaptive.points[:, 0]).sum():>10}"
+              f"{len(branches(adaptive)):>10}{max_deviation(position, adaptive, t_start, t_end, args.limit):>12.2e}"
+              f"{elapsed:>11.1f}")
+    print(f"Poles found: {', '.join(f'{p:.6f}' for p in adaptive.poles)}")
+
+    # The notebook's 1000 points, then denser uniform grids; the error includes
+    # the stretch each branch stops short of the box edge
+    for count in (1000, 4000, 16000, 64000):
+        start = time.perf_counter()
+        uniform = uniform_samples(position, t_start, t_end, count, args.limit)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"{f'uniform, {count}':<24}{np.isfinite(uniform.points[:, 0]).sum():>10}"
+              f"{len(branches(uniform)):>10}{max_deviation(position, uniform, t_start, t_end, args.limit):>12.2e}"
+              f"{elapsed:>11.1f}")
+    sys.exit()
@@ -0,0 +1,188 @@
+import numpy as np
+import os
+import sys
+import time
+
+from CurveKernels import CurveKernel, KERNELS, NOTEBOOK_CURVES, t
+from VectorCurve import VectorCurve
+
+# Samples evaluated per pass; memory use is set by this, not by the number of samples
+CHUNK = 1 << 16
+# What a stream holds by default: r(t), r'(t) and r''(t)
+QUANTITIES = ("position", "velocity", "acceleration")
+
+
+def _kernel(curve):
+    """A CurveKernel for SymPy components, a VectorCurve or a CurveKernel"""
+    if isinstance(curve, VectorCurve):
+        return curve.kernel()
+    if isinstance(curve, CurveKernel):
+        return curve
+    return CurveKernel(curve)
+
+
+def _shape(kernel, name, samples):
+    # The sample times are a column of their own, like the speed
+    return (samples,) if name in ("t", "speed") else (samples, kernel.dim)
+
+
+def _check_quantities(quantities):
+    for name in quantities:
+        if name != "t" and name not in KERNELS:
+            raise ValueError(f"Unknown quantity {name!r}; choose from t, {', '.join(KERNELS)}")
+
+
+def sample_times(t_start, t_end, samples, start, stop):
+    """t values start to stop - 1 of np.linspace(t_start, t_end, samples), without building the whole grid"""
+    step = (t_end - t_start) / (samples - 1) if samples > 1 else 0.0
+    t_values = t_start + np.arange(start, stop, dtype=np.float64) * step
+    if stop == samples and samples > 1:
+        # linspace ends exactly on t_end
+        t_values[-1] = t_end
+    return t_values
+
+
+def iter_chunks(curve, t_start, t_end, samples, quantities=QUANTITIES, chunk=CHUNK, parameter_values=()):
+    """
+    Yield (start, {name: array}) for consecutive chunks of the sample grid.
+
+    Only one chunk's t values and results exist at a time, so a consumer that
+    writes each chunk away before asking for the next runs in constant memory.
+
+    Parameters:
+    - curve: SymPy components, a VectorCurve or a CurveKernel
+    - t_start, t_end: Parameter range, both ends sampled
+    - samples: Number of t values
+    - quantities: Names from KERNELS, or "t" for the sample times (default: QUANTITIES)
+    - chunk: Samples per pass (default: CHUNK)
+    - parameter_values: Values of the curve's other parameters, e.g. omega (default: ())
+    """
+    kernel = _kernel(curve)
+    _check_quantities(quantities)
+    for start in range(0, samples, chunk):
+        t_values = sample_times(t_start, t_end, samples, start, min(start + chunk, samples))
+        yield start, {name: t_values if name == "t" else kernel.evaluate(name, t_values, *parameter_values)
+                      for name in quantities}
+
+
+def fill(curve, targets, t_start, t_end, chunk=CHUNK, parameter_values=()):
+    """
+    Evaluate into preallocated arrays, such as np.memmap files, one chunk at a time.
+
+    Parameters:
+    - curve: SymPy components, a VectorCurve or a CurveKernel
+    - targets: {quantity: array} with one row per sample, all the same length
+    - t_start, t_end: Parameter range, both ends sampled
+    - chunk: Samples per pass (default: CHUNK)
+    - parameter_values: Values of the curve's other parameters, e.g. omega (default: ())
+    """
+    samples = len(next(iter(targets.values())))
+    for start, values in iter_chunks(curve, t_start, t_end, samples, tuple(targets), chunk, parameter_values):
+        for name, value in values.items():
+            targets[name][start:start + len(value)] = value
+    return targets
+
+
+def write_npy(curve, directory, t_start, t_end, samples, quantities=QUANTITIES, chunk=CHUNK, parameter_values=()):
+    """
+    Stream a curve's samples to one .npy file per quantity.
+
+    The header of each file is written up front with the final shape, then
+    each chunk's rows are appended as they are computed, so neither the
+    results nor the t grid are ever held in full. The files are standard
+    .npy and open with np.load(path, mmap_mode="r") or open_samples().
+    They are written under temporary names and renamed once complete, so a
+    failed run leaves no partial files behind.
+
+    Parameters are those of iter_chunks, plus:
+    - directory: Where to write <quantity>.npy; created if missing
+
+    Returns {quantity: path}.
+    """
+    kernel = _kernel(curve)
+    _check_quantities(quantities)
+    os.makedirs(directory, exist_ok=True)
+    paths = {name: os.path.join(directory, f"{name}.npy") for name in quantities}
+    tmp_paths = {name: f"{path}.{os.getpid()}.tmp" for name, path in paths.items()}
+    files = {}
+    try:
+        for name, tmp_path in tmp_paths.items():
+            files[name] = open(tmp_path, "wb")
+            header = {"descr": np.lib.format.dtype_to_descr(np.dtype(np.float64)), "fortran_order": False,
+                      "shape": _shape(kernel, name, samples)}
+            np.lib.format.write_array_header_2_0(files[name], header)
+        for _, values in iter_chunks(kernel, t_start, t_end, samples, quantities, chunk, parameter_values):
+            for name, value in values.items():
+                # Rows are C-contiguous, so appending chunks builds the full array in order
+                files[name].write(np.ascontiguousarray(value).tobytes())
+    except BaseException:
+        for name, f in files.items():
+            f.close()
+            os.remove(tmp_paths[name])
+        raise
+    for name, f in files.items():
+        f.close()
+        os.replace(tmp_paths[name], paths[name])
+    return paths
+
+
+def open_samples(directory, quantities=None):
+    """
+    Read-only memory maps of the .npy files in directory, as {quantity: array}.
+
+    Slicing one reads only the pages the slice covers.
+    """
+    if quantities is None:
+        quantities = [name[:-4] for name in sorted(os.listdir(directory)) if name.endswith(".npy")]
+    return {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r") for name in quantities}
+
+
+if __name__ == "__main__":
+    import argparse
+    import resource
+    import tempfile
+
+    parser = argparse.ArgumentParser(description="Stream the helix's r, r' and r'' to .npy files and check memory use")
+    parser.add_argument("--samples", type=int, nargs="+", default=[10_000, 1_000_000, 10_000_000],
+                        help="sample counts to stream")
+    parser.add_argument("--chunk", type=int, default=CHUNK, help="samples per pass")
+    parser.add_argument("--directory", default=None,
+                        help="where to write the files (default: a temporary directory, removed afterwards)")
+    args = parser.parse_args()
+
+    def peak_mb():
+        # ru_maxrss is in kilobytes on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    kernel = CurveKernel(NOTEBOOK_CURVES["helix"], variable=t)
+    # Without --directory the files go to a temporary directory, removed on exit
+    directory = args.directory
+    if directory is None:
+        scratch = tempfile.TemporaryDirectory(prefix="curve_stream_")
+        directory = scratch.name
+    t_start, t_end = 0.0, 100.0
+
+    # Warm up so the first run's peak is not the imports and first kernel call
+    write_npy(kernel, directory, t_start, t_end, 1000, chunk=args.chunk)
+    print(f"{'samples':>12}{'written (MB)':>14}{'time (s)':>10}{'peak RSS (MB)':>15}")
+    for samples in sorted(args.samples):
+        start = time.perf_counter()
+        paths = write_npy(kernel, directory, t_start, t_end, samples, chunk=args.chunk)
+        elapsed = time.perf_counter() - start
+        written = sum(os.path.getsize(path) for path in paths.values()) / 2 ** 20
+        print(f"{samples:>12}{written:>14.1f}{elapsed:>10.2f}{peak_mb():>15.1f}")
+
+    # Read a slice back without loading the files and check it against a direct evaluation
+    stream = open_samples(directory)
+    samples = max(args.samples)
+    rows = slice(samples // 2, samples // 2 + 5)
+    t_values = np.linspace(t_start, t_end, samples)[rows]
+    error = max(np.abs(np.asarray(stream[name][rows]) - kernel.evaluate(name, t_values)).max() for name in QUANTITIES)
+    print(f"rows {rows.start}-{rows.stop - 1} read back from {directory}, max error {error:.2e}")
+
+    # The notebook way holds every array at once
+    before = peak_mb()
+    t_values = np.linspace(t_start, t_end, samples)
+    values = [kernel.evaluate(name, t_values) for name in QUANTITIES]
+    print(f"all at once: peak RSS {peak_mb():.1f} MB (+{peak_mb() - before:.1f} MB)")
+    sys.exit()
@@ -3,11 +3,24 @@ import numpy as np
 import sys
 import math
 
+from FrameExporter import FrameExporter, export_arguments, report
+from FrameProfiler import FrameProfiler, profile_arguments
+from Hud import TextCache
+from NBody import NBodySystem
+from OrbitalDecayEngine import OrbitalDecayEngine, acceleration_magnitude, velocity_magnitude
+from PhysicsWorker import PhysicsWorker
+from RingBuffer import RingBuffer
+from StripChart import StripChart
+from VectorField import VectorFieldLayer
+
+# Command-line options; --export DIR renders frames offscreen instead
+export_options = export_arguments("Earth Orbital Decay Simulation", [profile_arguments()])
+
 # Initialize Pygame
 pygame.init()
 
 # Initial window size
-default_width, default_height = 1000, 800
+default_width, default_height = export_options.size or (1000, 800)
 
 # Get display info for fullscreen
 display_info = pygame.display.Info()
@@ -38,16 +51,32 @@ earth_radius = 10
 initial_orbit_radius = 300
 
 # Initial conditions
-angle = 0
-orbit_radius = initial_orbit_radius
 decay_rate = 0.05  # Controls how quickly Earth spirals inward
-
-# Initial velocity and angular velocity
 initial_velocity = 0.5
-omega = initial_velocity / initial_orbit_radius  # Initial angular velocity
+
+# The physics runs in a headless engine, stepped at a fixed rate by a worker
+# thread (or process); this script only draws its snapshots
+physics_rate = 60  # Steps per second
+physics_in_process = False
+
+# N-body mode: the Earth (body 0) among satellites and debris with real mutual
+# gravity, started on circular orbits around a Sun of matching mass
+nbody_count = 10000
+nbody_dt = 2.0
+nbody_mode = False
+# A Barnes-Hut step for this many bodies takes longer than a frame, so it runs
+# in its own process and the renderer interpolates between its steps
+nbody_in_process = True
 
 # Font initialization
 font = pygame.font.SysFont('Arial', 20)
+text_cache = TextCache()
+
+# Frame-time profiler; P shows its flame bar, --profile-csv records every frame
+profiler = FrameProfiler(("events", "physics", "vector field", "draw", "text", "export", "overlay", "flip", "idle"),
+                         csv_path=export_options.profile_csv)
+profiler.visible = export_options.profile
+profiler_font = pygame.font.SysFont('Courier New', 14)
 
 
 def toggle_fullscreen():
@@ -76,6 +105,15 @@ def update_dimensions():
     font = pygame.font.SysFont('Arial', max(12, font_size))
 
 
+def draw_bodies(positions, color):
+    """Plot many bodies as single pixels with one array assignment"""
+    points = np.round(positions).astype(np.intp)
+    inside = (points[:, 0] >= 0) & (points[:, 0] < width) & (points[:, 1] >= 0) & (points[:, 1] < height)
+    pixels = pygame.surfarray.pixels2d(screen)
+    pixels[points[inside, 0], points[inside, 1]] = screen.map_rgb(color)
+    del pixels
+
+
 def draw_vector(start, direction, color, scale=1.0, thickness=2):
     try:
         # Calculate end point
@@ -118,40 +156,78 @@ def draw_vector(start, direction, color, scale=1.0, thickness=2):
 update_dimensions()
 
 # Track Earth's orbit
-earth_trail = []
 max_trail_length = 500
+earth_trail = RingBuffer(max_trail_length, 2)
 
 # Main loop
 clock = pygame.time.Clock()
 running = True
 paused = False
 show_vector_field = False
+vector_field = VectorFieldLayer(n_angles=72, radius_factors=(0.5, 1.0, 1.5))
 
 # Time step
 dt = 0.1
 
+
+def start_physics():
+    """Start a worker for the current mode from its initial conditions"""
+    if nbody_mode:
+        system = NBodySystem.disk(nbody_count, earth_orbit_radius=initial_orbit_radius, sun_radius=sun_radius)
+        return PhysicsWorker(system, nbody_dt, physics_rate, nbody_in_process, manual=exporter is not None)
+    engine = OrbitalDecayEngine(initial_orbit_radius, initial_velocity, decay_rate, sun_radius, earth_radius)
+    return PhysicsWorker(engine, dt, physics_rate, physics_in_process, manual=exporter is not None)
+
+
+# Exporting steps the physics in this loop at a fixed dt per frame instead
+exporter = None
+frame_index = 0
+if export_options.export:
+    exporter = FrameExporter(export_options.export, export_options.workers, resume=export_options.resume,
+                             image_format=export_options.format)
+    steps_per_frame = max(1, round(physics_rate / export_options.fps))
+
+physics = start_physics()
+
 # Vector magnitude history for plotting
-velocity_history = []
-acceleration_history = []
-radius_history = []
 max_history = 100
+velocity_history = StripChart(max_history)
+acceleration_history = StripChart(max_history)
+radius_history = RingBuffer(max_history)
 
 while running:
+    profiler.frame()
+    if profiler.frames == export_options.profile_frames:
+        break
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
             running = False
         elif event.type == pygame.KEYDOWN:
             if event.key == pygame.K_SPACE:
                 paused = not paused
+                physics.set("paused", paused)
             elif event.key == pygame.K_v:
                 show_vector_field = not show_vector_field
+            elif event.key == pygame.K_p:
+                profiler.toggle()
+            elif event.key == pygame.K_n:
+                # Switch between the decay spiral and the N-body system, starting each afresh
+                nbody_mode = not nbody_mode
+                physics.stop()
+                physics = start_physics()
+                physics.set("paused", paused)
+                earth_trail.clear()
+                for history in (velocity_history, acceleration_history, radius_history):
+                    history.clear()
             elif event.key == pygame.K_UP:
                 decay_rate *= 1.2
+                physics.set("decay_rate", decay_rate)
             elif event.key == pygame.K_DOWN:
                 decay_rate /= 1.2
+                physics.set("decay_rate", decay_rate)
             elif event.key == pygame.K_f:  # F key toggles fullscreen
                 toggle_fullscreen()
-                earth_trail = []  # Clear trail when changing resolution
+                earth_trail.clear()  # Clear trail when changing resolution
             elif event.key == pygame.K_ESCAPE and fullscreen:
                 # Exit fullscreen with Escape key
                 toggle_fullscreen()
@@ -160,40 +236,42 @@ while running:
             width, height = event.size
             screen = pygame.display.set_mode((width, height), pygame.RESIZABLE)
             update_dimensions()
-            earth_trail = []  # Clear trail when resizing
-
-    if not paused:
-        # Update angular position
-        angle += omega * dt
-
-        # Calculate current acceleration magnitude using inverse square law (closer = stronger)
-        # This makes acceleration increase as Earth gets closer to Sun
-        acc_magnitude = initial_velocity ** 2 * (initial_orbit_radius / orbit_radius) ** 2
-
-        # Calculate current velocity (decreases as orbit decays)
-        # This simulates orbital decay where velocity decreases as radius decreases
-        vel_magnitude = initial_velocity * np.sqrt(orbit_radius / initial_orbit_radius)
-
-        # Update omega based on new velocity and radius
-        omega = vel_magnitude / orbit_radius
-
-        # Reduce orbit radius (simulating the Earth being pulled toward the Sun)
-        orbit_radius -= decay_rate * acc_magnitude * dt
-
-        # Store history for plotting
-        velocity_history.append(vel_magnitude)
-        acceleration_history.append(acc_magnitude)
-        radius_history.append(orbit_radius)
-
-        if len(velocity_history) > max_history:
-            velocity_history = velocity_history[-max_history:]
-            acceleration_history = acceleration_history[-max_history:]
-            radius_history = radius_history[-max_history:]
+            earth_trail.clear()  # Clear trail when resizing
+    profiler.mark("events")
+
+    if exporter is not None:
+        for _ in range(steps_per_frame):
+            physics.step()
+
+    # Pick up the worker's latest step
+    if physics.poll():
+        state = physics.state
+        if nbody_mode:
+            # Body 0's position leads the state, its velocity and acceleration end it
+            velocity_history.append(np.linalg.norm(state[-4:-2]))
+            acceleration_history.append(np.linalg.norm(state[-2:]))
+            radius_history.append(np.linalg.norm(state[:2]))
+        else:
+            # Store history for plotting
+            velocity_history.append(state[2])
+            acceleration_history.append(state[3])
+            radius_history.append(state[1])
+
+    # Draw between the two latest steps so motion stays smooth at any frame rate
+    state = physics.interpolate()
+    if nbody_mode:
+        positions = state[:-4].reshape(-1, 2)
+        if np.isnan(positions[0, 0]):
+            print("Earth has collided with the Sun! Simulation ending.")
+            break
+    else:
+        angle, orbit_radius = state[0], state[1]
 
         # Check if Earth has hit the Sun
-        if orbit_radius <= sun_radius + earth_radius:
+        if physics.finished:
             print("Earth has collided with the Sun! Simulation ending.")
             running = False
+    profiler.mark("physics")
 
     # Clear the screen
     screen.fill(BLACK)
@@ -204,66 +282,51 @@ while running:
     scaled_sun_radius = sun_radius * display_scale
     scaled_earth_radius = earth_radius * display_scale
 
-    # Draw the vector field if enabled
+    # Draw the vector field if enabled (cached until the screen geometry changes)
     if show_vector_field:
-        n_points = 72  # More points for a denser field like in the image
-        for i in range(n_points):
-            field_angle = 2 * np.pi * i / n_points
-            # Create vector field at multiple radii
-            for radius_factor in [0.5, 1.0, 1.5]:
-                field_radius = display_orbit_radius * radius_factor
-                field_x = center_x + field_radius * np.cos(field_angle)
-                field_y = center_y + field_radius * np.sin(field_angle)
-                field_pos = (field_x, field_y)
-
-                # Position vector from center
-                pos_vector = np.array([field_x - center_x, field_y - center_y])
-
-                # Calculate field point velocity and acceleration based on radius
-                field_vel = initial_velocity * np.sqrt(field_radius / display_orbit_radius)
-                field_acc = initial_velocity ** 2 * (display_orbit_radius / field_radius) ** 2
-
-                # Velocity vector (tangential)
-                vel_vector = np.array([-pos_vector[1], pos_vector[0]])
-                vel_vector = vel_vector / np.linalg.norm(vel_vector) * field_vel
-
-                # Acceleration vector (toward center)
-                acc_vector = -pos_vector / np.linalg.norm(pos_vector) * field_acc
-
-                # Draw vectors - scale with display size
-                field_vel_scale = 100.0 * display_scale
-                field_acc_scale = 200.0 * display_scale
-                draw_vector(field_pos, vel_vector, RED, field_vel_scale, 1)
-                draw_vector(field_pos, acc_vector, GREEN, field_acc_scale, 1)
-
-    # Calculate Earth position - scaled by display size
-    display_orbit = orbit_radius * display_scale
-    x = center_x + display_orbit * np.cos(angle)
-    y = center_y + display_orbit * np.sin(angle)
+        arrow_size = 12 * (width / default_width)
+        with profiler.scope("vector field"):
+            vector_field.draw(screen, (center_x, center_y), display_scale, display_orbit_radius, initial_velocity,
+                              arrow_size)
+
+    if nbody_mode:
+        # Draw every body, then follow the Earth with the usual vectors and trail
+        alive = positions[np.isfinite(positions[:, 0])]
+        draw_bodies(alive * display_scale + (center_x, center_y), (160, 160, 160))
+        x, y = positions[0] * display_scale + (center_x, center_y)
+        orbit_radius = np.linalg.norm(positions[0])
+    else:
+        # Calculate Earth position - scaled by display size
+        display_orbit = orbit_radius * display_scale
+        x = center_x + display_orbit * np.cos(angle)
+        y = center_y + display_orbit * np.sin(angle)
     earth_pos = (x, y)
 
-    # Add to Earth's trail
+    # Add to Earth's trail (the ring buffer drops the oldest point when full)
     earth_trail.append(earth_pos)
-    if len(earth_trail) > max_trail_length:
-        earth_trail = earth_trail[-max_trail_length:]
 
     # Draw Earth's trail to show spiral
     if len(earth_trail) > 1:
-        pygame.draw.lines(screen, BLUE, False, earth_trail, max(1, int(2 * display_scale)))
+        pygame.draw.lines(screen, BLUE, False, earth_trail.view(), max(1, int(2 * display_scale)))
 
     # Calculate position vector (from Sun to Earth)
     pos_vector = np.array([x - center_x, y - center_y])
 
-    # Calculate velocity vector (tangential to orbit)
-    # |v| decreases as orbit decreases
-    vel_magnitude = initial_velocity * np.sqrt(orbit_radius / initial_orbit_radius)
-    vel_vector = np.array([-pos_vector[1], pos_vector[0]])
-    vel_vector = vel_vector / np.linalg.norm(vel_vector) * vel_magnitude
+    if nbody_mode:
+        # Actual velocity and gravitational acceleration, including the other bodies' pull
+        vel_vector, acc_vector = state[-4:-2], state[-2:]
+        vel_magnitude, acc_magnitude = np.linalg.norm(vel_vector), np.linalg.norm(acc_vector)
+    else:
+        # Calculate velocity vector (tangential to orbit)
+        # |v| decreases as orbit decreases
+        vel_magnitude = velocity_magnitude(orbit_radius, initial_velocity, initial_orbit_radius)
+        vel_vector = np.array([-pos_vector[1], pos_vector[0]])
+        vel_vector = vel_vector / np.linalg.norm(vel_vector) * vel_magnitude
 
-    # Calculate acceleration vector (pointing to Sun)
-    # |a| increases as orbit decreases (inverse square)
-    acc_magnitude = initial_velocity ** 2 * (initial_orbit_radius / orbit_radius) ** 2
-    acc_vector = -pos_vector / np.linalg.norm(pos_vector) * acc_magnitude
+        # Calculate acceleration vector (pointing to Sun)
+        # |a| increases as orbit decreases (inverse square)
+        acc_magnitude = acceleration_magnitude(orbit_radius, initial_velocity, initial_orbit_radius)
+        acc_vector = -pos_vector / np.linalg.norm(pos_vector) * acc_magnitude
 
     # Draw position vector - scaled with screen size
     draw_vector((center_x, center_y), pos_vector, WHITE, 1.0, max(2, int(2 * display_scale)))
@@ -274,6 +337,10 @@ while running:
 
     # Draw acceleration vector - adaptive scaling to keep it visible
     acc_scale = 20.0 * display_scale
+    if nbody_mode:
+        # Gravity at r0 is v0² / r0 rather than the decay model's v0², so
+        # stretch it by r0 to start at the same length
+        acc_scale *= initial_orbit_radius
     draw_vector(earth_pos, acc_vector, GREEN, acc_scale, max(3, int(3 * display_scale)))
 
     # Draw Sun and Earth - scaled with screen size
@@ -292,54 +359,41 @@ while running:
     pygame.draw.rect(screen, (80, 80, 80), (plot_x, plot_y, plot_width, plot_height), 1)
 
     # Draw plot title
-    plot_title = font.render("Vector Magnitudes", True, WHITE)
+    plot_title = text_cache.render(font, "Vector Magnitudes", WHITE)
     screen.blit(plot_title, (plot_x + plot_width // 2 - plot_title.get_width() // 2, plot_y - 25))
 
-    # Draw plot if we have history
-    if len(velocity_history) > 1:
-        # Normalize values to plot height
-        max_vel = max(velocity_history) or 1
-        max_acc = max(acceleration_history) or 1
-
-        # Draw velocity history (red)
-        points = []
-        for i, vel in enumerate(velocity_history):
-            x_pos = plot_x + (i / len(velocity_history)) * plot_width
-            y_pos = plot_y + plot_height - (vel / max_vel) * plot_height * 0.9
-            points.append((x_pos, y_pos))
-
-        if len(points) > 1:
-            pygame.draw.lines(screen, RED, False, points, max(2, int(2 * display_scale)))
-
-        # Draw acceleration history (green)
-        points = []
-        for i, acc in enumerate(acceleration_history):
-            x_pos = plot_x + (i / len(acceleration_history)) * plot_width
-            y_pos = plot_y + plot_height - (acc / max_acc) * plot_height * 0.9
-            points.append((x_pos, y_pos))
-
-        if len(points) > 1:
-            pygame.draw.lines(screen, GREEN, False, points, max(2, int(2 * display_scale)))
+    # Draw velocity (red) and acceleration (green) history, each normalized to its own maximum
+    plot_rect = (plot_x, plot_y, plot_width, plot_height)
+    velocity_history.draw(screen, RED, plot_rect, max(2, int(2 * display_scale)))
+    acceleration_history.draw(screen, GREEN, plot_rect, max(2, int(2 * display_scale)))
+    profiler.mark("draw")
 
     # Draw current radius and magnitudes with better formatting
     y_offset = int(80 * display_scale)
     line_spacing = int(30 * display_scale)
 
-    current_radius_text = font.render(f'Current orbit radius: {orbit_radius:.1f}', True, WHITE)
+    current_radius_text = text_cache.render_line('radius', font, f'Current orbit radius: {orbit_radius:.1f}', WHITE)
     screen.blit(current_radius_text, (width // 2 - current_radius_text.get_width() // 2, y_offset))
 
+    # The decay spiral has fixed trends; N-body magnitudes vary either way, and
+    # the mutual pulls are too small for three decimals
+    vel_trend, acc_trend = ('', '') if nbody_mode else (' (Decreasing)', ' (Increasing)')
+    acc_format = '.3g' if nbody_mode else '.3f'
+
     # Draw velocity magnitude with dynamic color based on change
     vel_color = (255, 100, 100) if vel_magnitude < initial_velocity * 0.95 else WHITE
-    vel_text = font.render(f'Velocity magnitude: {vel_magnitude:.3f} (Decreasing)', True, vel_color)
+    vel_text = text_cache.render_line('velocity', font, f'Velocity magnitude: {vel_magnitude:.3f}{vel_trend}',
+                                      vel_color)
     screen.blit(vel_text, (width // 2 - vel_text.get_width() // 2, y_offset + line_spacing))
 
     # Draw acceleration magnitude with dynamic color based on change
     acc_color = (100, 255, 100) if acc_magnitude > initial_velocity ** 2 * 1.05 else WHITE
-    acc_text = font.render(f'Acceleration magnitude: {acc_magnitude:.3f} (Increasing)', True, acc_color)
+    acc_text = text_cache.render_line('acceleration', font,
+                                      f'Acceleration magnitude: {acc_magnitude:{acc_format}}{acc_trend}', acc_color)
     screen.blit(acc_text, (width // 2 - acc_text.get_width() // 2, y_offset + line_spacing * 2))
 
     # Draw title and legend
-    title = font.render('Earth Orbital Decay Simulation', True, WHITE)
+    title = text_cache.render(font, 'Earth Orbital Decay Simulation', WHITE)
     screen.blit(title, (width // 2 - title.get_width() // 2, int(20 * display_scale)))
 
     # Legend for vectors - scaled with screen size
@@ -350,37 +404,68 @@ while running:
     # Position vector
     pygame.draw.line(screen, WHITE, (legend_x, legend_y), (legend_x + int(30 * display_scale), legend_y),
                      max(2, int(2 * display_scale)))
-    text = font.render('Position Vector (r)', True, WHITE)
+    text = text_cache.render(font, 'Position Vector (r)', WHITE)
     screen.blit(text, (legend_x + int(40 * display_scale), legend_y - int(10 * display_scale)))
 
     # Velocity vector
     pygame.draw.line(screen, RED, (legend_x, legend_y + legend_spacing),
                      (legend_x + int(30 * display_scale), legend_y + legend_spacing), max(3, int(3 * display_scale)))
-    text = font.render(f'Velocity Vector (v), |v| = {vel_magnitude:.3f}', True, RED)
+    text = text_cache.render_line('velocity legend', font, f'Velocity Vector (v), |v| = {vel_magnitude:.3f}', RED)
     screen.blit(text, (legend_x + int(40 * display_scale), legend_y + legend_spacing - int(10 * display_scale)))
 
     # Acceleration vector
     pygame.draw.line(screen, GREEN, (legend_x, legend_y + legend_spacing * 2),
                      (legend_x + int(30 * display_scale), legend_y + legend_spacing * 2),
                      max(3, int(3 * display_scale)))
-    text = font.render(f'Acceleration Vector (a), |a| = {acc_magnitude:.3f}', True, GREEN)
+    text = text_cache.render_line('acceleration legend', font,
+                                  f'Acceleration Vector (a), |a| = {acc_magnitude:.3f}', GREEN)
     screen.blit(text, (legend_x + int(40 * display_scale), legend_y + legend_spacing * 2 - int(10 * display_scale)))
 
-    # Decay rate info
-    decay_text = font.render(f'Decay rate: {decay_rate:.4f} (UP/DOWN to adjust)', True, WHITE)
+    # Decay rate info, or the N-body system's size and cost per step
+    if nbody_mode:
+        decay_text = text_cache.render_line('decay', font, f'N-body: {len(alive)} bodies (N to exit)', WHITE)
+    else:
+        decay_text = text_cache.render_line('decay', font, f'Decay rate: {decay_rate:.4f} (UP/DOWN to adjust)',
+                                            WHITE)
     screen.blit(decay_text, (width // 2 - decay_text.get_width() // 2, y_offset + line_spacing * 3))
 
     # Controls info - include fullscreen toggle info
-    controls = font.render('SPACE: Pause, V: Toggle vector field, F: Toggle fullscreen', True, WHITE)
+    controls = text_cache.render(font, 'SPACE: Pause, V: Toggle vector field, N: N-body mode, F: Toggle fullscreen, '
+                                 'P: Profiler', WHITE)
     screen.blit(controls, (width // 2 - controls.get_width() // 2, int(50 * display_scale)))
 
     # Draw fullscreen indicator
-    fs_text = font.render("Fullscreen: ON" if fullscreen else "Fullscreen: OFF (Press F)", True, WHITE)
+    fs_text = text_cache.render(font, "Fullscreen: ON" if fullscreen else "Fullscreen: OFF (Press F)", WHITE)
     screen.blit(fs_text, (width - fs_text.get_width() - int(20 * display_scale), int(20 * display_scale)))
+    profiler.mark("text")
+
+    if exporter is not None:
+        # Frames before a resume point are still drawn, to rebuild the trail and history
+        exporter.submit(frame_index, screen)
+        profiler.mark("export")
+        frame_index += 1
+        if frame_index >= export_options.frames:
+            running = False
+        continue
+
+    # Physics steps per second against frames drawn per second
+    rates_text = text_cache.render_line('rates', font, f'Physics: {physics.physics_hz:.0f} Hz, '
+                                        f'render: {clock.get_fps():.0f} FPS', WHITE)
+    screen.blit(rates_text, (int(20 * display_scale), int(20 * display_scale)))
+    profiler.draw(screen, profiler_font, text_cache, (int(20 * display_scale), int(90 * display_scale)))
+    profiler.mark("overlay")
 
     # Update display
     pygame.display.flip()
+    profiler.mark("flip")
     clock.tick(60)
-
+    profiler.mark("idle")
+
+physics.stop()
+profiler.close()
+if exporter is not None:
+    report(exporter, export_options.fps)
+    if export_options.video:
+        exporter.encode_video(export_options.video, export_options.fps)
 pygame.quit()
 sys.exit()
\ No newline at end of file
@@ -0,0 +1,289 @@
+import pygame
+import numpy as np
+import hashlib
+import os
+import sys
+import time
+from urllib.request import urlretrieve
+
+# Default texture location and source
+TEXTURE_FILE = "earth_texture.jpg"
+# NASA Blue Marble image URL
+TEXTURE_URL = "https://eoimages.gsfc.nasa.gov/images/imagerecords/74000/74092/world.200407.3x5400x2700.jpg"
+
+# Preprocessed discs are cached here as raw RGBA .npy files
+CACHE_DIR = ".texture_cache"
+CACHE_MAX_BYTES = 256 * 1024 * 1024
+# Bump when the mask or file layout changes so stale entries are ignored
+CACHE_VERSION = 1
+
+
+def ensure_texture_file(texture_file=TEXTURE_FILE):
+    """Download the Earth texture if it is not already on disk"""
+    if not os.path.exists(texture_file):
+        print("Downloading Earth texture...")
+        urlretrieve(TEXTURE_URL, texture_file)
+    return texture_file
+
+
+def build_circular_mask(radius, antialias=False):
+    """
+    Build the alpha channel of a disc of the given radius in one array operation.
+
+    Parameters:
+    - radius: Disc radius in pixels; the mask is (2 * radius) x (2 * radius)
+    - antialias: Fade the edge over one pixel instead of a hard cut (default: False)
+
+    Returns a uint8 array indexed [x, y] like pygame.surfarray views.
+    """
+    # Pixel offsets from the disc center, broadcast into a full distance grid
+    offsets = np.arange(radius * 2, dtype=np.float64) - radius
+    distance = np.sqrt(offsets[:, np.newaxis] ** 2 + offsets[np.newaxis, :] ** 2)
+
+    if antialias:
+        # Coverage falls off linearly across the one pixel straddling the edge
+        coverage = np.clip(radius + 0.5 - distance, 0.0, 1.0)
+        return (coverage * 255 + 0.5).astype(np.uint8)
+
+    # Same rule as the per-pixel loop: inside when distance <= radius
+    return np.where(distance <= radius, 255, 0).astype(np.uint8)
+
+
+def crop_to_disc(scaled_img, radius, antialias=False):
+    """
+    Crop a square image to a disc using pygame.surfarray pixel and alpha views.
+
+    Pixels outside the disc are left fully transparent black, matching the
+    original get_at/set_at loop.
+    """
+    size = radius * 2
+    earth_img = pygame.Surface((size, size), pygame.SRCALPHA)
+    mask = build_circular_mask(radius, antialias)
+
+    # Write straight into the surface memory; the views lock the surface
+    # until they are deleted
+    pixels = pygame.surfarray.pixels3d(earth_img)
+    alpha = pygame.surfarray.pixels_alpha(earth_img)
+    pixels[...] = pygame.surfarray.pixels3d(scaled_img)
+    pixels[mask == 0] = 0
+    alpha[...] = mask
+    del pixels, alpha
+
+    return earth_img
+
+
+def crop_to_disc_loop(scaled_img, radius):
+    """Reference per-pixel crop kept for benchmarking against crop_to_disc"""
+    earth_img = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+
+    # Create a circular mask
+    for x in range(radius * 2):
+        for y in range(radius * 2):
+            # Calculate distance from center
+            distance = ((x - radius) ** 2 + (y - radius) ** 2) ** 0.5
+
+            # If within radius, copy the pixel, otherwise leave transparent
+            if distance <= radius:
+                earth_img.set_at((x, y), scaled_img.get_at((x, y)))
+
+    return earth_img
+
+
+class TextureCache:
+    """
+    Size-bounded on-disk cache of cropped Earth discs.
+
+    Each entry is the RGBA disc stored row-major as a .npy file, so a warm
+    load is a memory map instead of a JPEG decode, rescale and mask. Entries
+    are keyed by the source file hash, the radius and the mask options, and
+    the least recently used ones are evicted once the cache grows past
+    max_bytes.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        # Source hashes, keyed by (path, size, mtime) so unchanged files are hashed once
+        self._source_hashes = {}
+
+    def source_hash(self, texture_file):
+        stat = os.stat(texture_file)
+        stamp = (os.path.abspath(texture_file), stat.st_size, stat.st_mtime_ns)
+        if stamp not in self._source_hashes:
+            digest = hashlib.sha256()
+            with open(texture_file, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(block)
+            self._source_hashes[stamp] = digest.hexdigest()[:16]
+        return self._source_hashes[stamp]
+
+    def entry_path(self, texture_file, radius, antialias):
+        edge = "aa" if antialias else "hard"
+        name = f"v{CACHE_VERSION}_{self.source_hash(texture_file)}_r{radius}_{edge}.npy"
+        return os.path.join(self.cache_dir, name)
+
+    def get(self, texture_file, radius, antialias):
+        """Return the cached disc as a Surface, or None on a miss"""
+        path = self.entry_path(texture_file, radius, antialias)
+        try:
+            pixels = np.load(path, mmap_mode="r")
+        except (OSError, ValueError):
+            return None
+
+        if pixels.shape != (radius * 2, radius * 2, 4) or pixels.dtype != np.uint8:
+            return None
+
+        # Touch the entry so eviction sees it as recently used
+        os.utime(path)
+        # Copy into a Surface that owns its pixels: one over the read-only map
+        # crashes on writes and would keep the file open, blocking eviction
+        surface = pygame.image.frombuffer(pixels, (radius * 2, radius * 2), "RGBA").copy()
+        del pixels
+        return surface
+
+    def put(self, texture_file, radius, antialias, earth_img):
+        """Store a cropped disc and evict old entries if the cache is over budget"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self.entry_path(texture_file, radius, antialias)
+
+        size = earth_img.get_size()
+        pixels = np.frombuffer(pygame.image.tobytes(earth_img, "RGBA"), dtype=np.uint8)
+        pixels = pixels.reshape(size[1], size[0], 4)
+
+        # Write to a temporary file first so a crash never leaves a torn entry
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, pixels)
+        os.replace(tmp_path, path)
+
+        self.evict(keep=path)
+
+    def evict(self, keep=None):
+        """Delete least recently used entries until the cache fits in max_bytes"""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".npy"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+
+
+def load_earth_texture(earth_radius, texture_file=TEXTURE_FILE, antialias=False, cache=None):
+    """
+    Load the Earth texture, scale it to the Earth's diameter and crop it to a disc.
+
+    With a TextureCache the cropped disc is read from disk when available and
+    stored there after a cold load.
+    """
+    ensure_texture_file(texture_file)
+
+    if cache is not None:
+        earth_img = cache.get(texture_file, earth_radius, antialias)
+        if earth_img is not None:
+            return earth_img
+
+    # Load the image
+    original_img = pygame.image.load(texture_file)
+
+    # Scale the image to fit our Earth radius
+    scaled_img = pygame.transform.scale(original_img, (earth_radius * 2, earth_radius * 2))
+
+    earth_img = crop_to_disc(scaled_img, earth_radius, antialias)
+
+    if cache is not None:
+        try:
+            cache.put(texture_file, earth_radius, antialias, earth_img)
+        except OSError as e:
+            print(f"Could not cache Earth texture: {e}")
+
+    return earth_img
+
+
+def prebuild(radii, antialias=False, texture_file=TEXTURE_FILE, cache=None):
+    """Fill the cache with discs for each radius"""
+    cache = cache or TextureCache()
+    for radius in radii:
+        if cache.get(texture_file, radius, antialias) is not None:
+            print(f"radius {radius}: already cached")
+            continue
+        start = time.perf_counter()
+        load_earth_texture(radius, texture_file, antialias, cache)
+        print(f"radius {radius}: built in {time.perf_counter() - start:.3f}s")
+
+
+def benchmark(radii, texture_file=TEXTURE_FILE, loop_limit=1000, repeats=3):
+    """
+    Time the per-pixel loop against the NumPy mask for each radius.
+
+    The loop is O(radius²) Python calls, so it is skipped above loop_limit.
+    """
+    ensure_texture_file(texture_file)
+    original_img = pygame.image.load(texture_file)
+
+    print(f"{'radius':>8} {'loop (s)':>12} {'numpy (s)':>12} {'numpy AA (s)':>14} {'speedup':>10}")
+    for radius in radii:
+        scaled_img = pygame.transform.scale(original_img, (radius * 2, radius * 2))
+
+        # Best of several runs for the fast paths
+        fast = min(_time_call(crop_to_disc, scaled_img, radius) for _ in range(repeats))
+        fast_aa = min(_time_call(crop_to_disc, scaled_img, radius, True) for _ in range(repeats))
+
+        if radius <= loop_limit:
+            slow = _time_call(crop_to_disc_loop, scaled_img, radius)
+            print(f"{radius:>8} {slow:>12.4f} {fast:>12.4f} {fast_aa:>14.4f} {slow / fast:>9.1f}x")
+        else:
+            print(f"{radius:>8} {'skipped':>12} {fast:>12.4f} {fast_aa:>14.4f} {'-':>10}")
+
+
+def _time_call(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Earth texture preprocessing tools")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="compare the NumPy mask against the per-pixel loop")
+    parser.add_argument("--prebuild", action="store_true",
+                        help="fill the texture cache for each of --radii")
+    parser.add_argument("--radii", type=int, nargs="+", default=[100, 250, 500, 1000, 2000],
+                        help="radii in pixels to benchmark or prebuild")
+    parser.add_argument("--loop-limit", type=int, default=1000,
+                        help="skip the per-pixel loop above this radius")
+    parser.add_argument("--antialias", action="store_true",
+                        help="prebuild discs with an anti-aliased edge")
+    parser.add_argument("--cache-dir", default=CACHE_DIR,
+                        help="directory holding cached discs")
+    parser.add_argument("--cache-mb", type=int, default=CACHE_MAX_BYTES // (1024 * 1024),
+                        help="evict least recently used discs above this size")
+    args = parser.parse_args()
+
+    pygame.init()
+    if args.prebuild:
+        prebuild(args.radii, args.antialias,
+                 cache=TextureCache(args.cache_dir, args.cache_mb * 1024 * 1024))
+    if args.benchmark:
+        benchmark(args.radii, loop_limit=args.loop_limit)
+    if not (args.prebuild or args.benchmark):
+        parser.print_help()
+    pygame.quit()
+    sys.exit()
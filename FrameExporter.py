@@ -0,0 +1,261 @@
+import pygame
+import numpy as np
+import json
+import multiprocessing
+import multiprocessing.dummy
+import os
+import queue
+import shutil
+import subprocess
+import sys
+import time
+from multiprocessing import shared_memory
+
+FRAME_PATTERN = "frame_{:06d}.{}"
+METADATA_FILE = "export.json"
+
+# Formats pygame writes natively. PNG is the smallest but takes several times
+# longer to compress than a frame takes to draw; TGA is run-length encoded,
+# lossless and fast, which suits the mostly black frames
+FORMATS = ("png", "tga", "bmp")
+
+# Seconds submit() waits for a free slot before checking the writers are still alive
+SLOT_WAIT = 1.0
+
+
+def export_arguments(description, parents=()):
+    """
+    Parse the command-line options shared by the simulations' export mode.
+
+    When --export is given the dummy SDL video driver is selected, so this
+    must run before pygame.display is initialized. Options of other modules,
+    such as FrameProfiler.profile_arguments(), come in through parents.
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(description=description, parents=list(parents))
+    parser.add_argument("--export", metavar="DIR", default=None,
+                        help="render frames offscreen into DIR instead of opening a window")
+    parser.add_argument("--frames", type=int, default=600, help="number of frames to export")
+    parser.add_argument("--fps", type=int, default=60, help="frame rate of the exported sequence")
+    parser.add_argument("--size", type=int, nargs=2, default=None, metavar=("W", "H"), help="frame size")
+    parser.add_argument("--resume", action="store_true", help="continue from the first missing frame")
+    parser.add_argument("--format", choices=FORMATS, default="png", help="image format of the frames")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="frame writer processes")
+    parser.add_argument("--video", default=None, help="also encode the frames to this file with ffmpeg")
+    args = parser.parse_args()
+
+    if args.export:
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+    return args
+
+
+class FrameExporter:
+    """
+    Writes rendered frames to a numbered image sequence with a pool of processes.
+
+    Frames travel through a ring of slots in shared memory: submit() copies
+    the surface's pixels into a free slot and queues only the slot number, so
+    rendering continues while the workers compress and write earlier frames.
+    It blocks only when every slot is waiting for a writer. Frames are
+    written under a temporary name and renamed when complete, so after an
+    interruption every frame on disk is whole and a resumed export starts from
+    the first missing one. Writers are forked, or threads where the platform
+    cannot fork, and a writer that dies stops the export with a RuntimeError
+    instead of leaving submit() waiting for its slots.
+
+    Parameters:
+    - output_dir: Directory for the frames and export.json
+    - workers: Number of writer processes (default: os.cpu_count())
+    - queue_size: Frames that may wait for a writer (default: 16)
+    - resume: Skip frames that are already on disk (default: False)
+    - image_format: One of FORMATS (default: "png")
+    """
+
+    def __init__(self, output_dir, workers=None, queue_size=16, resume=False, image_format="png"):
+        self.output_dir = output_dir
+        self.image_format = image_format
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.queue_size = queue_size
+        os.makedirs(output_dir, exist_ok=True)
+        self.start_frame = self.first_missing() if resume else 0
+        self.submitted = 0
+        self._started = time.perf_counter()
+
+        # Settings recorded by the first run, so a resumed run reproduces it
+        self._metadata_path = os.path.join(output_dir, METADATA_FILE)
+        self.metadata = {}
+        if resume and os.path.exists(self._metadata_path):
+            with open(self._metadata_path) as f:
+                self.metadata = json.load(f)
+
+        # The slot ring and writers start with the first frame, once its size is known
+        self._memory = None
+        self._slots = None
+        self._processes = []
+
+    def frame_path(self, index):
+        return _frame_path(self.output_dir, self.image_format, index)
+
+    def first_missing(self):
+        """Index of the first frame not yet written"""
+        index = 0
+        while os.path.exists(self.frame_path(index)):
+            index += 1
+        return index
+
+    def setting(self, name, value):
+        """Return the value recorded for name by an earlier run, recording value if there is none"""
+        if name not in self.metadata:
+            self.metadata[name] = value
+            with open(self._metadata_path, "w") as f:
+                json.dump(self.metadata, f, indent=2)
+        return self.metadata[name]
+
+    def wants(self, index):
+        """True if frame index still has to be written"""
+        return index >= self.start_frame
+
+    def submit(self, index, surface):
+        """Queue a copy of the surface as frame index (frames before start_frame are skipped)"""
+        if not self.wants(index):
+            return
+        if self._memory is None:
+            self._start(surface.get_size())
+        if surface.get_size() != self._size:
+            raise ValueError(f"Frame size {surface.get_size()} differs from the export's {self._size}")
+
+        # 32-bit 0xRRGGBB pixels are BGRA in memory; setting the unused top
+        # byte while copying makes the frame opaque
+        if surface.get_bitsize() != 32 or surface.get_masks()[:3] != (0xFF0000, 0xFF00, 0xFF) \
+                or surface.get_pitch() != self._size[0] * 4:
+            surface = surface.convert(self._staging)
+        slot = self._free_slot()
+        np.bitwise_or(np.asarray(surface.get_view("1")).reshape(-1), 0xFF000000, out=self._slots[slot])
+        self._work.put((index, slot))
+        self.submitted += 1
+
+    def close(self):
+        """
+        Wait for every queued frame to be written; returns frames written per second.
+
+        Raises RuntimeError if a writer failed, after the shared memory is released.
+        """
+        failed = []
+        if self._memory is not None:
+            try:
+                for process in self._processes:
+                    if process.is_alive():
+                        self._work.put(None)
+                for process in self._processes:
+                    process.join()
+                failed = [p for p in self._processes if p.exitcode]
+            finally:
+                self._slots = None
+                self._memory.close()
+                self._memory.unlink()
+                self._memory = None
+        if failed:
+            raise RuntimeError(f"{len(failed)} frame writer(s) failed, exit code {failed[0].exitcode}; "
+                               f"frames in {self.output_dir} are incomplete")
+        elapsed = time.perf_counter() - self._started
+        return self.submitted / elapsed if elapsed > 0 else 0.0
+
+    def encode_video(self, path, fps=60):
+        """Encode the frame sequence with ffmpeg, if it is installed; returns True on success"""
+        ffmpeg = shutil.which("ffmpeg")
+        if ffmpeg is None:
+            print("ffmpeg not found; frames were written but not encoded")
+            return False
+        command = [ffmpeg, "-y", "-loglevel", "error", "-framerate", str(fps),
+                   "-i", os.path.join(self.output_dir, f"frame_%06d.{self.image_format}"),
+                   "-c:v", "libx264", "-pix_fmt", "yuv420p", path]
+        return subprocess.run(command).returncode == 0
+
+    def _free_slot(self):
+        # A writer that died never returns its slots, so waiting blindly could block forever
+        while True:
+            try:
+                return self._free.get(timeout=SLOT_WAIT)
+            except queue.Empty:
+                if not all(process.is_alive() for process in self._processes):
+                    self.close()
+                    raise RuntimeError("A frame writer exited during the export")
+
+    def _start(self, size):
+        self._size = size
+        self._staging = pygame.Surface(size, 0, 32, (0xFF0000, 0xFF00, 0xFF, 0))
+        n_slots = self.queue_size + self.workers
+        pixels = size[0] * size[1]
+        self._memory = shared_memory.SharedMemory(create=True, size=n_slots * pixels * 4)
+        self._slots = np.ndarray((n_slots, pixels), dtype=np.uint32, buffer=self._memory.buf)
+
+        context = _writer_context()
+        self._free = context.Queue()
+        for slot in range(n_slots):
+            self._free.put(slot)
+        self._work = context.Queue()
+        self._processes = [context.Process(target=_write_frames, args=(
+            self._work, self._free, self._memory.name, n_slots, size, self.output_dir, self.image_format))
+            for _ in range(self.workers)]
+        for process in self._processes:
+            # Set here rather than passed in: the thread fallback takes no daemon argument
+            process.daemon = True
+            process.start()
+
+
+def _writer_context():
+    # Spawned writers would re-import the simulation scripts, which run at
+    # import time, so fork where the platform can and fall back to threads
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return multiprocessing.dummy
+
+
+def _frame_path(output_dir, image_format, index):
+    return os.path.join(output_dir, FRAME_PATTERN.format(index, image_format))
+
+
+def _write_frames(work, free, memory_name, n_slots, size, output_dir, image_format):
+    memory = shared_memory.SharedMemory(name=memory_name)
+    frame_bytes = size[0] * size[1] * 4
+    while True:
+        item = work.get()
+        if item is None:
+            break
+        index, slot = item
+        path = _frame_path(output_dir, image_format, index)
+        # Keep the extension last so pygame picks the format
+        root, extension = os.path.splitext(path)
+        temporary = root + ".tmp" + extension
+        frame = pygame.image.frombuffer(memory.buf[slot * frame_bytes:(slot + 1) * frame_bytes], size, "BGRA")
+        pygame.image.save(frame, temporary)
+        del frame
+        os.replace(temporary, path)
+        free.put(slot)
+    memory.close()
+
+
+def report(exporter, fps):
+    """Wait for the writers and print how the export compared with real time"""
+    written_fps = exporter.close()
+    print(f"Exported {exporter.submitted} frames from frame {exporter.start_frame} to {exporter.output_dir} "
+          f"at {written_fps:.1f} frames/s ({written_fps / fps:.1f}x real time)")
+
+
+if __name__ == "__main__":
+    # Throughput of the writer pool alone, on a frame of noise
+    import tempfile
+
+    pygame.init()
+    size = (1000, 800)
+    surface = pygame.Surface(size)
+    pygame.surfarray.blit_array(surface, np.random.default_rng(0).integers(0, 255, size + (3,), dtype=np.uint8))
+    for image_format in FORMATS:
+        for workers in sorted({1, os.cpu_count() or 1}):
+            with tempfile.TemporaryDirectory() as directory:
+                exporter = FrameExporter(directory, workers, image_format=image_format)
+                for i in range(60):
+                    exporter.submit(i, surface)
+                print(f"{image_format}, {workers} writer(s): {exporter.close():.1f} frames/s")
+    sys.exit()
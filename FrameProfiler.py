@@ -0,0 +1,276 @@
+import pygame
+import numpy as np
+import csv
+import sys
+import time
+
+from RingBuffer import RingBuffer
+
+# Colors of the flame bar's segments, in stage order
+STAGE_COLORS = [(230, 90, 90), (240, 170, 60), (220, 220, 80), (110, 210, 110), (80, 200, 220),
+                (100, 130, 240), (180, 110, 230), (230, 120, 190), (150, 110, 70), (60, 150, 120),
+                (90, 90, 90), (170, 170, 170)]
+
+PERCENTILES = (50, 95, 99)
+
+
+def profile_arguments():
+    """Command-line options for the profiler, to pass as a parent parser"""
+    import argparse
+
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument("--profile", action="store_true", help="start with the frame-time overlay shown (P toggles it)")
+    parser.add_argument("--profile-csv", metavar="PATH", default=None,
+                        help="write every frame's stage timings to PATH as CSV")
+    parser.add_argument("--profile-frames", type=int, metavar="N", default=None,
+                        help="quit after N frames, for runs of a fixed length")
+    return parser
+
+
+class _Scope:
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        self.profiler._add(self.name, elapsed)
+        # Carve the scope out of the lap it is nested in
+        self.profiler._scoped += elapsed
+        return False
+
+
+class FrameProfiler:
+    """
+    Per-frame timings of the named stages of a render loop.
+
+    Call frame() once at the top of every loop iteration, then either mark()
+    at the end of each stage, which charges the time since the previous mark
+    to that stage, or wrap a call in scope(), which charges only the time
+    inside it. Time spent in a scope is left out of the lap around it, and
+    time not covered by any stage shows up as "other". Both cost one
+    perf_counter call, so they can stay in the loop when the overlay is hidden.
+
+    The last `history` frames of every stage are kept in ring buffers, and
+    their p50/p95/p99 are refreshed every `update_every` frames for the
+    overlay. With csv_path every frame is also written out as one row of
+    milliseconds, so two runs can be compared with the __main__ report.
+
+    Parameters:
+    - stages: Stage names in display and CSV column order; stages not listed
+      are added when first seen, but not to a CSV already started (default: ())
+    - history: Number of frames the percentiles cover (default: 300)
+    - update_every: Frames between percentile updates (default: 30)
+    - csv_path: File for per-frame timings (default: None)
+    - budget: Frame time the bar is scaled against, in seconds (default: 1/60)
+    """
+
+    def __init__(self, stages=(), history=300, update_every=30, csv_path=None, budget=1 / 60):
+        self.history = history
+        self.update_every = update_every
+        self.budget = budget
+        self.visible = False
+
+        self.stages = []
+        self._buffers = {}
+        self._totals = RingBuffer(history)
+        for name in stages:
+            self._add_stage(name)
+
+        # The frame being timed, in seconds
+        self._current = {}
+        self._frame_start = None
+        self._last = None
+        self._scoped = 0.0
+        self.frames = 0
+
+        # Rolling percentiles in ms: name -> (p50, p95, p99), "frame" for the whole frame
+        self.percentiles = {}
+
+        self._csv_file = None
+        self._csv = None
+        self._columns = None
+        self._dropped = set()
+        if csv_path is not None:
+            self._csv_file = open(csv_path, "w", newline="")
+            self._csv = csv.writer(self._csv_file)
+
+    def frame(self):
+        """Close the previous frame, if any, and start timing a new one"""
+        now = time.perf_counter()
+        if self._frame_start is not None:
+            self._end_frame(now)
+        self._frame_start = self._last = now
+        self._scoped = 0.0
+        self._current = {}
+
+    def mark(self, name):
+        """Charge the time since the previous mark (less any scopes) to stage name"""
+        now = time.perf_counter()
+        self._add(name, now - self._last - self._scoped)
+        self._last = now
+        self._scoped = 0.0
+
+    def scope(self, name):
+        """Context manager charging the time spent inside it to stage name"""
+        return _Scope(self, name)
+
+    def toggle(self):
+        self.visible = not self.visible
+
+    def close(self):
+        """Record the frame in progress, if any stage was timed in it, then flush and close the CSV file"""
+        if self._frame_start is not None and self._current:
+            self._end_frame(time.perf_counter())
+        self._frame_start = None
+        if self._csv_file is not None:
+            self._csv_file.close()
+            self._csv_file = self._csv = None
+
+    def _add(self, name, elapsed):
+        self._current[name] = self._current.get(name, 0.0) + elapsed
+
+    def _add_stage(self, name):
+        self.stages.append(name)
+        self._buffers[name] = RingBuffer(self.history)
+        # A stage first seen mid-run took no time in the frames before it,
+        # and every window must be as long as the totals' for the percentiles
+        self._buffers[name].extend(np.zeros(len(self._totals)))
+
+    def _end_frame(self, now):
+        total = now - self._frame_start
+        other = total - sum(self._current.values())
+        if other > 0:
+            self._current["other"] = self._current.get("other", 0.0) + other
+
+        for name in self._current:
+            if name not in self._buffers:
+                self._add_stage(name)
+        for name in self.stages:
+            self._buffers[name].append(self._current.get(name, 0.0))
+        self._totals.append(total)
+
+        if self._csv is not None:
+            self._write_row(total)
+        self.frames += 1
+        if self.frames % self.update_every == 0 or self.frames == 1:
+            self._update_percentiles()
+
+    def _write_row(self, total):
+        if self._columns is None:
+            # Columns are fixed by the first frame; "other" always comes last
+            self._columns = [name for name in self.stages if name != "other"] + ["other"]
+            self._csv.writerow(["frame", "total"] + self._columns)
+        for name in self._current:
+            if name not in self._columns and name not in self._dropped:
+                self._dropped.add(name)
+                print(f"Stage {name!r} started after the CSV header; it is counted in no column")
+        self._csv.writerow([self.frames, f"{total * 1000:.4f}"] +
+                           [f"{self._current.get(name, 0.0) * 1000:.4f}" for name in self._columns])
+
+    def _update_percentiles(self):
+        # One percentile call over every stage's window
+        names = self.stages + ["frame"]
+        windows = np.vstack([self._buffers[name].view() for name in self.stages] + [self._totals.view()])
+        values = np.percentile(windows, PERCENTILES, axis=1).T * 1000
+        self.percentiles = {name: tuple(row) for name, row in zip(names, values)}
+
+    def draw(self, screen, font, text_cache, position, bar_width=300, bar_height=12):
+        """
+        Draw the flame bar and the percentile table if the overlay is visible.
+
+        The bar stacks every stage's median time, scaled so the frame budget
+        is two thirds of its width and marked with a white tick.
+
+        Parameters:
+        - screen: Surface to draw on
+        - font: Font for the table
+        - text_cache: Hud.TextCache for the table's lines
+        - position: Top-left corner (x, y)
+        - bar_width, bar_height: Size of the bar in pixels (default: 300, 12)
+        """
+        if not self.visible or not self.percentiles:
+            return
+        x, y = position
+        scale = bar_width * 2 / 3 / (self.budget * 1000)
+
+        pygame.draw.rect(screen, (30, 30, 30), (x, y, bar_width, bar_height))
+        left = x
+        for i, name in enumerate(self.stages):
+            if name not in self.percentiles:
+                # Seen since the last update
+                continue
+            width = self.percentiles[name][0] * scale
+            if left + width > x + bar_width:
+                width = x + bar_width - left
+            if width >= 1:
+                pygame.draw.rect(screen, STAGE_COLORS[i % len(STAGE_COLORS)], (int(left), y, int(width), bar_height))
+            left += width
+        budget_x = x + int(bar_width * 2 / 3)
+        pygame.draw.line(screen, (255, 255, 255), (budget_x, y - 3), (budget_x, y + bar_height + 2), 1)
+        pygame.draw.rect(screen, (80, 80, 80), (x, y, bar_width, bar_height), 1)
+
+        # One line per stage with a swatch of its bar color
+        line_y = y + bar_height + 6
+        line_height = font.get_linesize()
+        rows = [("frame", (255, 255, 255))] + [(name, STAGE_COLORS[i % len(STAGE_COLORS)])
+                                                 for i, name in enumerate(self.stages) if name in self.percentiles]
+        for name, color in rows:
+            p50, p95, p99 = self.percentiles[name]
+            text = text_cache.render_line(f"profiler {name}", font,
+                                          f"{name:<12} {p50:6.2f} {p95:6.2f} {p99:6.2f} ms", (255, 255, 255))
+            pygame.draw.rect(screen, color, (x, line_y + line_height // 4, line_height // 2, line_height // 2))
+            screen.blit(text, (x + line_height, line_y))
+            line_y += line_height
+
+
+def load_timings(path):
+    """Read a CSV written by FrameProfiler into {column: array of ms}, without the frame numbers"""
+    with open(path, newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        rows = np.array([[float(value) for value in row] for row in reader]).reshape(-1, len(header))
+    return {name: rows[:, i] for i, name in enumerate(header) if name != "frame"}
+
+
+def compare(before_path, after_path, skip=30):
+    """
+    Print per-stage percentiles of two runs side by side with the change in p50.
+
+    The first `skip` frames of each run are dropped, since they include
+    loading and warm-up.
+    """
+    before, after = load_timings(before_path), load_timings(after_path)
+    print(f"{'stage':<14}{'p50':>9}{'p95':>9}{'p99':>9}  |{'p50':>9}{'p95':>9}{'p99':>9}{'change':>10}")
+    for name in list(before) + [name for name in after if name not in before]:
+        cells = []
+        medians = []
+        for run in (before, after):
+            values = run.get(name)
+            if values is None or len(values) <= skip:
+                cells.append(f"{'-':>9}" * 3)
+                medians.append(None)
+                continue
+            p50, p95, p99 = np.percentile(values[skip:], PERCENTILES)
+            cells.append(f"{p50:9.2f}{p95:9.2f}{p99:9.2f}")
+            medians.append(p50)
+        change = ""
+        if None not in medians and medians[0] > 0:
+            change = f"{(medians[1] / medians[0] - 1) * 100:+9.1f}%"
+        print(f"{name:<14}{cells[0]}  |{cells[1]}{change:>10}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compare the per-frame timings of two profiled runs")
+    parser.add_argument("before", help="CSV from --profile-csv of the baseline run")
+    parser.add_argument("after", help="CSV from --profile-csv of the run to compare")
+    parser.add_argument("--skip", type=int, default=30, help="warm-up frames to leave out")
+    args = parser.parse_args()
+    compare(args.before, args.after, args.skip)
+    sys.exit()
@@ -0,0 +1,111 @@
+import pygame
+import sys
+import time
+from collections import OrderedDict
+
+
+class TextCache:
+    """
+    Retained text rendering for the simulation HUDs.
+
+    render() keeps rendered surfaces in an LRU cache keyed by
+    (text, font, color, antialias), which suits titles, legends and controls
+    that repeat every frame. render_line() keeps one surface per named slot and
+    only re-renders it when its text, font or color changes, which suits
+    readouts like the orbit radius without flooding the LRU cache with values
+    that will never be seen again.
+
+    Parameters:
+    - max_entries: Number of surfaces kept by render() (default: 256)
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._surfaces = OrderedDict()
+        self._lines = {}
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, color, antialias=True):
+        key = (text, font, tuple(color), antialias)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self._surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        self._surfaces[key] = surface
+        if len(self._surfaces) > self.max_entries:
+            self._surfaces.popitem(last=False)
+        return surface
+
+    def render_line(self, slot, font, text, color, antialias=True):
+        key = (text, font, tuple(color), antialias)
+        line = self._lines.get(slot)
+        if line is not None and line[0] == key:
+            self.hits += 1
+            return line[1]
+
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        self._lines[slot] = (key, surface)
+        return surface
+
+    def clear(self):
+        self._surfaces.clear()
+        self._lines.clear()
+
+
+def compare_frame_times(frames=600, size=(1000, 800), paused=False):
+    """
+    Time a HUD like EarthOrbitalDecay's drawn with font.render against TextCache.
+
+    With paused=True the readouts hold still, as they do while the simulation
+    is paused or when a value only changes on a key press.
+
+    Returns (uncached ms/frame, cached ms/frame).
+    """
+    screen = pygame.Surface(size)
+    font = pygame.font.SysFont('Arial', 20)
+    white, red, green = (255, 255, 255), (255, 80, 80), (80, 255, 80)
+
+    def hud_lines(n):
+        # Static strings plus readouts that change every frame or every few frames
+        radius = 300 if paused else 300 - n * 0.01
+        return [
+            ("title", 'Earth Orbital Decay Simulation', white),
+            ("controls", 'SPACE: Pause, V: Toggle vector field, F: Toggle fullscreen', white),
+            ("fullscreen", "Fullscreen: OFF (Press F)", white),
+            ("plot", "Vector Magnitudes", white),
+            ("position", 'Position Vector (r)', white),
+            ("radius", f'Current orbit radius: {radius:.1f}', white),
+            ("velocity", f'Velocity magnitude: {radius / 600:.3f} (Decreasing)', red),
+            ("acceleration", f'Acceleration magnitude: {300 / radius:.3f} (Increasing)', green),
+            ("velocity legend", f'Velocity Vector (v), |v| = {radius / 600:.3f}', red),
+            ("acceleration legend", f'Acceleration Vector (a), |a| = {300 / radius:.3f}', green),
+            ("decay", f'Decay rate: {0.05:.4f} (UP/DOWN to adjust)', white),
+        ]
+
+    def run(draw):
+        start = time.perf_counter()
+        for n in range(frames):
+            for i, (slot, text, color) in enumerate(hud_lines(n)):
+                screen.blit(draw(slot, text, color), (20, 20 + i * 30))
+        return (time.perf_counter() - start) * 1000 / frames
+
+    cache = TextCache()
+    uncached_ms = run(lambda slot, text, color: font.render(text, True, color))
+    cached_ms = run(lambda slot, text, color: cache.render_line(slot, font, text, color))
+    return uncached_ms, cached_ms
+
+
+if __name__ == "__main__":
+    pygame.init()
+    for paused in (False, True):
+        uncached_ms, cached_ms = compare_frame_times(paused=paused)
+        state = "paused" if paused else "running"
+        print(f"{state}: font.render {uncached_ms:.3f} ms/frame, TextCache {cached_ms:.3f} ms/frame")
+    pygame.quit()
+    sys.exit()
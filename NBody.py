@@ -0,0 +1,356 @@
+import numpy as np
+import sys
+import time
+
+G = 1.0
+
+# Rows of the pairwise force matrix evaluated at once by the direct method,
+# which bounds its temporary memory to about DIRECT_CHUNK * N values
+DIRECT_CHUNK = 1024
+
+
+def direct_accelerations(pos, mass, softening=2.0):
+    """Exact mutual gravity for all bodies, vectorized O(N²) in row chunks"""
+    n = len(pos)
+    acc = np.zeros((n, 2))
+    x, y = pos[:, 0], pos[:, 1]
+    eps2 = softening ** 2
+    for start in range(0, n, DIRECT_CHUNK):
+        rows = slice(start, start + DIRECT_CHUNK)
+        dx = x[np.newaxis, :] - x[rows, np.newaxis]
+        dy = y[np.newaxis, :] - y[rows, np.newaxis]
+        weight = dx * dx
+        weight += dy * dy
+        weight += eps2
+        weight **= -1.5
+        weight *= mass
+        # A body exerts no force on itself
+        np.fill_diagonal(weight[:, start:], 0.0)
+        # sum_j w_ij (x_j - x_i) = (W x)_i - x_i sum_j w_ij
+        total = weight.sum(axis=1)
+        acc[rows, 0] = weight @ x - x[rows] * total
+        acc[rows, 1] = weight @ y - y[rows] * total
+    return G * acc
+
+
+def _spread_bits(v):
+    """Insert a zero bit between each of the low 16 bits, for Morton codes"""
+    v = v & 0xFFFF
+    v = (v | (v << 8)) & 0x00FF00FF
+    v = (v | (v << 4)) & 0x0F0F0F0F
+    v = (v | (v << 2)) & 0x33333333
+    v = (v | (v << 1)) & 0x55555555
+    return v
+
+
+def build_quadtree(pos, mass, depth):
+    """
+    Build a Barnes-Hut quadtree level by level from Morton codes.
+
+    The bodies are sorted by Morton code once, so every cell on every level
+    is a contiguous run of the sorted bodies. Returns (size, order, levels)
+    where size is the root cell width, order sorts the bodies and levels[l]
+    is a dict with each cell's first and end sorted body, each sorted body's
+    cell index, the cell masses and centers of mass (x, y), and each cell's
+    first child and child count on level l + 1.
+    """
+    x, y = pos[:, 0], pos[:, 1]
+    lo_x, lo_y = x.min(), y.min()
+    size = max(float(x.max() - lo_x), float(y.max() - lo_y), 1e-9) * (1 + 1e-9)
+
+    # Integer grid coordinates at the finest level, then interleaved
+    cells_per_side = 1 << depth
+    scale = cells_per_side / size
+    grid_x = np.minimum(((x - lo_x) * scale).astype(np.uint64), cells_per_side - 1)
+    grid_y = np.minimum(((y - lo_y) * scale).astype(np.uint64), cells_per_side - 1)
+    codes = _spread_bits(grid_x) | (_spread_bits(grid_y) << np.uint64(1))
+    order = np.argsort(codes, kind="stable")
+    codes, x, y, mass = codes[order], x[order], y[order], mass[order]
+    mass_x, mass_y = mass * x, mass * y
+
+    n = len(codes)
+    levels = []
+    for level in range(depth + 1):
+        level_codes = codes >> np.uint64(2 * (depth - level))
+        new_cell = np.empty(n, dtype=bool)
+        new_cell[0] = True
+        np.not_equal(level_codes[1:], level_codes[:-1], out=new_cell[1:])
+        first = np.flatnonzero(new_cell)
+        cell_mass = np.add.reduceat(mass, first)
+        weight = np.maximum(cell_mass, 1e-300)
+        levels.append({"cells": level_codes[first], "first": first, "end": np.append(first[1:], n),
+                       "body_cell": np.cumsum(new_cell) - 1, "mass": cell_mass,
+                       "x": np.add.reduceat(mass_x, first) / weight, "y": np.add.reduceat(mass_y, first) / weight})
+
+    # Children of a cell are the next level's cells whose code shifted by 2 matches
+    for level in range(depth):
+        parents = levels[level + 1]["cells"] >> np.uint64(2)
+        cells = levels[level]["cells"]
+        child_start = np.searchsorted(parents, cells, side="left")
+        levels[level]["child_start"] = child_start
+        levels[level]["child_count"] = np.searchsorted(parents, cells, side="right") - child_start
+
+    return size, order, levels
+
+
+def _expand_ranges(start, counts):
+    """Flat indices start[i] .. start[i] + counts[i] for all i, in order"""
+    before = np.cumsum(counts)
+    total = before[-1] if len(before) else 0
+    before -= counts
+    return np.repeat(start - before, counts) + np.arange(total)
+
+
+def barnes_hut_accelerations(pos, mass, theta=0.7, softening=2.0, depth=None, leaf_size=8):
+    """
+    Approximate mutual gravity with a Barnes-Hut quadtree.
+
+    The tree is walked breadth-first for all bodies at once: every
+    (body, cell) pair on a level is tested with the opening criterion
+    size / distance < theta in one array operation. Far cells contribute as
+    point masses and the rest are expanded into their children. Pairs that
+    reach the leaves are summed body by body, skipping the body itself.
+    The walk runs on the bodies in Morton order, with x and y in separate
+    arrays, and all contributions are summed in one bincount at the end.
+
+    Parameters:
+    - pos, mass: Body positions (n, 2) and masses (n,)
+    - theta: Opening angle; smaller is more accurate and slower (default: 0.7)
+    - softening: Plummer softening length (default: 2.0)
+    - depth: Tree depth (default: None, chosen from leaf_size)
+    - leaf_size: Average bodies per leaf used to pick the depth (default: 8)
+    """
+    n = len(pos)
+    acc = np.zeros((n, 2))
+    if n < 2:
+        return acc
+    if depth is None:
+        depth = int(min(16, max(1, np.ceil(np.log2(n / leaf_size) / 2) + 1)))
+
+    size, order, levels = build_quadtree(pos, mass, depth)
+    x, y, mass = pos[order, 0], pos[order, 1], mass[order]
+    eps2 = softening ** 2
+
+    # (body, x, y) contributions from every level, summed at the end
+    bodies, acc_x, acc_y = [], [], []
+
+    # Every body starts paired with the root cell
+    body = np.arange(n)
+    cell = np.zeros(n, dtype=np.intp)
+    for level, tree in enumerate(levels[:-1]):
+        dx = tree["x"][cell] - x[body]
+        dy = tree["y"][cell] - y[body]
+        r2 = dx * dx + dy * dy
+        # size / distance < theta, and a cell holding the body itself is always opened
+        far = (r2 > (size / (1 << level) / theta) ** 2) & (tree["body_cell"][body] != cell)
+        pairs = np.flatnonzero(far)
+        r2 = r2[pairs] + eps2
+        f = tree["mass"][cell[pairs]] / (r2 * np.sqrt(r2))
+        bodies.append(body[pairs])
+        acc_x.append(f * dx[pairs])
+        acc_y.append(f * dy[pairs])
+
+        # Expand the remaining pairs into (body, child) pairs
+        pairs = np.flatnonzero(~far)
+        body, cell = body[pairs], cell[pairs]
+        counts = tree["child_count"][cell]
+        cell = _expand_ranges(tree["child_start"][cell], counts)
+        body = np.repeat(body, counts)
+
+    # Leaves: sum over their bodies exactly
+    leaf = levels[depth]
+    start = leaf["first"][cell]
+    counts = leaf["end"][cell] - start
+    other = _expand_ranges(start, counts)
+    body = np.repeat(body, counts)
+    pairs = np.flatnonzero(other != body)
+    body, other = body[pairs], other[pairs]
+    dx = x[other] - x[body]
+    dy = y[other] - y[body]
+    r2 = dx * dx + dy * dy + eps2
+    f = mass[other] / (r2 * np.sqrt(r2))
+    bodies.append(body)
+    acc_x.append(f * dx)
+    acc_y.append(f * dy)
+
+    body = np.concatenate(bodies)
+    acc[order, 0] = np.bincount(body, weights=np.concatenate(acc_x), minlength=n)
+    acc[order, 1] = np.bincount(body, weights=np.concatenate(acc_y), minlength=n)
+    return G * acc
+
+
+class NBodySystem:
+    """
+    Bodies orbiting a fixed Sun with real mutual gravity.
+
+    The Sun's pull is exact; mutual gravity uses the direct O(N²) sum for
+    small systems and Barnes-Hut above direct_limit bodies. Bodies are advanced
+    with a kick-drift-kick leapfrog and removed when they fall into the Sun.
+    Positions are relative to the Sun.
+
+    Parameters:
+    - pos, vel, mass: Initial positions (n, 2), velocities (n, 2) and masses (n,)
+    - sun_mass: Mass of the central body; G = 1 (default: 75, a speed of 0.5 at r = 300)
+    - sun_radius: Bodies closer than this are removed (default: 30)
+    - softening: Plummer softening length for mutual gravity (default: 2.0)
+    - theta: Barnes-Hut opening angle (default: 0.7)
+    - method: "direct", "barnes-hut" or "auto" (default: "auto")
+    - direct_limit: Largest system "auto" solves directly (default: 512)
+    """
+
+    def __init__(self, pos, vel, mass, sun_mass=75.0, sun_radius=30, softening=2.0, theta=0.7,
+                 method="auto", direct_limit=512):
+        self.pos = np.array(pos, dtype=np.float64)
+        self.vel = np.array(vel, dtype=np.float64)
+        self.mass = np.array(mass, dtype=np.float64)
+        # Original index of each body, so callers can follow one through removals
+        self.ids = np.arange(len(self.pos))
+        self.sun_mass = sun_mass
+        self.sun_radius = sun_radius
+        self.softening = softening
+        self.theta = theta
+        self.method = method
+        self.direct_limit = direct_limit
+        self.time = 0.0
+        self.acc = self.accelerations()
+        # Snapshots keep one row per original body: every position, then body 0's velocity and acceleration
+        self.state_size = 2 * len(self.pos) + 4
+
+    @classmethod
+    def disk(cls, n, inner=80, outer=450, total_mass=5.0, seed=0, earth_orbit_radius=300, **kwargs):
+        """
+        A disk of n bodies on circular orbits; body 0 is the Earth at earth_orbit_radius.
+
+        Remaining bodies are placed uniformly in area between inner and outer
+        with small random masses summing to total_mass.
+        """
+        rng = np.random.default_rng(seed)
+        sun_mass = kwargs.get("sun_mass", 75.0)
+        radius = np.sqrt(rng.uniform(inner ** 2, outer ** 2, n))
+        angle = rng.uniform(0, 2 * np.pi, n)
+        radius[0], angle[0] = earth_orbit_radius, 0.0
+
+        pos = np.column_stack((radius * np.cos(angle), radius * np.sin(angle)))
+        speed = np.sqrt(G * sun_mass / radius)
+        vel = np.column_stack((-speed * np.sin(angle), speed * np.cos(angle)))
+        mass = rng.uniform(0.5, 1.5, n)
+        mass *= total_mass / mass.sum()
+        return cls(pos, vel, mass, **kwargs)
+
+    def mutual_accelerations(self):
+        method = self.method
+        if method == "auto":
+            method = "direct" if len(self.pos) <= self.direct_limit else "barnes-hut"
+        if method == "direct":
+            return direct_accelerations(self.pos, self.mass, self.softening)
+        return barnes_hut_accelerations(self.pos, self.mass, self.theta, self.softening)
+
+    def accelerations(self):
+        r2 = (self.pos ** 2).sum(axis=1)
+        sun = -G * self.sun_mass * self.pos * r2[:, np.newaxis] ** -1.5
+        return sun + self.mutual_accelerations()
+
+    def step(self, dt):
+        """One kick-drift-kick leapfrog step"""
+        self.vel += self.acc * (dt / 2)
+        self.pos += self.vel * dt
+
+        # Remove bodies that fell into the Sun
+        alive = (self.pos ** 2).sum(axis=1) > self.sun_radius ** 2
+        if not alive.all():
+            self.pos, self.vel, self.mass = self.pos[alive], self.vel[alive], self.mass[alive]
+            self.ids = self.ids[alive]
+
+        self.acc = self.accelerations()
+        self.vel += self.acc * (dt / 2)
+        self.time += dt
+
+    def write_state(self, out):
+        """Fill out with a snapshot of the layout in state_size; removed bodies are NaN"""
+        out[:] = np.nan
+        positions = out[:-4].reshape(-1, 2)
+        positions[self.ids] = self.pos
+        row = self.index_of(0)
+        if row is not None:
+            out[-4:-2], out[-2:] = self.vel[row], self.acc[row]
+
+    def index_of(self, body_id):
+        """Current row of the body with the given original index, or None if it was removed"""
+        rows = np.flatnonzero(self.ids == body_id)
+        return int(rows[0]) if len(rows) else None
+
+
+def frame_rate(n, seconds=5.0, fps=60, size=800, process=True):
+    """
+    Render and physics rates with n bodies stepped on a PhysicsWorker.
+
+    The worker steps the disk at fps steps per second at most, in its own
+    process; this process draws every body each frame, interpolated between
+    the two latest steps, at up to fps frames per second, as the N-body mode
+    of EarthOrbitalDecay.py does. Returns (frames per second, steps per second).
+    """
+    import pygame
+
+    # Through the module: run as a script, this file's own NBodySystem is
+    # __main__'s, which the worker process cannot unpickle
+    from NBody import NBodySystem as system
+    from PhysicsWorker import PhysicsWorker, STEP
+
+    worker = PhysicsWorker(system.disk(n), 2.0, fps, process)
+    surface = pygame.Surface((size, size))
+    color = surface.map_rgb((160, 160, 160))
+    clock = pygame.time.Clock()
+    frames = 0
+    start = time.monotonic()
+    while time.monotonic() - start < seconds:
+        worker.poll()
+        positions = worker.interpolate()[:-4].reshape(-1, 2)
+        points = np.round(positions[np.isfinite(positions[:, 0])] * (size / 1000) + size / 2).astype(np.intp)
+        inside = ((points >= 0) & (points < size)).all(axis=1)
+        surface.fill((0, 0, 0))
+        pixels = pygame.surfarray.pixels2d(surface)
+        pixels[points[inside, 0], points[inside, 1]] = color
+        del pixels
+        clock.tick(fps)
+        frames += 1
+    elapsed = time.monotonic() - start
+    steps = worker.buffer.read()[STEP]
+    worker.stop()
+    return frames / elapsed, steps / elapsed
+
+
+def benchmark(sizes=(100, 500, 1000, 2000, 5000, 10000), theta=0.7, repeats=3, frame_rate_bodies=10000):
+    """
+    Time one force evaluation per method and report the Barnes-Hut error,
+    then the frame rate with frame_rate_bodies on a worker process.
+    """
+    print(f"{'bodies':>8} {'direct (ms)':>12} {'barnes-hut (ms)':>16} {'rms error':>10}")
+    for n in sizes:
+        system = NBodySystem.disk(n, method="direct")
+        pos, mass = system.pos, system.mass
+
+        bh_ms = min(_time_call(barnes_hut_accelerations, pos, mass, theta) for _ in range(repeats))
+        if n <= 20000:
+            direct_ms = min(_time_call(direct_accelerations, pos, mass) for _ in range(repeats))
+            exact = direct_accelerations(pos, mass)
+            approx = barnes_hut_accelerations(pos, mass, theta)
+            error = np.sqrt(((approx - exact) ** 2).sum(axis=1).mean() / (exact ** 2).sum(axis=1).mean())
+            print(f"{n:>8} {direct_ms:>12.2f} {bh_ms:>16.2f} {error:>10.2e}")
+        else:
+            print(f"{n:>8} {'-':>12} {bh_ms:>16.2f} {'-':>10}")
+
+    if frame_rate_bodies:
+        render_fps, physics_hz = frame_rate(frame_rate_bodies)
+        print(f"{frame_rate_bodies} bodies on a worker process: render {render_fps:.1f} FPS, "
+              f"physics {physics_hz:.1f} steps/s")
+
+
+def _time_call(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return (time.perf_counter() - start) * 1000
+
+
+if __name__ == "__main__":
+    benchmark()
+    sys.exit()
@@ -0,0 +1,179 @@
+import numpy as np
+import sympy as sp
+import sys
+import time
+from functools import lru_cache
+
+from OrbitalDecayEngine import acceleration_magnitude, velocity_magnitude
+
+
+@lru_cache(maxsize=None)
+def closed_form():
+    """
+    Derive r(t), angle(t) and the collision time of the decay law with sympy.
+
+    dr/dt = -k v0² (r0/r)² is separable, so t(r) is an integral over r that
+    can be inverted for r(t); the angle follows from dθ/dr = omega / (dr/dt).
+    The expressions are derived once per process and compiled to NumPy.
+
+    Returns a dict of sympy expressions ("radius", "angle", "collision_time")
+    and compiled functions ("radius_fn", "angle_fn", "collision_time_fn").
+    """
+    t, r, rho = sp.symbols("t r rho", positive=True)
+    k, v0, r0, rc = sp.symbols("k v0 r0 r_c", positive=True)
+
+    # Inward speed and angular velocity at radius rho
+    inward_rate = k * v0 ** 2 * (r0 / rho) ** 2
+    omega = v0 * sp.sqrt(rho / r0) / rho
+
+    # Time taken to decay from r0 to r, inverted for the real root r(t)
+    t_of_r = sp.integrate(1 / inward_rate, (rho, r, r0))
+    radius = next(root for root in sp.solve(sp.Eq(t, t_of_r), r) if not root.has(sp.I))
+
+    # Angle swept while decaying from r0 to r, then expressed in t
+    angle_of_r = sp.integrate(omega / inward_rate, (rho, r, r0))
+    angle = angle_of_r.subs(r, radius)
+    collision_time = t_of_r.subs(r, rc)
+
+    args = (t, k, v0, r0)
+    return {
+        "radius": radius,
+        "angle": angle,
+        "collision_time": collision_time,
+        "radius_fn": sp.lambdify(args, radius, "numpy"),
+        "angle_fn": sp.lambdify(args, angle, "numpy"),
+        "collision_time_fn": sp.lambdify((k, v0, r0, rc), collision_time, "numpy"),
+    }
+
+
+class DecayTrajectory:
+    """
+    Orbital decay trajectory evaluated in closed form.
+
+    radius(t) and angle(t) take any array of times and cost O(1) per sample;
+    times after the collision evaluate to NaN. evaluate(t, mode="numerical")
+    integrates with OrbitalIntegrators instead and interpolates, as a fallback
+    and a cross-check for the closed form.
+
+    Parameters:
+    - decay_rate, initial_velocity, initial_orbit_radius: Model parameters (default: 0.05, 0.5, 300)
+    - collision_radius: Sun radius plus Earth radius (default: 40)
+    """
+
+    def __init__(self, decay_rate=0.05, initial_velocity=0.5, initial_orbit_radius=300, collision_radius=40):
+        self.decay_rate = decay_rate
+        self.initial_velocity = initial_velocity
+        self.initial_orbit_radius = initial_orbit_radius
+        self.collision_radius = collision_radius
+        self._forms = closed_form()
+        self.collision_time = float(self._forms["collision_time_fn"](
+            decay_rate, initial_velocity, initial_orbit_radius, collision_radius))
+
+    def _evaluate(self, name, t):
+        t = np.asarray(t, dtype=np.float64)
+        with np.errstate(invalid="ignore"):
+            values = self._forms[name](t, self.decay_rate, self.initial_velocity, self.initial_orbit_radius)
+        values = np.broadcast_to(values, t.shape).astype(np.float64)
+        return np.where((t >= 0) & (t <= self.collision_time), values, np.nan)
+
+    def radius(self, t):
+        return self._evaluate("radius_fn", t)
+
+    def angle(self, t):
+        return self._evaluate("angle_fn", t)
+
+    def velocity(self, t):
+        return velocity_magnitude(self.radius(t), self.initial_velocity, self.initial_orbit_radius)
+
+    def acceleration(self, t):
+        return acceleration_magnitude(self.radius(t), self.initial_velocity, self.initial_orbit_radius)
+
+    def evaluate(self, t, mode="analytic", method="rk45", **options):
+        """
+        Return (radius, angle) at times t.
+
+        mode="numerical" integrates with the given OrbitalIntegrators method up
+        to the last requested time and interpolates the steps.
+        """
+        if mode == "analytic":
+            return self.radius(t), self.angle(t)
+        if mode != "numerical":
+            raise ValueError(f"Unknown mode {mode!r}; use 'analytic' or 'numerical'")
+
+        from OrbitalIntegrators import DecayModel, integrate
+
+        t = np.asarray(t, dtype=np.float64)
+        until = min(float(np.max(t)), self.collision_time) if t.size else 0.0
+        options.setdefault("dt", 1.0)
+        trajectory = integrate(method, self.decay_rate, self.initial_velocity, self.initial_orbit_radius,
+                               self.collision_radius, until=until, **options)
+
+        # Cubic Hermite interpolation between steps, using the model's rates as slopes
+        model = DecayModel(self.decay_rate, self.initial_velocity, self.initial_orbit_radius)
+        steps_t = np.concatenate(([0.0], trajectory.t))
+        steps_radius = np.concatenate(([float(self.initial_orbit_radius)], trajectory.radius))
+        steps_angle = np.concatenate(([0.0], trajectory.angle))
+        omega = np.array([model.omega(r) for r in steps_radius])
+        rate = np.array([model.radial_rate(r) for r in steps_radius])
+        radius = _hermite(t, steps_t, steps_radius, rate)
+        angle = _hermite(t, steps_t, steps_angle, omega)
+
+        outside = (t < 0) | (t > steps_t[-1])
+        return np.where(outside, np.nan, radius), np.where(outside, np.nan, angle)
+
+    def check(self, samples=1000, rtol=1e-6, method="rk45", **options):
+        """
+        Compare the closed form against numerical integration at sample times.
+
+        Returns the largest relative difference in radius and angle; raises
+        AssertionError if either exceeds rtol.
+        """
+        t = np.linspace(0, self.collision_time, samples)
+        analytic_radius, analytic_angle = self.evaluate(t)
+        options.setdefault("rtol", 1e-10)
+        options.setdefault("atol", 1e-12)
+        numeric_radius, numeric_angle = self.evaluate(t, "numerical", method, **options)
+
+        radius_error = np.nanmax(np.abs(numeric_radius - analytic_radius) / analytic_radius)
+        angle_error = np.nanmax(np.abs(numeric_angle - analytic_angle) / np.maximum(np.abs(analytic_angle), 1.0))
+        if not (radius_error <= rtol and angle_error <= rtol):
+            raise AssertionError(f"closed form disagrees with {method}: radius {radius_error:.2e}, "
+                                 f"angle {angle_error:.2e} (rtol {rtol:.0e})")
+        return radius_error, angle_error
+
+
+def _hermite(t, knots, values, slopes):
+    """Piecewise cubic Hermite interpolation of values with known slopes"""
+    if len(knots) < 2:
+        return np.full(np.shape(t), values[0])
+    i = np.clip(np.searchsorted(knots, t, side="right") - 1, 0, len(knots) - 2)
+    h = knots[i + 1] - knots[i]
+    s = (t - knots[i]) / h
+    h00 = (1 + 2 * s) * (1 - s) ** 2
+    h10 = s * (1 - s) ** 2
+    h01 = s ** 2 * (3 - 2 * s)
+    h11 = s ** 2 * (s - 1)
+    return h00 * values[i] + h10 * h * slopes[i] + h01 * values[i + 1] + h11 * h * slopes[i + 1]
+
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    forms = closed_form()
+    derive_s = time.perf_counter() - start
+    print(f"Derived in {derive_s:.2f}s")
+    print(f"  r(t) = {forms['radius']}")
+    print(f"  angle(t) = {forms['angle']}")
+    print(f"  collision time = {forms['collision_time']}")
+
+    trajectory = DecayTrajectory()
+    print(f"Collision at t = {trajectory.collision_time:.6f}")
+
+    t = np.linspace(0, trajectory.collision_time, 10_000_000)
+    start = time.perf_counter()
+    trajectory.radius(t)
+    trajectory.angle(t)
+    print(f"Evaluated {len(t)} samples in {time.perf_counter() - start:.3f}s")
+
+    radius_error, angle_error = trajectory.check()
+    print(f"Consistency with rk45: radius {radius_error:.2e}, angle {angle_error:.2e}")
+    sys.exit()
@@ -0,0 +1,240 @@
+import numpy as np
+import sys
+import time
+from collections import namedtuple
+
+# Result of a headless run. Arrays hold one entry per step: the time and
+# position after the step and the speed and acceleration used during it.
+Trajectory = namedtuple("Trajectory", [
+    "t", "angle", "radius", "velocity", "acceleration",
+    "collision_time", "steps", "wall_time",
+])
+
+
+def velocity_magnitude(orbit_radius, initial_velocity, initial_orbit_radius):
+    """Orbital speed, which decreases as the orbit decays"""
+    return initial_velocity * np.sqrt(orbit_radius / initial_orbit_radius)
+
+
+def acceleration_magnitude(orbit_radius, initial_velocity, initial_orbit_radius):
+    """Inverse square pull toward the Sun (closer = stronger)"""
+    return initial_velocity ** 2 * (initial_orbit_radius / orbit_radius) ** 2
+
+
+def _euler_step(angle, omega, radius, initial_velocity, initial_orbit_radius, decay_rate, dt):
+    """
+    One forward Euler step, shared by step(), run() and OrbitalDecaySweep.
+
+    Works on floats or on NumPy arrays of lanes; arrays of angle and radius
+    are updated in place. Returns the new (angle, omega, radius) and the
+    speed and acceleration at the radius the step started from.
+    """
+    # Update angular position
+    angle += omega * dt
+
+    acc = initial_velocity ** 2 * (initial_orbit_radius / radius) ** 2
+    vel = initial_velocity * np.sqrt(radius / initial_orbit_radius)
+
+    # Update omega based on new velocity and radius
+    omega = vel / radius
+
+    # Reduce orbit radius (simulating the Earth being pulled toward the Sun)
+    radius -= decay_rate * acc * dt
+    return angle, omega, radius, vel, acc
+
+
+class OrbitalDecayEngine:
+    """
+    Earth orbital decay physics without a display.
+
+    step() advances the state by one forward Euler step exactly as the
+    interactive simulation did, so EarthOrbitalDecay.py can drive it frame by
+    frame. run() integrates from the initial conditions at full CPU speed.
+
+    Parameters:
+    - initial_orbit_radius: Starting orbit radius (default: 300)
+    - initial_velocity: Starting orbital speed (default: 0.5)
+    - decay_rate: Controls how quickly Earth spirals inward (default: 0.05)
+    - sun_radius, earth_radius: The run ends when the bodies touch (default: 30, 10)
+    """
+
+    def __init__(self, initial_orbit_radius=300, initial_velocity=0.5, decay_rate=0.05,
+                 sun_radius=30, earth_radius=10):
+        self.initial_orbit_radius = initial_orbit_radius
+        self.initial_velocity = initial_velocity
+        self.decay_rate = decay_rate
+        self.sun_radius = sun_radius
+        self.earth_radius = earth_radius
+        self.reset()
+
+    # Values published by write_state(), e.g. for PhysicsWorker snapshots
+    STATE_FIELDS = ("angle", "orbit_radius", "vel_magnitude", "acc_magnitude")
+    state_size = len(STATE_FIELDS)
+
+    @property
+    def collision_radius(self):
+        return self.sun_radius + self.earth_radius
+
+    def reset(self):
+        self.time = 0.0
+        self.angle = 0.0
+        self.orbit_radius = self.initial_orbit_radius
+        self.omega = self.initial_velocity / self.initial_orbit_radius  # Initial angular velocity
+        self.vel_magnitude = self.initial_velocity
+        self.acc_magnitude = self.initial_velocity ** 2
+        self.collided = False
+
+    def velocity(self):
+        """Orbital speed at the current radius"""
+        return velocity_magnitude(self.orbit_radius, self.initial_velocity, self.initial_orbit_radius)
+
+    def acceleration(self):
+        """Acceleration magnitude at the current radius"""
+        return acceleration_magnitude(self.orbit_radius, self.initial_velocity, self.initial_orbit_radius)
+
+    def write_state(self, out):
+        """Copy STATE_FIELDS into the array out"""
+        out[:] = [getattr(self, field) for field in self.STATE_FIELDS]
+
+    def step(self, dt):
+        """Advance one step; returns True once Earth has hit the Sun"""
+        self.angle, self.omega, self.orbit_radius, self.vel_magnitude, self.acc_magnitude = _euler_step(
+            self.angle, self.omega, self.orbit_radius, self.initial_velocity, self.initial_orbit_radius,
+            self.decay_rate, dt)
+        self.time += dt
+
+        # Check if Earth has hit the Sun
+        if self.orbit_radius <= self.collision_radius:
+            self.collided = True
+        return self.collided
+
+    def run(self, decay_rate=None, dt=0.1, until=None, max_steps=10_000_000, method="euler", **options):
+        """
+        Integrate from the initial conditions without a display.
+
+        Parameters:
+        - decay_rate: Decay rate for this run only; the engine's own is kept (default: None)
+        - dt: Time step, or the initial step for "rk45" (default: 0.1, one frame of
+          the interactive simulation)
+        - until: Stop time; None runs until collision (default: None)
+        - max_steps: Safety limit on the number of steps (default: 10 million)
+        - method: "euler" for the interactive simulation's own scheme, "analytic"
+          for the closed form sampled every dt, or one of OrbitalIntegrators.METHODS;
+          options such as rtol/atol are passed on
+
+        Returns a Trajectory; collision_time is None if the run ended first.
+        """
+        previous = self.decay_rate
+        if decay_rate is not None:
+            self.decay_rate = decay_rate
+        try:
+            return self._run(dt, until, max_steps, method, options)
+        finally:
+            self.decay_rate = previous
+
+    def _run(self, dt, until, max_steps, method, options):
+        self.reset()
+
+        if method == "analytic":
+            return self._run_analytic(dt, until, max_steps)
+        if method != "euler":
+            from OrbitalIntegrators import integrate
+
+            trajectory = integrate(method, self.decay_rate, self.initial_velocity, self.initial_orbit_radius,
+                                   self.collision_radius, dt, until, max_steps=max_steps, **options)
+            if trajectory.steps:
+                self.time, self.angle, self.orbit_radius = trajectory.t[-1], trajectory.angle[-1], \
+                    trajectory.radius[-1]
+                self.omega = self.velocity() / self.orbit_radius
+                self.vel_magnitude, self.acc_magnitude = self.velocity(), self.acceleration()
+            self.collided = trajectory.collision_time is not None
+            return trajectory
+
+        # The recurrence is sequential, so keep the loop on plain floats and
+        # convert to arrays once at the end
+        v0, r0 = self.initial_velocity, self.initial_orbit_radius
+        k = self.decay_rate
+        collision_radius = self.collision_radius
+        angle, omega, radius, t = 0.0, v0 / r0, float(r0), 0.0
+        if until is not None:
+            max_steps = min(max_steps, int(np.ceil(until / dt - 1e-9)))
+
+        times, angles, radii, velocities, accelerations = [], [], [], [], []
+        collision_time = None
+        start = time.perf_counter()
+        for _ in range(max_steps):
+            angle, omega, radius, vel, acc = _euler_step(angle, omega, radius, v0, r0, k, dt)
+            t += dt
+
+            times.append(t)
+            angles.append(angle)
+            radii.append(radius)
+            velocities.append(vel)
+            accelerations.append(acc)
+
+            if radius <= collision_radius:
+                collision_time = t
+                break
+        wall_time = time.perf_counter() - start
+
+        # Leave the engine at the final state
+        self.time, self.angle, self.omega, self.orbit_radius = t, angle, omega, radius
+        if times:
+            self.vel_magnitude, self.acc_magnitude = velocities[-1], accelerations[-1]
+        self.collided = collision_time is not None
+
+        return Trajectory(np.array(times), np.array(angles), np.array(radii),
+                          np.array(velocities), np.array(accelerations),
+                          collision_time, len(times), wall_time)
+
+    def _run_analytic(self, dt, until, max_steps):
+        from OrbitalDecayAnalytic import DecayTrajectory
+
+        start = time.perf_counter()
+        exact = DecayTrajectory(self.decay_rate, self.initial_velocity, self.initial_orbit_radius,
+                                self.collision_radius)
+        end = exact.collision_time if until is None else min(until, exact.collision_time)
+        n = min(max_steps, int(np.ceil(end / dt - 1e-9)))
+
+        # Sample every dt and finish exactly at the collision (or the stop time)
+        t = dt * np.arange(1, n + 1)
+        t[-1:] = np.minimum(t[-1:], end)
+        radius, angle = exact.evaluate(t)
+        wall_time = time.perf_counter() - start
+
+        collided = n > 0 and t[-1] == exact.collision_time
+        if n:
+            self.time, self.angle, self.orbit_radius = t[-1], angle[-1], radius[-1]
+            self.omega = self.velocity() / self.orbit_radius
+            self.vel_magnitude, self.acc_magnitude = self.velocity(), self.acceleration()
+        self.collided = collided
+
+        return Trajectory(t, angle, radius, exact.velocity(t), exact.acceleration(t),
+                          exact.collision_time if collided else None, n, wall_time)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the Earth orbital decay model without a display")
+    parser.add_argument("--decay-rate", type=float, default=0.05)
+    parser.add_argument("--initial-velocity", type=float, default=0.5)
+    parser.add_argument("--initial-orbit-radius", type=float, default=300)
+    parser.add_argument("--dt", type=float, default=0.1)
+    parser.add_argument("--until", type=float, default=None, help="stop time (default: run until collision)")
+    parser.add_argument("--method", default="euler", help="euler, analytic, rk4, leapfrog or rk45")
+    args = parser.parse_args()
+
+    engine = OrbitalDecayEngine(args.initial_orbit_radius, args.initial_velocity)
+    trajectory = engine.run(args.decay_rate, args.dt, until=args.until, method=args.method)
+
+    if trajectory.steps == 0:
+        print(f"No steps taken before t = {args.until}")
+    elif trajectory.collision_time is None:
+        print(f"No collision by t = {trajectory.t[-1]:.1f} (radius {trajectory.radius[-1]:.2f})")
+    else:
+        print(f"Collision at t = {trajectory.collision_time:.1f}")
+    # 60 steps per second in the interactive simulation
+    print(f"{trajectory.steps} steps in {trajectory.wall_time:.3f}s "
+          f"({trajectory.steps / 60:.0f}s of interactive playback)")
+    sys.exit()
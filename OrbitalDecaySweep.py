@@ -0,0 +1,209 @@
+import numpy as np
+import itertools
+import os
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from OrbitalDecayEngine import _euler_step
+
+# One entry per parameter set. The *_samples arrays are (lanes, samples),
+# recorded every record_every steps, as many samples as the longest run
+# needed and padded with NaN after a lane ends; they are None when
+# trajectories are not recorded.
+SweepResult = namedtuple("SweepResult", [
+    "decay_rate", "initial_velocity", "initial_orbit_radius", "dt",
+    "collision_time", "steps", "final_radius", "final_angle",
+    "t_samples", "radius_samples", "angle_samples",
+])
+
+# Below this many running lanes the per-step NumPy overhead outweighs the
+# batching, so the stragglers are finished with a plain float loop
+SCALAR_TAIL_LANES = 4
+
+COLUMNS = ("decay_rate", "initial_velocity", "initial_orbit_radius", "dt",
+           "collision_time", "steps", "final_radius", "final_angle")
+
+
+def parameter_grid(decay_rates, initial_velocities, initial_orbit_radii, dts):
+    """Every combination of the given values as four flat arrays"""
+    combos = np.array(list(itertools.product(decay_rates, initial_velocities, initial_orbit_radii, dts)),
+                      dtype=np.float64).reshape(-1, 4)
+    return combos[:, 0], combos[:, 1], combos[:, 2], combos[:, 3]
+
+
+def sweep(decay_rate, initial_velocity, initial_orbit_radius, dt, sun_radius=30, earth_radius=10,
+          max_steps=1_000_000, record_every=None, workers=1, chunk_size=1024):
+    """
+    Run the orbital decay model for many parameter sets in lock-step.
+
+    Each parameter set is a lane of one NumPy state array and every step
+    advances all running lanes with OrbitalDecayEngine's own forward Euler
+    step. Lanes drop out of the state as soon as they collide, so the
+    remaining work shrinks as the sweep proceeds.
+
+    Parameters:
+    - decay_rate, initial_velocity, initial_orbit_radius, dt: Scalars or arrays,
+      broadcast against each other (see parameter_grid for a full grid)
+    - sun_radius, earth_radius: Lanes end when the bodies touch (default: 30, 10)
+    - max_steps: Per-lane step limit; lanes still running get NaN collision times
+    - record_every: Record t, radius and angle every this many steps (default: None, off)
+    - workers: Processes to spread chunks of lanes across (default: 1, in-process)
+    - chunk_size: Lanes per worker task (default: 1024)
+
+    Returns a SweepResult.
+    """
+    params = [np.ravel(p).astype(np.float64) for p in
+              np.broadcast_arrays(decay_rate, initial_velocity, initial_orbit_radius, dt)]
+    n = len(params[0])
+    # An empty grid still makes one empty chunk, so the columns come back empty
+    tasks = [(tuple(p[i:i + chunk_size] for p in params), sun_radius + earth_radius, max_steps, record_every)
+             for i in range(0, max(n, 1), chunk_size)]
+
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_sweep_chunk, tasks))
+    else:
+        parts = [_sweep_chunk(task) for task in tasks]
+
+    outputs = [np.concatenate([part[i] for part in parts]) for i in range(4)]
+    samples = [None] * 3
+    if record_every:
+        # Chunks record only as many samples as their own lanes ran for
+        width = max(part[4].shape[1] for part in parts)
+        samples = [np.concatenate([_pad_columns(part[4 + i], width) for part in parts]) for i in range(3)]
+    return SweepResult(*params, *outputs, *samples)
+
+
+def _pad_columns(samples, width):
+    if samples.shape[1] == width:
+        return samples
+    return np.concatenate([samples, np.full((len(samples), width - samples.shape[1]), np.nan)], axis=1)
+
+
+def _grow_recordings(recorded, column, n_samples):
+    # Double the recordings' width, enough for column and at most n_samples
+    width = min(max(2 * recorded[0].shape[1], column + 1), n_samples)
+    return [_pad_columns(out, width) for out in recorded]
+
+
+def _sweep_chunk(task):
+    (k, v0, r0, dt), collision_radius, max_steps, record_every = task
+    n = len(k)
+
+    collision_time = np.full(n, np.nan)
+    steps = np.zeros(n, dtype=np.int64)
+    final_radius = np.empty(n)
+    final_angle = np.empty(n)
+    if record_every:
+        # Grown as the lanes run rather than sized for max_steps, which could
+        # take gigabytes for runs that collide after a few thousand steps
+        n_samples = max_steps // record_every
+        recorded = [np.full((n, min(n_samples, 64)), np.nan) for _ in range(3)]
+        used = 0
+
+    # State of the running lanes only; lane holds each row's index in the chunk
+    lane = np.arange(n)
+    angle = np.zeros(n)
+    omega = v0 / r0
+    radius = r0.copy()
+    t = np.zeros(n)
+
+    step = 0
+    while step < max_steps and len(lane) > SCALAR_TAIL_LANES:
+        step += 1
+        angle, omega, radius, _, _ = _euler_step(angle, omega, radius, v0, r0, k, dt)
+        t += dt
+
+        if record_every and step % record_every == 0:
+            column = step // record_every - 1
+            if column >= recorded[0].shape[1]:
+                recorded = _grow_recordings(recorded, column, n_samples)
+            used = max(used, column + 1)
+            for out, value in zip(recorded, (t, radius, angle)):
+                out[lane, column] = value
+
+        done = radius <= collision_radius
+        if done.any():
+            # Record the finished lanes and drop them from the state
+            finished = lane[done]
+            collision_time[finished] = t[done]
+            steps[finished] = step
+            final_radius[finished] = radius[done]
+            final_angle[finished] = angle[done]
+
+            keep = ~done
+            lane, angle, omega, radius, t = lane[keep], angle[keep], omega[keep], radius[keep], t[keep]
+            k, v0, r0, dt = k[keep], v0[keep], r0[keep], dt[keep]
+
+    # Finish the remaining lanes one at a time with the same update on floats
+    for i in range(len(lane)):
+        lane_k, lane_v0, lane_r0, lane_dt = float(k[i]), float(v0[i]), float(r0[i]), float(dt[i])
+        lane_angle, lane_omega, lane_radius, lane_t = float(angle[i]), float(omega[i]), float(radius[i]), float(t[i])
+        lane_step = step
+        while lane_step < max_steps:
+            lane_step += 1
+            lane_angle, lane_omega, lane_radius, _, _ = _euler_step(lane_angle, lane_omega, lane_radius, lane_v0,
+                                                                    lane_r0, lane_k, lane_dt)
+            lane_t += lane_dt
+
+            if record_every and lane_step % record_every == 0:
+                column = lane_step // record_every - 1
+                if column >= recorded[0].shape[1]:
+                    recorded = _grow_recordings(recorded, column, n_samples)
+                used = max(used, column + 1)
+                for out, value in zip(recorded, (lane_t, lane_radius, lane_angle)):
+                    out[lane[i], column] = value
+
+            if lane_radius <= collision_radius:
+                collision_time[lane[i]] = lane_t
+                break
+
+        # Lanes that hit max_steps keep a NaN collision time
+        steps[lane[i]] = lane_step
+        final_radius[lane[i]] = lane_radius
+        final_angle[lane[i]] = lane_angle
+
+    result = [collision_time, steps, final_radius, final_angle]
+    if record_every:
+        result += [out[:, :used] for out in recorded]
+    return result
+
+
+def save_columns(result, path):
+    """Write the sweep to a columnar .npz file, one array per column"""
+    columns = {name: getattr(result, name) for name in COLUMNS}
+    if result.t_samples is not None:
+        columns.update(t_samples=result.t_samples, radius_samples=result.radius_samples,
+                       angle_samples=result.angle_samples)
+    np.savez(path, **columns)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Sweep the Earth orbital decay model over a parameter grid")
+    parser.add_argument("--decay-rates", type=float, nargs="+", default=[0.025, 0.05, 0.1, 0.2])
+    parser.add_argument("--initial-velocities", type=float, nargs="+", default=[0.25, 0.5, 1.0])
+    parser.add_argument("--initial-orbit-radii", type=float, nargs="+", default=[150, 300, 450])
+    parser.add_argument("--dts", type=float, nargs="+", default=[0.1])
+    parser.add_argument("--max-steps", type=int, default=1_000_000)
+    parser.add_argument("--record-every", type=int, default=None,
+                        help="also record trajectories every N steps")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunk-size", type=int, default=1024)
+    parser.add_argument("--output", default="sweep.npz")
+    args = parser.parse_args()
+
+    grid = parameter_grid(args.decay_rates, args.initial_velocities, args.initial_orbit_radii, args.dts)
+    start = time.perf_counter()
+    result = sweep(*grid, max_steps=args.max_steps, record_every=args.record_every,
+                   workers=args.workers, chunk_size=args.chunk_size)
+    elapsed = time.perf_counter() - start
+
+    save_columns(result, args.output)
+    collided = np.isfinite(result.collision_time)
+    print(f"{len(result.collision_time)} runs in {elapsed:.2f}s, {collided.sum()} collided, "
+          f"{result.steps.sum()} total steps -> {args.output}")
+    sys.exit()
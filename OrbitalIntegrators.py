@@ -0,0 +1,221 @@
+import numpy as np
+import math
+import sys
+import time
+
+from OrbitalDecayEngine import OrbitalDecayEngine, Trajectory, acceleration_magnitude, velocity_magnitude
+
+# Dormand-Prince 5(4) tableau for the adaptive integrator (the system is
+# autonomous, so the stage times are not needed)
+DP_A = (
+    (),
+    (1 / 5,),
+    (3 / 40, 9 / 40),
+    (44 / 45, -56 / 15, 32 / 9),
+    (19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729),
+    (9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656),
+    (35 / 384, 0.0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84),
+)
+DP_B5 = (35 / 384, 0.0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84, 0.0)
+DP_B4 = (5179 / 57600, 0.0, 7571 / 16695, 393 / 640, -92097 / 339200, 187 / 2100, 1 / 40)
+
+
+class DecayModel:
+    """
+    Right-hand side of the orbital decay law as a first-order system in (angle, radius).
+
+    dr/dt = -decay_rate * |a| = -decay_rate * v0² * (r0/r)²
+    dθ/dt = omega = |v| / r = v0 * sqrt(r/r0) / r
+    """
+
+    def __init__(self, decay_rate, initial_velocity, initial_orbit_radius):
+        self.decay_rate = decay_rate
+        self.initial_velocity = initial_velocity
+        self.initial_orbit_radius = initial_orbit_radius
+
+    def omega(self, radius):
+        if not radius > 0:
+            return math.nan
+        return self.initial_velocity * math.sqrt(radius / self.initial_orbit_radius) / radius
+
+    def radial_rate(self, radius):
+        if not radius > 0:
+            return math.nan
+        return -self.decay_rate * self.initial_velocity ** 2 * (self.initial_orbit_radius / radius) ** 2
+
+    def __call__(self, angle, radius):
+        return self.omega(radius), self.radial_rate(radius)
+
+
+def rk4_step(model, angle, radius, h):
+    """Classical fourth-order Runge-Kutta"""
+    k1a, k1r = model(angle, radius)
+    k2a, k2r = model(angle + h / 2 * k1a, radius + h / 2 * k1r)
+    k3a, k3r = model(angle + h / 2 * k2a, radius + h / 2 * k2r)
+    k4a, k4r = model(angle + h * k3a, radius + h * k3r)
+    return (angle + h / 6 * (k1a + 2 * k2a + 2 * k3a + k4a),
+            radius + h / 6 * (k1r + 2 * k2r + 2 * k3r + k4r))
+
+
+def leapfrog_step(model, angle, radius, h):
+    """
+    Staggered second-order leapfrog.
+
+    The decay law is dissipative rather than Hamiltonian, so this is the
+    kick-drift-kick splitting used as a midpoint rule: the radius is advanced
+    half a step, the angle takes a full drift at that midpoint radius, and the
+    radius completes the step with the midpoint rate.
+    """
+    half_radius = radius + h / 2 * model.radial_rate(radius)
+    omega, rate = model(angle, half_radius)
+    return angle + h * omega, radius + h * rate
+
+
+def dormand_prince_step(model, angle, radius, h):
+    """One Dormand-Prince step; returns the fifth-order state and the error estimate"""
+    ka, kr = [], []
+    for a_row in DP_A:
+        stage_angle = angle + h * sum(a * k for a, k in zip(a_row, ka))
+        stage_radius = radius + h * sum(a * k for a, k in zip(a_row, kr))
+        da, dr = model(stage_angle, stage_radius)
+        ka.append(da)
+        kr.append(dr)
+
+    new_angle = angle + h * sum(b * k for b, k in zip(DP_B5, ka))
+    new_radius = radius + h * sum(b * k for b, k in zip(DP_B5, kr))
+    err_angle = h * sum((b5 - b4) * k for b5, b4, k in zip(DP_B5, DP_B4, ka))
+    err_radius = h * sum((b5 - b4) * k for b5, b4, k in zip(DP_B5, DP_B4, kr))
+    return new_angle, new_radius, err_angle, err_radius
+
+
+def _locate_collision(step, model, angle, radius, h, collision_radius, iterations=60):
+    """Bisect the step size of a step that crosses the collision radius"""
+    lo, hi = 0.0, h
+    best = (0.0, angle, radius)
+    for _ in range(iterations):
+        mid = (lo + hi) / 2
+        new_angle, new_radius = step(model, angle, radius, mid)[:2]
+        if new_radius > collision_radius:
+            lo = mid
+        else:
+            hi = mid
+            if new_radius == new_radius:  # Not NaN
+                best = (mid, new_angle, new_radius)
+        if hi - lo <= 1e-12 * h:
+            break
+    if best[0] == 0.0:
+        best = (hi,) + tuple(step(model, angle, radius, hi)[:2])
+    return best
+
+
+# Fixed-step schemes by name; each maps (model, angle, radius, h) to the next state
+FIXED_STEP_METHODS = {
+    "rk4": rk4_step,
+    "leapfrog": leapfrog_step,
+}
+METHODS = tuple(FIXED_STEP_METHODS) + ("rk45",)
+
+
+def integrate(method, decay_rate=0.05, initial_velocity=0.5, initial_orbit_radius=300, collision_radius=40,
+              dt=0.1, until=None, rtol=1e-8, atol=1e-10, max_steps=10_000_000):
+    """
+    Integrate the decay law with a named method until collision or time `until`.
+
+    Forward Euler is not listed here: OrbitalDecayEngine.run(method="euler")
+    keeps the interactive simulation's own scheme.
+
+    Fixed-step methods use dt throughout; "rk45" starts from dt and adapts it
+    to keep the local error within rtol/atol. The step that crosses the
+    collision radius is bisected so the reported collision time does not
+    depend on where the last step happened to land.
+
+    Returns a Trajectory like OrbitalDecayEngine.run().
+    """
+    model = DecayModel(decay_rate, initial_velocity, initial_orbit_radius)
+    angle, radius, t, h = 0.0, float(initial_orbit_radius), 0.0, dt
+    adaptive = method == "rk45"
+    if adaptive:
+        step = dormand_prince_step
+    elif method in FIXED_STEP_METHODS:
+        step = FIXED_STEP_METHODS[method]
+    else:
+        raise ValueError(f"Unknown integrator {method!r}; choose from {', '.join(METHODS)}")
+
+    times, angles, radii = [], [], []
+    collision_time = None
+    start = time.perf_counter()
+    while len(times) < max_steps:
+        if until is not None:
+            if t >= until:
+                break
+            h = min(h, until - t)
+
+        if adaptive:
+            new_angle, new_radius, err_angle, err_radius = step(model, angle, radius, h)
+            scale_angle = atol + rtol * max(abs(angle), abs(new_angle))
+            scale_radius = atol + rtol * max(abs(radius), abs(new_radius))
+            error = max(abs(err_angle) / scale_angle, abs(err_radius) / scale_radius)
+            if not error <= 1.0:
+                # Reject and retry with a smaller step (NaN means the step overshot r = 0)
+                factor = 0.2 if error != error else max(0.2, 0.9 * error ** -0.2)
+                h *= factor
+                continue
+            next_h = h * min(5.0, 0.9 * error ** -0.2 if error > 0 else 5.0)
+        else:
+            new_angle, new_radius = step(model, angle, radius, h)
+            next_h = h
+
+        if not new_radius > collision_radius:
+            h_hit, new_angle, new_radius = _locate_collision(step, model, angle, radius, h, collision_radius)
+            t += h_hit
+            collision_time = t
+            times.append(t)
+            angles.append(new_angle)
+            radii.append(new_radius)
+            break
+
+        angle, radius, t, h = new_angle, new_radius, t + h, next_h
+        times.append(t)
+        angles.append(angle)
+        radii.append(radius)
+    wall_time = time.perf_counter() - start
+
+    radii = np.array(radii)
+    return Trajectory(np.array(times), np.array(angles), radii,
+                      velocity_magnitude(radii, initial_velocity, initial_orbit_radius),
+                      acceleration_magnitude(radii, initial_velocity, initial_orbit_radius),
+                      collision_time, len(times), wall_time)
+
+
+def compare(decay_rate=0.05, initial_velocity=0.5, initial_orbit_radius=300, collision_radius=40):
+    """Print steps, wall time and collision errors for each integrator"""
+    # Imported here: OrbitalDecayAnalytic imports this module
+    from OrbitalDecayAnalytic import DecayTrajectory
+
+    exact = DecayTrajectory(decay_rate, initial_velocity, initial_orbit_radius, collision_radius)
+    exact_t, exact_angle = exact.collision_time, float(exact.angle(exact.collision_time))
+    runs = [
+        ("euler", 0.1, {}), ("euler", 0.01, {}),
+        ("leapfrog", 1.0, {}), ("leapfrog", 0.1, {}),
+        ("rk4", 10.0, {}), ("rk4", 1.0, {}),
+        ("rk45", 1.0, {"rtol": 1e-6, "atol": 1e-8}), ("rk45", 1.0, {"rtol": 1e-10, "atol": 1e-12}),
+    ]
+
+    print(f"exact collision at t = {exact_t:.6f}, angle = {exact_angle:.6f}")
+    print(f"{'method':>9} {'dt':>6} {'steps':>9} {'wall (s)':>9} {'t error':>11} {'angle error':>12}")
+    for method, dt, options in runs:
+        if method == "euler":
+            engine = OrbitalDecayEngine(initial_orbit_radius, initial_velocity, decay_rate)
+            engine.sun_radius, engine.earth_radius = collision_radius, 0
+            result = engine.run(dt=dt)
+        else:
+            result = integrate(method, decay_rate, initial_velocity, initial_orbit_radius, collision_radius,
+                               dt, **options)
+        t_error = abs(result.collision_time - exact_t)
+        angle_error = abs(result.angle[-1] - exact_angle)
+        print(f"{method:>9} {dt:>6} {result.steps:>9} {result.wall_time:>9.4f} {t_error:>11.2e} {angle_error:>12.2e}")
+
+
+if __name__ == "__main__":
+    compare()
+    sys.exit()
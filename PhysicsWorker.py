@@ -0,0 +1,365 @@
+import numpy as np
+import multiprocessing
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+from multiprocessing import resource_tracker, shared_memory
+from multiprocessing.connection import Connection
+
+# Header of the state block: index of the latest complete slot, a flag the
+# worker sets when the model's run is over and a flag the renderer sets to stop
+HEADER_SIZE = 3
+LATEST, FINISHED, STOP = range(HEADER_SIZE)
+
+# Each slot starts with a sequence number (odd while the slot is being
+# written), the step number, the simulation time and the wall-clock time it
+# was published, followed by the model's state
+SLOT_HEADER = 4
+SEQUENCE, STEP, SIM_TIME, WALL_TIME = range(SLOT_HEADER)
+
+
+class SnapshotBuffer:
+    """
+    Double-buffered block of float64 state, optionally in shared memory.
+
+    The writer fills the slot the reader is not using and then flips the
+    latest index. The reader copies the latest slot and retries if its
+    sequence number changed during the copy, so neither side ever blocks.
+
+    Parameters:
+    - size: Number of state values in a snapshot
+    - shared: Create the block in shared memory for another process (default: False)
+    - name: Attach to an existing shared block by name instead (default: None)
+    """
+
+    def __init__(self, size, shared=False, name=None):
+        self.size = size
+        length = HEADER_SIZE + 2 * (SLOT_HEADER + size)
+        self._shm = None
+        if name is not None:
+            self._shm = shared_memory.SharedMemory(name=name)
+        elif shared:
+            self._shm = shared_memory.SharedMemory(create=True, size=length * 8)
+
+        if self._shm is None:
+            self.block = np.zeros(length)
+        else:
+            self.block = np.ndarray(length, dtype=np.float64, buffer=self._shm.buf)
+            if name is None:
+                self.block[:] = 0
+        self.header = self.block[:HEADER_SIZE]
+        self.slots = self.block[HEADER_SIZE:].reshape(2, SLOT_HEADER + size)
+
+    @property
+    def name(self):
+        """Shared memory name to attach to from another process, or None"""
+        return self._shm.name if self._shm is not None else None
+
+    def publish(self, step, sim_time, state):
+        """Write a snapshot into the back slot and make it the latest"""
+        back = 1 - int(self.header[LATEST])
+        slot = self.slots[back]
+        slot[SEQUENCE] += 1
+        slot[STEP], slot[SIM_TIME], slot[WALL_TIME] = step, sim_time, time.monotonic()
+        slot[SLOT_HEADER:] = state
+        slot[SEQUENCE] += 1
+        self.header[LATEST] = back
+
+    def read(self):
+        """Copy of the latest complete slot (header fields, then state)"""
+        while True:
+            slot = self.slots[int(self.header[LATEST])]
+            sequence = slot[SEQUENCE]
+            snapshot = slot.copy()
+            if sequence % 2 == 0 and snapshot[SEQUENCE] == sequence == slot[SEQUENCE]:
+                return snapshot
+
+    def close(self, unlink=False):
+        """Release the shared memory; the creator should also unlink it"""
+        if self._shm is None:
+            return
+        # Views into the buffer must be gone before it can be closed
+        self.block = self.header = self.slots = None
+        self._shm.close()
+        if unlink:
+            self._shm.unlink()
+
+
+class RotationModel:
+    """
+    A point on a spinning Earth, as driven by VectorSimulation.py.
+
+    The angle is left unwrapped so snapshots interpolate smoothly across
+    full turns; wrap it with % (2 * pi) when drawing.
+    """
+
+    state_size = 1
+
+    def __init__(self, angle=0.0, omega=0.0):
+        self.angle = angle
+        self.omega = omega
+
+    def step(self, dt):
+        self.angle += self.omega * dt
+        return False
+
+    def write_state(self, out):
+        out[0] = self.angle
+
+
+class PhysicsWorker:
+    """
+    Steps a model at a fixed timestep in a background thread or process.
+
+    The worker publishes a snapshot after every step into a SnapshotBuffer.
+    The renderer calls poll() once per frame and draws interpolate(), which
+    blends the two latest snapshots and so trails the physics by one step.
+    A slow frame no longer slows the simulation clock: the worker keeps
+    stepping at its own rate, and the renderer just sees a newer snapshot.
+
+    Parameters:
+    - model: Object with state_size, write_state(out) and step(dt); step returns
+      True when the run is over. set() and call() reach it between steps.
+    - dt: Simulation time per step
+    - rate: Target steps per second of wall-clock time (default: 60)
+    - process: Step in a separate process through shared memory. It is a fresh
+      interpreter rather than a fork, so it is safe to start after pygame.init()
+      or with other threads running; the model's class must be importable from
+      a module. Off POSIX a thread is used instead (default: False, a thread)
+    - manual: Start no worker; the caller advances the model with step() and
+      interpolate() returns the latest state, e.g. for a fixed-dt export (default: False)
+    """
+
+    def __init__(self, model, dt, rate=60, process=False, manual=False):
+        if process and os.name != "posix":
+            print("Worker processes need a POSIX system; stepping the physics in a thread instead")
+            process = False
+        self.dt = dt
+        self.rate = rate
+        self.process = process
+        self.manual = manual
+        self.buffer = SnapshotBuffer(model.state_size, shared=process)
+
+        # Publish the initial state so there is something to draw before the first step
+        state = np.empty(model.state_size)
+        model.write_state(state)
+        self.buffer.publish(0, 0.0, state)
+        self.previous = self.current = self.buffer.read()
+
+        # Physics rate measured from the step numbers the renderer sees
+        self.physics_hz = 0.0
+        self._rate_step, self._rate_time = 0, time.monotonic()
+
+        if manual:
+            self._model, self._state, self._worker = model, state, None
+            return
+        if process:
+            # Not multiprocessing: a forked child would inherit SDL's and the
+            # atlas's threads' state, and a spawned one would re-run the
+            # simulation script, which does its work at import time
+            connection, child = multiprocessing.Pipe()
+            here = os.path.dirname(os.path.abspath(__file__))
+            env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [here, os.environ.get("PYTHONPATH")])))
+            self._worker = subprocess.Popen(
+                [sys.executable, "-c", "import sys, PhysicsWorker; PhysicsWorker._serve(int(sys.argv[1]))",
+                 str(child.fileno())], pass_fds=[child.fileno()], env=env)
+            child.close()
+            connection.send(sys.path)
+            connection.send((model, dt, rate, self.buffer.name, model.state_size))
+            self._commands = _ConnectionQueue(connection)
+        else:
+            self._commands = queue.SimpleQueue()
+            self._worker = threading.Thread(target=_run_worker, daemon=True, args=(
+                model, dt, rate, self.buffer, model.state_size, self._commands))
+            self._worker.start()
+
+    def set(self, name, value):
+        """Set an attribute of the model before its next step ("paused" pauses the worker)"""
+        if self.manual:
+            if name != "paused":
+                setattr(self._model, name, value)
+            return
+        self._commands.put(("set", name, value))
+
+    def call(self, name, *args):
+        """Call a method of the model before its next step"""
+        if self.manual:
+            getattr(self._model, name)(*args)
+            return
+        self._commands.put(("call", name, args))
+
+    def step(self):
+        """Advance a manual worker's model by one step in the calling thread"""
+        if self.buffer.header[FINISHED]:
+            return
+        finished = self._model.step(self.dt)
+        self._model.write_state(self._state)
+        step = self.current[STEP] + 1
+        self.buffer.publish(step, step * self.dt, self._state)
+        if finished:
+            self.buffer.header[FINISHED] = 1
+
+    def poll(self):
+        """Fetch the latest snapshot; returns True if it is new"""
+        snapshot = self.buffer.read()
+        if snapshot[STEP] == self.current[STEP]:
+            return False
+        self.previous, self.current = self.current, snapshot
+
+        now = time.monotonic()
+        if now - self._rate_time >= 0.5:
+            self.physics_hz = (snapshot[STEP] - self._rate_step) / (now - self._rate_time)
+            self._rate_step, self._rate_time = snapshot[STEP], now
+        return True
+
+    def interpolate(self, now=None):
+        """
+        State between the two latest snapshots at wall-clock time now.
+
+        The blend advances over the interval at which those two snapshots
+        arrived, so it adapts when the physics runs slower than its target rate.
+        """
+        if self.manual:
+            return self.current[SLOT_HEADER:].copy()
+        if now is None:
+            now = time.monotonic()
+        span = self.current[WALL_TIME] - self.previous[WALL_TIME]
+        if span <= 0:
+            span = 1.0 / self.rate
+        alpha = min(max((now - self.current[WALL_TIME]) / span, 0.0), 1.0)
+        previous, current = self.previous[SLOT_HEADER:], self.current[SLOT_HEADER:]
+        return previous + (current - previous) * alpha
+
+    @property
+    def state(self):
+        """Latest snapshot's state without interpolation"""
+        return self.current[SLOT_HEADER:]
+
+    @property
+    def sim_time(self):
+        return self.current[SIM_TIME]
+
+    @property
+    def finished(self):
+        """True once the model reported the end of its run"""
+        return bool(self.buffer.header[FINISHED])
+
+    def stop(self):
+        """Stop the worker and release the state block"""
+        if self.buffer.block is None:
+            return
+        self.buffer.header[STOP] = 1
+        if self.process and self._worker is not None:
+            try:
+                self._worker.wait(timeout=2.0)
+            except subprocess.TimeoutExpired:
+                self._worker.kill()
+            self._commands.connection.close()
+        elif self._worker is not None:
+            self._worker.join(timeout=2.0)
+        self.buffer.close(unlink=True)
+
+
+class _ConnectionQueue:
+    """The put() and get_nowait() of a queue, over a Connection to a worker process"""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def put(self, item):
+        self.connection.send(item)
+
+    def get_nowait(self):
+        # Raises EOFError once the other end is closed
+        if not self.connection.poll():
+            raise queue.Empty
+        return self.connection.recv()
+
+
+def _serve(fd):
+    """Entry point of the interpreter PhysicsWorker(process=True) starts"""
+    connection = Connection(fd)
+    sys.path[:] = connection.recv()
+    model, dt, rate, name, size = connection.recv()
+    buffer = SnapshotBuffer(size, name=name)
+    # The renderer owns the block; left registered here, this process's
+    # resource tracker would unlink it on exit as if it had leaked
+    resource_tracker.unregister(buffer._shm._name, "shared_memory")
+    try:
+        _run_worker(model, dt, rate, buffer, size, _ConnectionQueue(connection))
+    except EOFError:
+        # The renderer is gone without stopping the worker
+        pass
+    buffer.close()
+
+
+def _run_worker(model, dt, rate, buffer, size, commands):
+    state = np.empty(size)
+    step, sim_time = 0, 0.0
+    paused = False
+    period = 1.0 / rate
+    next_tick = time.monotonic()
+
+    while not buffer.header[STOP]:
+        # Apply the renderer's commands between steps
+        while True:
+            try:
+                kind, name, value = commands.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "set" and name == "paused":
+                paused = value
+            elif kind == "set":
+                setattr(model, name, value)
+            else:
+                getattr(model, name)(*value)
+
+        if not paused and not buffer.header[FINISHED]:
+            finished = model.step(dt)
+            step += 1
+            sim_time += dt
+            model.write_state(state)
+            buffer.publish(step, sim_time, state)
+            if finished:
+                buffer.header[FINISHED] = 1
+
+        next_tick += period
+        delay = next_tick - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        elif delay < -0.25:
+            # Too far behind to catch up; drop the backlog instead of racing
+            next_tick = time.monotonic()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from OrbitalDecayEngine import OrbitalDecayEngine
+
+    parser = argparse.ArgumentParser(description="Measure physics rate against a render loop of a given cost")
+    parser.add_argument("--rate", type=float, default=60, help="physics steps per second")
+    parser.add_argument("--frame-ms", type=float, default=50, help="simulated cost of one rendered frame")
+    parser.add_argument("--seconds", type=float, default=3)
+    parser.add_argument("--process", action="store_true", help="step in a separate process")
+    args = parser.parse_args()
+
+    worker = PhysicsWorker(OrbitalDecayEngine(), 0.1, args.rate, args.process)
+    frames = 0
+    start = time.monotonic()
+    while time.monotonic() - start < args.seconds:
+        worker.poll()
+        worker.interpolate()
+        # Stand-in for drawing a heavy frame
+        time.sleep(args.frame_ms / 1000)
+        frames += 1
+    elapsed = time.monotonic() - start
+    steps = worker.buffer.read()[STEP]
+    worker.stop()
+
+    print(f"Render: {frames / elapsed:.1f} FPS, physics: {steps / elapsed:.1f} Hz "
+          f"(target {args.rate:g} Hz, sim time {steps * 0.1:.1f})")
+    sys.exit()
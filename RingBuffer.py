@@ -0,0 +1,117 @@
+import numpy as np
+import sys
+import time
+
+
+class RingBuffer:
+    """
+    Fixed-capacity NumPy ring buffer for trails and histories.
+
+    Every sample is written twice, at i and i + capacity, so the newest
+    `capacity` samples are always one contiguous slice of the backing array.
+    Appends are O(1) and view() returns them oldest-first without copying,
+    ready for pygame.draw.lines or NumPy reductions.
+
+    Parameters:
+    - capacity: Maximum number of samples kept
+    - width: Values per sample, e.g. 2 for (x, y) points; None for scalars (default: None)
+    - dtype: Element type (default: float64)
+    """
+
+    def __init__(self, capacity, width=None, dtype=np.float64):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        shape = (2 * capacity,) if width is None else (2 * capacity, width)
+        self._data = np.zeros(shape, dtype=dtype)
+        self._start = 0
+        self._length = 0
+
+    def __len__(self):
+        return self._length
+
+    def __iter__(self):
+        return iter(self.view())
+
+    def __getitem__(self, index):
+        return self.view()[index]
+
+    def __array__(self, dtype=None, copy=None):
+        # NumPy 2 protocol: copy=True always copies, copy=False never does
+        view = self.view()
+        if dtype is not None and np.dtype(dtype) != view.dtype:
+            if copy is False:
+                raise ValueError(f"Converting to {np.dtype(dtype)} needs a copy")
+            return view.astype(dtype)
+        return view.copy() if copy else view
+
+    def append(self, value):
+        # Slot for the new sample, mirrored one capacity further on
+        end = (self._start + self._length) % self.capacity
+        self._data[end] = value
+        self._data[end + self.capacity] = value
+
+        if self._length < self.capacity:
+            self._length += 1
+        else:
+            self._start = (self._start + 1) % self.capacity
+
+    def extend(self, values):
+        """Append many samples at once"""
+        values = np.asarray(values, dtype=self._data.dtype)
+        if len(values) >= self.capacity:
+            # Only the newest `capacity` samples survive
+            values = values[-self.capacity:]
+            self._start = 0
+            self._length = 0
+
+        n = len(values)
+        end = (self._start + self._length) % self.capacity
+        slots = (end + np.arange(n)) % self.capacity
+        self._data[slots] = values
+        self._data[slots + self.capacity] = values
+
+        overflow = max(0, self._length + n - self.capacity)
+        self._length = min(self.capacity, self._length + n)
+        self._start = (self._start + overflow) % self.capacity
+
+    def clear(self):
+        self._start = 0
+        self._length = 0
+
+    def view(self):
+        """Samples oldest-first as a read-only view into the buffer"""
+        view = self._data[self._start:self._start + self._length]
+        view.flags.writeable = False
+        return view
+
+    def last(self):
+        if self._length == 0:
+            raise IndexError("last() on an empty RingBuffer")
+        return self._data[self._start + self._length - 1]
+
+
+def benchmark(capacities=(100, 10000, 1000000), appends=100000):
+    """Compare list append + slice trimming against RingBuffer appends"""
+    print(f"{'capacity':>10} {'list (us/append)':>17} {'ring (us/append)':>17}")
+    for capacity in capacities:
+        trail = []
+        start = time.perf_counter()
+        for i in range(appends):
+            trail.append((i, i))
+            if len(trail) > capacity:
+                trail = trail[-capacity:]
+        list_us = (time.perf_counter() - start) * 1e6 / appends
+
+        ring = RingBuffer(capacity, 2)
+        start = time.perf_counter()
+        for i in range(appends):
+            ring.append((i, i))
+        ring_us = (time.perf_counter() - start) * 1e6 / appends
+
+        print(f"{capacity:>10} {list_us:>17.3f} {ring_us:>17.3f}")
+
+
+if __name__ == "__main__":
+    benchmark()
+    sys.exit()
@@ -0,0 +1,142 @@
+import pygame
+import math
+import sys
+import threading
+import time
+
+
+class RotationAtlas:
+    """
+    Precomputed rotations of a sprite, quantized to a fixed angular step.
+
+    Frames are built lazily on first use, or ahead of time in a background
+    thread, and looked up by the nearest quantized angle instead of calling
+    pygame.transform.rotate every frame.
+
+    Parameters:
+    - surface: Sprite to rotate
+    - steps: Number of rotations over a full turn, e.g. 360 or 720 (default: 360)
+    - memory_budget: Maximum bytes held by the frames; steps is reduced to fit (default: 256 MB)
+    - keep_size: Crop each frame back to the sprite size. Only safe for sprites whose
+      content lies inside the inscribed circle, like the Earth disc (default: False)
+    - background: Build all frames in a daemon thread (default: False)
+    """
+
+    def __init__(self, surface, steps=360, memory_budget=256 * 1024 * 1024,
+                 keep_size=False, background=False):
+        self.surface = surface
+        self.keep_size = keep_size
+
+        max_steps = max(1, memory_budget // self.frame_bytes())
+        if steps > max_steps:
+            print(f"Rotation atlas: {steps} steps exceed the memory budget, using {max_steps}")
+            steps = max_steps
+        self.steps = steps
+        self.resolution = 360.0 / steps  # Degrees per frame
+
+        self.frames = [None] * steps
+        # Held while a frame is built, so get() and the background thread never
+        # use the source surface together or build the same frame twice
+        self._lock = threading.Lock()
+        self._thread = None
+        if background:
+            self._thread = threading.Thread(target=self.build_all, daemon=True)
+            self._thread.start()
+
+    def frame_bytes(self):
+        """Worst-case size of one frame in bytes"""
+        w, h = self.surface.get_size()
+        if not self.keep_size:
+            # A rotation at 45 degrees needs the largest bounding box
+            side = math.ceil((w + h) / math.sqrt(2))
+            w = h = side
+        return w * h * 4
+
+    def index(self, degrees):
+        """Index of the frame nearest to the given counter-clockwise angle"""
+        return round(degrees / self.resolution) % self.steps
+
+    def get(self, degrees):
+        """Return the pre-rotated frame nearest to the angle, building it if needed"""
+        i = self.index(degrees)
+        frame = self.frames[i]
+        if frame is None:
+            frame = self._build(i)
+        return frame
+
+    def build_all(self):
+        for i in range(self.steps):
+            if self.frames[i] is None:
+                self._build(i)
+
+    def ready(self):
+        """Number of frames built so far"""
+        return sum(frame is not None for frame in self.frames)
+
+    def _build(self, i):
+        with self._lock:
+            # The other thread may have built it while this one waited
+            if self.frames[i] is not None:
+                return self.frames[i]
+            return self._rotate(i)
+
+    def _rotate(self, i):
+        rotated = pygame.transform.rotate(self.surface, i * self.resolution)
+
+        if self.keep_size:
+            # Cut the original-sized center out of the enlarged rotation
+            rect = self.surface.get_rect(center=rotated.get_rect().center)
+            rotated = rotated.subsurface(rect).copy()
+
+        # Match the display format so blits take the fast path
+        if pygame.display.get_surface() is not None:
+            rotated = rotated.convert_alpha()
+
+        self.frames[i] = rotated
+        return rotated
+
+
+def compare_frame_times(surface, frames=600, steps=360, memory_budget=1024 * 1024 * 1024,
+                        screen_size=(800, 800)):
+    """
+    Time a spinning blit with a per-frame rotate against atlas lookups.
+
+    Returns (rotate ms/frame, atlas ms/frame, atlas build seconds).
+    """
+    screen = pygame.display.set_mode(screen_size)
+    center = (screen_size[0] // 2, screen_size[1] // 2)
+    surface = surface.convert_alpha()
+
+    def spin(lookup):
+        start = time.perf_counter()
+        for n in range(frames):
+            rotated = lookup(n * 0.7)
+            screen.fill((0, 0, 0))
+            screen.blit(rotated, rotated.get_rect(center=center))
+        return (time.perf_counter() - start) * 1000 / frames
+
+    rotate_ms = spin(lambda degrees: pygame.transform.rotate(surface, degrees))
+
+    start = time.perf_counter()
+    atlas = RotationAtlas(surface, steps, memory_budget, keep_size=True)
+    atlas.build_all()
+    build_s = time.perf_counter() - start
+
+    atlas_ms = spin(atlas.get)
+    return rotate_ms, atlas_ms, build_s
+
+
+if __name__ == "__main__":
+    from EarthTexture import TextureCache, load_earth_texture
+
+    pygame.init()
+    pygame.display.set_mode((800, 800))
+    earth_img = load_earth_texture(250, antialias=True, cache=TextureCache())
+
+    for steps in (360, 720):
+        rotate_ms, atlas_ms, build_s = compare_frame_times(earth_img, steps=steps)
+        print(f"{steps} steps: rotate {rotate_ms:.3f} ms/frame, atlas {atlas_ms:.3f} ms/frame, "
+              f"build {build_s:.2f}s")
+
+    pygame.quit()
+    sys.exit()
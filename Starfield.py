@@ -0,0 +1,153 @@
+import pygame
+import numpy as np
+import sys
+import time
+
+BLACK = (0, 0, 0)
+
+# Pixel offsets stamped for each star: a small plus, like a radius-1 circle
+STAR_OFFSETS = np.array([(0, 0), (1, 0), (-1, 0), (0, 1), (0, -1)])
+
+
+class Starfield:
+    """
+    Seeded star catalog rendered as a background layer.
+
+    In static mode the stars are drawn once into a cached surface that is only
+    rebuilt on resize, so each frame is a single blit. Twinkle and parallax
+    modes update every star's brightness and position with NumPy and write
+    them straight into the screen through a pygame.surfarray view, so the
+    per-frame cost has no Python-level loop over stars.
+
+    Parameters:
+    - width, height: Size of the area to fill
+    - count: Number of stars (default: 100)
+    - seed: Seed for the star catalog (default: 0)
+    - twinkle: Modulate each star's brightness over time (default: False)
+    - parallax_speed: Horizontal drift in screen widths per second for the
+      nearest stars; farther stars drift proportionally slower (default: 0.0)
+    """
+
+    def __init__(self, width, height, count=100, seed=0, twinkle=False, parallax_speed=0.0):
+        rng = np.random.default_rng(seed)
+
+        # Positions are stored as fractions of the screen so they survive a resize
+        self.x = rng.random(count)
+        self.y = rng.random(count)
+        self.brightness = rng.integers(100, 255, count).astype(np.float64)
+
+        # Twinkle phase and rate (radians per second), and depth for parallax
+        self.phase = rng.uniform(0, 2 * np.pi, count)
+        self.rate = rng.uniform(1.0, 4.0, count)
+        self.depth = rng.uniform(0.2, 1.0, count)
+
+        self.twinkle = twinkle
+        self.parallax_speed = parallax_speed
+        self._background = None
+        self.resize(width, height)
+
+    def resize(self, width, height):
+        """Change the area size and drop the cached background"""
+        self.width, self.height = width, height
+        self._background = None
+
+    @property
+    def animated(self):
+        return self.twinkle or self.parallax_speed != 0.0
+
+    def background(self):
+        """Static star layer, rebuilt only after a resize"""
+        if self._background is None:
+            self._background = pygame.Surface((self.width, self.height))
+            self._background.fill(BLACK)
+            self._stamp(self._background, self.x, self.y, self.brightness)
+        return self._background
+
+    def draw(self, screen, t=0.0):
+        """
+        Clear the screen to the starfield.
+
+        Parameters:
+        - screen: Pygame surface to draw on
+        - t: Time in seconds driving twinkle and parallax (default: 0.0)
+        """
+        if not self.animated:
+            screen.blit(self.background(), (0, 0))
+            return
+
+        x = self.x
+        if self.parallax_speed:
+            x = (x + t * self.parallax_speed * self.depth) % 1.0
+
+        brightness = self.brightness
+        if self.twinkle:
+            brightness = brightness * (0.7 + 0.3 * np.sin(self.phase + self.rate * t))
+
+        screen.fill(BLACK)
+        self._stamp(screen, x, self.y, brightness)
+
+    def _stamp(self, surface, x, y, brightness):
+        width, height = surface.get_size()
+        xi = (x * width).astype(np.intp)
+        yi = (y * height).astype(np.intp)
+
+        # Every pixel of every star in one index pair, so each frame is a single
+        # fancy assignment
+        px = np.clip(xi[np.newaxis, :] + STAR_OFFSETS[:, 0:1], 0, width - 1).ravel()
+        py = np.clip(yi[np.newaxis, :] + STAR_OFFSETS[:, 1:2], 0, height - 1).ravel()
+        level = np.tile(brightness.astype(np.uint32), len(STAR_OFFSETS))
+
+        if surface.get_bitsize() == 32:
+            # Gray levels map to the same byte in every channel, so build the
+            # mapped pixel values directly from the channel shifts
+            r_shift, g_shift, b_shift, _ = surface.get_shifts()
+            mapped = (level << r_shift) | (level << g_shift) | (level << b_shift) | surface.get_masks()[3]
+            pixels = pygame.surfarray.pixels2d(surface)
+            pixels[px, py] = mapped.astype(np.uint32).view(np.int32)
+        else:
+            pixels = pygame.surfarray.pixels3d(surface)
+            pixels[px, py] = level.astype(np.uint8)[:, np.newaxis]
+
+        # The view locks the surface until it is deleted
+        del pixels
+
+
+def draw_random_stars(screen, count=100):
+    """Reference per-frame random stars kept for benchmarking against Starfield"""
+    width, height = screen.get_size()
+    screen.fill(BLACK)
+    for _ in range(count):
+        star_x = np.random.randint(0, width)
+        star_y = np.random.randint(0, height)
+        brightness = np.random.randint(100, 255)
+        pygame.draw.circle(screen, (brightness, brightness, brightness), (star_x, star_y), 1)
+
+
+def benchmark(counts=(100, 1000, 10000, 100000), frames=200, size=(800, 800)):
+    """Print the average per-frame cost of each starfield mode for each star count"""
+    screen = pygame.Surface(size)
+
+    def per_frame(draw):
+        start = time.perf_counter()
+        for n in range(frames):
+            draw(n / 60)
+        return (time.perf_counter() - start) * 1000 / frames
+
+    print(f"{'stars':>8} {'random (ms)':>12} {'static (ms)':>12} {'twinkle (ms)':>13} {'parallax (ms)':>14}")
+    for count in counts:
+        static = Starfield(*size, count)
+        twinkle = Starfield(*size, count, twinkle=True)
+        parallax = Starfield(*size, count, twinkle=True, parallax_speed=0.01)
+
+        random_ms = per_frame(lambda t: draw_random_stars(screen, count)) if count <= 10000 else float("nan")
+        static_ms = per_frame(lambda t: static.draw(screen, t))
+        twinkle_ms = per_frame(lambda t: twinkle.draw(screen, t))
+        parallax_ms = per_frame(lambda t: parallax.draw(screen, t))
+        print(f"{count:>8} {random_ms:>12.3f} {static_ms:>12.3f} {twinkle_ms:>13.3f} {parallax_ms:>14.3f}")
+
+
+if __name__ == "__main__":
+    pygame.init()
+    benchmark()
+    pygame.quit()
+    sys.exit()
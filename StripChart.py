@@ -0,0 +1,152 @@
+import pygame
+import numpy as np
+import math
+import sys
+import time
+from collections import deque
+
+from RingBuffer import RingBuffer
+
+
+class StripChart:
+    """
+    Scrolling sparkline of the most recent samples of one value.
+
+    Samples are folded into min/max buckets as they arrive, so a history longer
+    than the plot is decimated without losing peaks, and the window maximum is
+    tracked with a monotonic deque. Appending is O(1) amortized and building
+    the plot is O(columns), whatever the history length.
+
+    Parameters:
+    - capacity: Number of recent samples shown (like max_history), rounded to
+      whole buckets when the history is decimated
+    - columns: Plot resolution in buckets; histories up to this long are drawn
+      sample by sample (default: 200)
+    """
+
+    def __init__(self, capacity, columns=200):
+        self.capacity = capacity
+        self.bucket_size = max(1, math.ceil(capacity / columns))
+        self._full_buckets = max(1, capacity // self.bucket_size)
+
+        # Completed buckets, oldest first, and the bucket being filled
+        self._mins = RingBuffer(self._full_buckets)
+        self._maxs = RingBuffer(self._full_buckets)
+        self._bucket_min = math.inf
+        self._bucket_max = -math.inf
+        self._bucket_count = 0
+
+        # Window maximum: (sample number, value) pairs with decreasing values
+        self._peaks = deque()
+        self._count = 0
+
+    def __len__(self):
+        return len(self._mins) * self.bucket_size + self._bucket_count
+
+    def append(self, value):
+        self._bucket_min = min(self._bucket_min, value)
+        self._bucket_max = max(self._bucket_max, value)
+        self._bucket_count += 1
+
+        while self._peaks and self._peaks[-1][1] <= value:
+            self._peaks.pop()
+        self._peaks.append((self._count, value))
+        self._count += 1
+
+        if self._bucket_count == self.bucket_size:
+            self._mins.append(self._bucket_min)
+            self._maxs.append(self._bucket_max)
+            self._bucket_min = math.inf
+            self._bucket_max = -math.inf
+            self._bucket_count = 0
+
+        # Forget peaks from buckets that have scrolled out of the window
+        oldest = self._count - len(self)
+        while self._peaks[0][0] < oldest:
+            self._peaks.popleft()
+
+    def clear(self):
+        self._mins.clear()
+        self._maxs.clear()
+        self._bucket_min = math.inf
+        self._bucket_max = -math.inf
+        self._bucket_count = 0
+        self._peaks.clear()
+
+    def max(self):
+        """Largest sample in the window, or 0 when empty"""
+        return self._peaks[0][1] if self._peaks else 0
+
+    def points(self, plot_x, plot_y, plot_width, plot_height):
+        """
+        Pixel coordinates of the sparkline inside the given rectangle.
+
+        Values are scaled so the window maximum sits at 90% of the plot height.
+        Decimated histories yield a min and a max point per bucket.
+        """
+        mins, maxs = self._mins.view(), self._maxs.view()
+        if self._bucket_count:
+            mins = np.append(mins, self._bucket_min)
+            maxs = np.append(maxs, self._bucket_max)
+
+        n = len(mins)
+        scale = plot_height * 0.9 / (self.max() or 1)
+        x = plot_x + np.arange(n) / n * plot_width
+
+        if self.bucket_size == 1:
+            return np.column_stack((x, plot_y + plot_height - mins * scale))
+
+        # Interleave each bucket's min and max at the same x
+        y = np.column_stack((mins, maxs)).ravel()
+        return np.column_stack((np.repeat(x, 2), plot_y + plot_height - y * scale))
+
+    def draw(self, screen, color, rect, thickness=2):
+        if len(self) > 1:
+            pygame.draw.lines(screen, color, False, self.points(*rect), thickness)
+
+
+def draw_history_loop(screen, color, history, rect, thickness=2):
+    """Reference per-element plot kept for benchmarking against StripChart"""
+    plot_x, plot_y, plot_width, plot_height = rect
+    max_value = max(history) or 1
+    points = []
+    for i, value in enumerate(history):
+        x_pos = plot_x + (i / len(history)) * plot_width
+        y_pos = plot_y + plot_height - (value / max_value) * plot_height * 0.9
+        points.append((x_pos, y_pos))
+    pygame.draw.lines(screen, color, False, points, thickness)
+
+
+def benchmark(histories=(100, 10000, 1000000), frames=100):
+    """Per-frame cost of appending one sample and drawing the plot, old loop vs StripChart"""
+    screen = pygame.Surface((400, 200))
+    rect = (100, 50, 200, 100)
+    samples = np.abs(np.sin(np.arange(max(histories) + frames) * 0.01)) + 0.1
+
+    print(f"{'history':>10} {'loop (ms)':>10} {'chart (ms)':>11}")
+    for capacity in histories:
+        history = samples[:capacity].tolist()
+        start = time.perf_counter()
+        for n in range(frames):
+            history.append(samples[capacity + n])
+            history = history[-capacity:]
+            draw_history_loop(screen, (255, 80, 80), history, rect)
+        loop_ms = (time.perf_counter() - start) * 1000 / frames
+
+        chart = StripChart(capacity)
+        for value in samples[:capacity]:
+            chart.append(value)
+        start = time.perf_counter()
+        for n in range(frames):
+            chart.append(samples[capacity + n])
+            chart.draw(screen, (255, 80, 80), rect)
+        chart_ms = (time.perf_counter() - start) * 1000 / frames
+
+        print(f"{capacity:>10} {loop_ms:>10.3f} {chart_ms:>11.3f}")
+
+
+if __name__ == "__main__":
+    pygame.init()
+    benchmark()
+    pygame.quit()
+    sys.exit()
@@ -0,0 +1,357 @@
+import sympy as sp
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from multiprocessing.connection import wait as wait_connections
+
+from VectorCurve import DerivationCache, PROPERTIES, VectorCurve
+
+# Job states; the last four are final
+PENDING, RUNNING, DONE, TIMEOUT, CANCELLED, FAILED = "pending", "running", "done", "timeout", "cancelled", "failed"
+FINISHED = (DONE, TIMEOUT, CANCELLED, FAILED)
+
+# Seconds a worker gets to pick up a job, e.g. a spawned one importing SymPy,
+# before its clock starts; one that never does is failed
+STARTUP_TIMEOUT = 60.0
+
+
+def _derive(components, *parameters, cache_dir=None):
+    # Every VectorCurve property, in PROPERTIES order; with a cache directory the
+    # worker also fills the cache VectorCurve reads, so the parent gets them warm
+    cache = DerivationCache(cache_dir) if cache_dir is not None else None
+    curve = VectorCurve(tuple(components), parameters, cache=cache)
+    return sp.Tuple(*[sp.ImmutableMatrix(value) if isinstance(value, sp.MatrixBase) else value
+                      for value in (getattr(curve, name) for name in PROPERTIES)])
+
+
+# What a job can run: operation(expression, *args)
+OPERATIONS = {
+    "diff": lambda expression, *args: sp.diff(expression, *args),
+    "simplify": lambda expression: sp.simplify(expression),
+    "integrate": lambda expression, *args: sp.integrate(expression, *args),
+    "derive": _derive,
+}
+
+
+def _worker(connection, cache_dir):
+    """Run jobs sent as (id, operation, expression srepr, arg sreprs) until told to stop"""
+    while True:
+        try:
+            message = connection.recv()
+        except EOFError:
+            return
+        if message is None:
+            return
+        job_id, operation, expression, args = message
+        # The job's timeout runs from here, not from when it was sent
+        connection.send((job_id, RUNNING, None, None))
+        start = time.perf_counter()
+        try:
+            function = OPERATIONS[operation]
+            arguments = [sp.sympify(expression)] + [sp.sympify(a) for a in args]
+            if operation == "derive":
+                result = function(*arguments, cache_dir=cache_dir)
+            else:
+                result = function(*arguments)
+            connection.send((job_id, DONE, sp.srepr(result), time.perf_counter() - start))
+        except Exception as error:
+            connection.send((job_id, FAILED, repr(error), time.perf_counter() - start))
+
+
+class SymbolicJob:
+    """
+    Handle for one submitted job.
+
+    status is one of PENDING, RUNNING, DONE, TIMEOUT, CANCELLED or FAILED;
+    result holds the SymPy result once DONE and error the exception text of
+    a FAILED job. elapsed is the time the job ran for, cached marks results
+    that came from the cache.
+    """
+
+    def __init__(self, job_id, operation, expression, args, timeout):
+        self.id = job_id
+        self.operation = operation
+        self.expression = sp.sympify(expression)
+        self.args = tuple(sp.sympify(a) for a in args)
+        self.timeout = timeout
+        self.status = PENDING
+        self.result = None
+        self.error = None
+        self.elapsed = None
+        self.cached = False
+        self.key = repr(("job", operation, sp.srepr(self.expression), [sp.srepr(a) for a in self.args]))
+
+    @property
+    def done(self):
+        return self.status in FINISHED
+
+    def __repr__(self):
+        return f"<SymbolicJob {self.id} {self.operation} {self.status}>"
+
+
+class _Worker:
+    def __init__(self, context, cache_dir):
+        self.connection, child = context.Pipe()
+        self.process = context.Process(target=_worker, args=(child, cache_dir), daemon=True)
+        self.process.start()
+        child.close()
+        self.job = None
+        self.deadline = None
+        self.started = False
+
+    def kill(self):
+        self.process.terminate()
+        self.process.join()
+        self.connection.close()
+
+
+class SymbolicExecutor:
+    """
+    Runs independent SymPy jobs (diff, simplify, integrate, or a full
+    VectorCurve derivation) on a pool of worker processes.
+
+    Each job has its own timeout: a worker still busy past its job's
+    deadline is killed and replaced, so one pathological expression costs
+    at most its timeout and never holds up the rest. Jobs can be cancelled
+    whether queued or running. Results are kept in memory and, with a
+    DerivationCache, on disk, along with the timeouts jobs ran out of, so a
+    job that timed out is only retried with a longer timeout.
+
+    Queued jobs are handed to free workers whenever submit(), poll() or
+    wait() is called. A job's timeout starts when its worker confirms it
+    has picked the job up. Workers are forked where the platform can, and
+    spawned elsewhere, where the calling script needs an
+    if __name__ == "__main__": guard like any multiprocessing program.
+
+    Parameters:
+    - workers: Number of worker processes (default: None, one per CPU)
+    - timeout: Default seconds a job may run (default: 30.0)
+    - cache: DerivationCache for results, also given to "derive" jobs (default: None)
+    """
+
+    def __init__(self, workers=None, timeout=30.0, cache=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.timeout = timeout
+        self.cache = cache
+        self._context = multiprocessing.get_context(
+            "fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn")
+        self._pool = []
+        self._queue = deque()
+        self._results = {}
+        self._next_id = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def submit(self, operation, expression, *args, timeout=None):
+        """
+        Queue operation(expression, *args) and return its SymbolicJob.
+
+        A cached result finishes the job at once, without a worker.
+        """
+        if operation not in OPERATIONS:
+            raise ValueError(f"Unknown operation {operation!r}; choose from {', '.join(OPERATIONS)}")
+        job = SymbolicJob(self._next_id, operation, expression, args, timeout if timeout is not None else self.timeout)
+        self._next_id += 1
+
+        stored = self._results.get(job.key)
+        if stored is None and self.cache is not None:
+            stored = self.cache.load(job.key)
+        if stored:
+            if stored.get("result") is not None:
+                job.status, job.result, job.cached = DONE, sp.sympify(stored["result"]), True
+                return job
+            # A timeout is only final if the job was given at least as long as now
+            if stored.get("timeout", 0) >= job.timeout:
+                job.status, job.cached = TIMEOUT, True
+                return job
+
+        self._queue.append(job)
+        self._dispatch()
+        return job
+
+    def map(self, operation, expressions, *args, timeout=None):
+        """Run operation on every expression in parallel; results in order, None where a job did not finish"""
+        jobs = [self.submit(operation, expression, *args, timeout=timeout) for expression in expressions]
+        self.wait(jobs)
+        return [job.result for job in jobs]
+
+    def cancel(self, job):
+        """Cancel a queued or running job; returns False if it had already finished"""
+        if job.done:
+            return False
+        if job.status == PENDING:
+            self._queue.remove(job)
+        else:
+            worker = next(w for w in self._pool if w.job is job)
+            self._retire(worker)
+        job.status = CANCELLED
+        self._dispatch()
+        return True
+
+    def poll(self):
+        """Collect finished jobs and start queued ones, without blocking"""
+        self._collect(0)
+
+    def wait(self, jobs=None, timeout=None):
+        """
+        Block until the given jobs (default: all submitted) have finished or
+        timeout seconds have passed. Returns True if they all finished.
+        """
+        end = time.monotonic() + timeout if timeout is not None else None
+        while True:
+            pending = [job for job in jobs if not job.done] if jobs is not None else (
+                list(self._queue) + [w.job for w in self._pool if w.job is not None])
+            if not pending:
+                return True
+            now = time.monotonic()
+            if end is not None and now >= end:
+                return False
+            # Wake for the first result, the nearest deadline, or the caller's timeout
+            deadlines = [w.deadline for w in self._pool if w.job is not None]
+            if end is not None:
+                deadlines.append(end)
+            self._collect(max(0.0, min(deadlines) - now) if deadlines else None)
+
+    def close(self):
+        """Stop the workers; running jobs are cancelled"""
+        for job in self._queue:
+            job.status = CANCELLED
+        self._queue.clear()
+        for worker in self._pool:
+            if worker.job is not None:
+                worker.job.status = CANCELLED
+                worker.kill()
+                continue
+            try:
+                worker.connection.send(None)
+            except OSError:
+                pass
+            worker.process.join(1.0)
+            worker.kill()
+        self._pool = []
+
+    def _retire(self, worker):
+        # Killing is the only way to stop SymPy mid-computation
+        worker.kill()
+        self._pool.remove(worker)
+
+    def _dispatch(self):
+        while self._queue:
+            worker = next((w for w in self._pool if w.job is None), None)
+            if worker is None:
+                if len(self._pool) >= self.workers:
+                    return
+                worker = _Worker(self._context, self.cache.cache_dir if self.cache is not None else None)
+                self._pool.append(worker)
+            job = self._queue.popleft()
+            worker.connection.send((job.id, job.operation, sp.srepr(job.expression), [sp.srepr(a) for a in job.args]))
+            worker.job, worker.started = job, False
+            worker.deadline = time.monotonic() + STARTUP_TIMEOUT
+            job.status = RUNNING
+
+    def _finish(self, job, status, result=None, elapsed=None):
+        job.status, job.elapsed = status, elapsed
+        if status == DONE:
+            job.result = sp.sympify(result)
+            entry = {"result": result}
+        elif status == TIMEOUT:
+            entry = {"result": None, "timeout": job.timeout}
+        else:
+            job.error = result
+            return
+        self._results[job.key] = entry
+        if self.cache is not None:
+            self.cache.store(job.key, entry)
+
+    def _collect(self, timeout):
+        busy = {w.connection: w for w in self._pool if w.job is not None}
+        for connection in wait_connections(list(busy), timeout) if busy else ():
+            worker = busy[connection]
+            try:
+                job_id, status, result, elapsed = connection.recv()
+            except (EOFError, OSError):
+                # The worker died, e.g. out of memory or recursion in C code
+                self._finish(worker.job, FAILED, "worker exited")
+                self._retire(worker)
+                continue
+            if status == RUNNING:
+                # Picked up: the job's own clock starts now
+                worker.started, worker.deadline = True, time.monotonic() + worker.job.timeout
+                continue
+            self._finish(worker.job, status, result, elapsed)
+            worker.job = worker.deadline = None
+
+        now = time.monotonic()
+        for worker in [w for w in self._pool if w.job is not None and now >= w.deadline]:
+            if worker.started:
+                self._finish(worker.job, TIMEOUT, elapsed=worker.job.timeout)
+            else:
+                self._finish(worker.job, FAILED, "worker did not start")
+            self._retire(worker)
+        self._dispatch()
+
+
+if __name__ == "__main__":
+    import argparse
+    import tempfile
+
+    from CurveKernels import NOTEBOOK_CURVES, NOTEBOOK_PARAMETERS, t
+
+    parser = argparse.ArgumentParser(description="Derive the notebook's curve catalog on a process pool")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per CPU)")
+    parser.add_argument("--timeout", type=float, default=5.0, help="seconds each job may run")
+    parser.add_argument("--cache-dir", default=None,
+                        help="directory holding cached results (default: a temporary one, so the first pass is cold)")
+    parser.add_argument("--clear", action="store_true", help="clear existing entries in --cache-dir first")
+    args = parser.parse_args()
+
+    # A scratch cache by default, so the demo never touches the project's .curve_cache
+    if args.cache_dir is None:
+        scratch = tempfile.TemporaryDirectory(prefix="curve_cache_")
+        args.cache_dir = scratch.name
+    cache = DerivationCache(args.cache_dir)
+    if args.clear:
+        cache.clear()
+
+    def run_catalog(executor):
+        jobs = [executor.submit("derive", NOTEBOOK_CURVES[name], *NOTEBOOK_PARAMETERS.get(name, ()))
+                for name in NOTEBOOK_CURVES]
+        # The notebook's simplifications, and an integral SymPy cannot finish in time
+        jobs.append(executor.submit("simplify", sp.Matrix(NOTEBOOK_CURVES["sec_tan"]).diff(t)))
+        jobs.append(executor.submit("integrate", sp.exp(sp.cos(t)), t))
+        executor.wait(jobs)
+        return jobs
+
+    with SymbolicExecutor(args.workers, args.timeout, cache) as executor:
+        start = time.perf_counter()
+        jobs = run_catalog(executor)
+        cold_s = time.perf_counter() - start
+        print(f"{'job':<32}{'status':>10}{'time (s)':>10}")
+        for job in jobs:
+            label = f"{job.operation} {str(job.expression)[:24]}"
+            elapsed = f"{job.elapsed:.2f}" if job.elapsed is not None else "-"
+            print(f"{label:<32}{job.status:>10}{elapsed:>10}")
+
+        start = time.perf_counter()
+        cached = run_catalog(executor)
+        warm_s = time.perf_counter() - start
+    # Run one after another, the jobs would take the sum of their times
+    busy_s = sum(job.elapsed or 0 for job in jobs)
+    print(f"{executor.workers} workers: {cold_s:.2f}s cold against {busy_s:.2f}s of job time, "
+          f"{warm_s:.3f}s from the cache ({sum(job.cached for job in cached)}/{len(cached)} cached)")
+
+    # Cancelling a running job frees its worker straight away
+    with SymbolicExecutor(1, 60.0) as executor:
+        stuck = executor.submit("integrate", sp.sin(t) / (1 + t ** 4), t)
+        quick = executor.submit("diff", sp.sec(t), t)
+        time.sleep(0.5)
+        executor.cancel(stuck)
+        executor.wait([quick])
+        print(f"cancelled {stuck}, then {quick}: {quick.result}")
+    sys.exit()
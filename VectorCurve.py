@@ -0,0 +1,239 @@
+import sympy as sp
+import hashlib
+import json
+import os
+import sys
+import time
+
+from CurveKernels import CurveKernel, as_real, curve_variable
+
+# Derived expressions are cached here as JSON files of sp.srepr strings
+CACHE_DIR = ".curve_cache"
+# Bump when a derivation changes so stale entries are ignored
+CACHE_VERSION = 1
+
+
+class DerivationCache:
+    """
+    On-disk cache of the expressions derived for each curve.
+
+    Each curve gets one JSON file mapping a derivation's name to the srepr of
+    its result, named by a hash of the srepr of the components, the curve
+    variable, the parameters and whether results are simplified. srepr spells
+    out symbol assumptions, so t and a real t never share an entry.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.cache_dir = cache_dir
+
+    def entry_path(self, key):
+        digest = hashlib.sha256(key.encode()).hexdigest()[:24]
+        return os.path.join(self.cache_dir, f"v{CACHE_VERSION}_{digest}.json")
+
+    def load(self, key):
+        """Every derivation stored for key as {name: srepr}, empty on a miss"""
+        try:
+            with open(self.entry_path(key)) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        # A hash collision or a hand-edited file must not return another curve's results
+        if entry.get("key") != key:
+            return {}
+        return entry["derivations"]
+
+    def store(self, key, derivations):
+        """Write all derivations for key, replacing the previous entry"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self.entry_path(key)
+        # Write to a temporary file first so a crash never leaves a torn entry
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"key": key, "derivations": derivations}, f, indent=1)
+        os.replace(tmp_path, path)
+
+    def clear(self):
+        if not os.path.isdir(self.cache_dir):
+            return
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".json"):
+                os.remove(os.path.join(self.cache_dir, name))
+
+
+class VectorCurve:
+    """
+    A vector-valued curve r(t) with its derivations computed once.
+
+    Each property is derived on first use and kept, and with a
+    DerivationCache it is also written to disk, so a new VectorCurve for the
+    same components (after a kernel restart, say) reads it back instead of
+    running sp.simplify again. Planar curves are treated as lying in z = 0
+    for the cross products in curvature and torsion.
+
+    Parameters:
+    - components: SymPy expressions of the curve's components
+    - parameters: Other symbols the components use, e.g. omega (default: ())
+    - variable: The curve parameter; found from the components when there is
+      only one free symbol besides the parameters (default: None)
+    - cache: DerivationCache, or None to keep results in memory only (default: None)
+    - simplify: Run sp.simplify on each result (default: True)
+    """
+
+    def __init__(self, components, parameters=(), variable=None, cache=None, simplify=True):
+        variable = curve_variable(components, parameters, variable)
+        components, self.variable = as_real(components, variable)
+        self.position = sp.Matrix(components)
+        self.parameters = tuple(parameters)
+        self.dim = len(components)
+        self.cache = cache
+        self.simplify = simplify
+
+        self._key = repr((sp.srepr(self.position), sp.srepr(self.variable),
+                          [sp.srepr(p) for p in self.parameters], simplify))
+        self._derived = {}
+        self._stored = cache.load(self._key) if cache is not None else {}
+        self._kernels = {}
+
+    def _derive(self, name, build):
+        """Result of build() for name, from memory, then the disk cache, then computed"""
+        if name in self._derived:
+            return self._derived[name]
+        if name in self._stored:
+            result = sp.sympify(self._stored[name])
+        else:
+            result = build()
+            if self.simplify:
+                result = sp.simplify(result)
+            self._stored[name] = sp.srepr(result)
+            if self.cache is not None:
+                self.cache.store(self._key, self._stored)
+        self._derived[name] = result
+        return result
+
+    def _spatial(self, vector):
+        # Planar vectors gain a zero z component for cross products
+        return vector.col_join(sp.zeros(3 - self.dim, 1)) if self.dim < 3 else vector
+
+    @property
+    def derivative(self):
+        """r'(t)"""
+        return self._derive("derivative", lambda: self.position.diff(self.variable))
+
+    @property
+    def second_derivative(self):
+        """r''(t)"""
+        return self._derive("second_derivative", lambda: self.derivative.diff(self.variable))
+
+    @property
+    def speed(self):
+        """|r'(t)|"""
+        return self._derive("speed", lambda: sp.sqrt(self.derivative.dot(self.derivative)))
+
+    @property
+    def tangent(self):
+        """Unit tangent T(t) = r'(t) / |r'(t)|"""
+        return self._derive("tangent", lambda: self.derivative / self.speed)
+
+    @property
+    def normal(self):
+        """Principal unit normal N(t) = T'(t) / |T'(t)|"""
+        def build():
+            change = self.tangent.diff(self.variable)
+            return change / sp.sqrt(change.dot(change))
+        return self._derive("normal", build)
+
+    @property
+    def binormal(self):
+        """B(t) = T(t) x N(t)"""
+        return self._derive("binormal", lambda: self._spatial(self.tangent).cross(self._spatial(self.normal)))
+
+    @property
+    def curvature(self):
+        """κ(t) = |r' x r''| / |r'|³"""
+        def build():
+            cross = self._spatial(self.derivative).cross(self._spatial(self.second_derivative))
+            return sp.sqrt(cross.dot(cross)) / self.speed ** 3
+        return self._derive("curvature", build)
+
+    @property
+    def torsion(self):
+        """τ(t) = (r' x r'') · r''' / |r' x r''|²"""
+        def build():
+            first, second = self._spatial(self.derivative), self._spatial(self.second_derivative)
+            cross = first.cross(second)
+            return cross.dot(second.diff(self.variable)) / cross.dot(cross)
+        return self._derive("torsion", build)
+
+    @property
+    def antiderivative(self):
+        """Indefinite integral of r(t), without constants"""
+        return self._derive("antiderivative", lambda: self.position.integrate(self.variable))
+
+    def integral(self, lower, upper):
+        """Definite integral of r(t) from lower to upper, cached per pair of limits"""
+        lower, upper = sp.sympify(lower), sp.sympify(upper)
+        name = f"integral[{sp.srepr(lower)},{sp.srepr(upper)}]"
+        return self._derive(name, lambda: self.position.integrate((self.variable, lower, upper)))
+
+    def at(self, name, value, **parameter_values):
+        """Exact value of a derived property at t = value, e.g. curve.at("tangent", sp.pi / 6)"""
+        expression = getattr(self, name)
+        bindings = {self.variable: value}
+        bindings.update({p: parameter_values[p.name] for p in self.parameters if p.name in parameter_values})
+        return sp.simplify(expression.subs(bindings))
+
+    def kernel(self, backend="numpy"):
+        """Vectorized CurveKernel for this curve, built once per backend"""
+        if backend not in self._kernels:
+            self._kernels[backend] = CurveKernel(tuple(self.position), self.parameters, self.variable, backend)
+        return self._kernels[backend]
+
+
+# Everything a full derivation computes, in dependency order
+PROPERTIES = ("derivative", "second_derivative", "speed", "tangent", "normal", "binormal", "curvature", "torsion")
+
+
+def derive_all(curve):
+    for name in PROPERTIES:
+        getattr(curve, name)
+
+
+if __name__ == "__main__":
+    import argparse
+    import tempfile
+
+    from CurveKernels import NOTEBOOK_CURVES, NOTEBOOK_PARAMETERS
+
+    parser = argparse.ArgumentParser(description="Derive the notebook curves cold, then again from the cache")
+    parser.add_argument("curves", nargs="*", default=["sec_tan", "sin_cos", "circle", "helix"],
+                        help=f"curves to derive, from {', '.join(NOTEBOOK_CURVES)}")
+    parser.add_argument("--cache-dir", default=None, help="directory holding cached derivations "
+                        "(default: a temporary one, so the first pass is cold)")
+    parser.add_argument("--clear", action="store_true", help="clear existing entries in --cache-dir first")
+    args = parser.parse_args()
+
+    # A scratch cache by default, so the demo never touches the project's .curve_cache
+    if args.cache_dir is None:
+        scratch = tempfile.TemporaryDirectory(prefix="curve_cache_")
+        args.cache_dir = scratch.name
+    cache = DerivationCache(args.cache_dir)
+    if args.clear:
+        cache.clear()
+
+    print(f"{'curve':<10}{'cold (s)':>10}{'warm (s)':>10}{'speedup':>10}")
+    for name in args.curves:
+        components, parameters = NOTEBOOK_CURVES[name], NOTEBOOK_PARAMETERS.get(name, ())
+        start = time.perf_counter()
+        derive_all(VectorCurve(components, parameters, cache=cache))
+        cold = time.perf_counter() - start
+
+        # A fresh instance stands in for a restarted kernel
+        start = time.perf_counter()
+        curve = VectorCurve(components, parameters, cache=cache)
+        derive_all(curve)
+        warm = time.perf_counter() - start
+        print(f"{name:<10}{cold:>10.3f}{warm:>10.3f}{cold / warm:>9.0f}x")
+
+    helix = VectorCurve(NOTEBOOK_CURVES["helix"], cache=cache)
+    print("helix: T =", list(helix.tangent), "κ =", helix.curvature, "τ =", helix.torsion)
+    sys.exit()
@@ -0,0 +1,162 @@
+import pygame
+import numpy as np
+import sys
+import time
+
+RED = (255, 80, 80)
+GREEN = (80, 255, 80)
+
+# Arrowhead half-angle, as in draw_vector
+COS_HEAD = np.cos(np.pi / 6)
+SIN_HEAD = np.sin(np.pi / 6)
+
+
+def field_vectors(center, orbit_radius, n_angles=72, radius_factors=(0.5, 1.0, 1.5), initial_velocity=0.5):
+    """
+    Sample the orbital velocity and acceleration field on rings around the center.
+
+    Parameters:
+    - center: (x, y) of the Sun in pixels
+    - orbit_radius: Reference orbit radius in pixels
+    - n_angles: Points per ring (default: 72)
+    - radius_factors: Ring radii as multiples of orbit_radius (default: 0.5, 1.0, 1.5)
+    - initial_velocity: Orbital speed on the reference orbit (default: 0.5)
+
+    Returns (positions, velocities, accelerations), each an (n, 2) array.
+    """
+    # Every (angle, ring) pair at once; rows are ordered angle-major like the old loop
+    field_angle = 2 * np.pi * np.arange(n_angles) / n_angles
+    field_radius = orbit_radius * np.asarray(radius_factors, dtype=np.float64)
+    field_angle, field_radius = [a.ravel() for a in np.meshgrid(field_angle, field_radius, indexing="ij")]
+
+    # Unit radial direction and its tangential rotation
+    radial = np.column_stack((np.cos(field_angle), np.sin(field_angle)))
+    tangential = np.column_stack((-radial[:, 1], radial[:, 0]))
+    positions = np.asarray(center, dtype=np.float64) + radial * field_radius[:, np.newaxis]
+
+    # |v| falls with sqrt(r), |a| rises as 1/r²
+    field_vel = initial_velocity * np.sqrt(field_radius / orbit_radius)
+    field_acc = initial_velocity ** 2 * (orbit_radius / field_radius) ** 2
+
+    velocities = tangential * field_vel[:, np.newaxis]
+    accelerations = -radial * field_acc[:, np.newaxis]
+    return positions, velocities, accelerations
+
+
+def arrow_geometry(starts, directions, scale, arrow_size):
+    """
+    Compute line endpoints and arrowhead triangles for many vectors at once.
+
+    Mirrors draw_vector: the end point is start + direction * scale, invalid
+    vectors are dropped and only vectors longer than 5 pixels get a head.
+
+    Returns (starts, ends, heads, has_head) as integer pixel arrays, with heads
+    shaped (n, 3, 2).
+    """
+    ends = starts + directions * scale
+    valid = np.isfinite(ends).all(axis=1)
+    starts, ends, directions = starts[valid], ends[valid], directions[valid]
+
+    length = np.hypot(directions[:, 0], directions[:, 1])
+    has_head = length * scale > 5
+
+    # Rotate the reversed unit direction by ±30 degrees instead of calling
+    # arctan2/cos/sin for every arrowhead
+    with np.errstate(invalid="ignore", divide="ignore"):
+        unit = directions / length[:, np.newaxis]
+    ux, uy = unit[:, 0], unit[:, 1]
+    left = np.column_stack((ux * COS_HEAD + uy * SIN_HEAD, uy * COS_HEAD - ux * SIN_HEAD))
+    right = np.column_stack((ux * COS_HEAD - uy * SIN_HEAD, uy * COS_HEAD + ux * SIN_HEAD))
+    heads = np.stack((ends, ends - arrow_size * left, ends - arrow_size * right), axis=1)
+
+    # Truncate like int() in draw_vector
+    return (starts.astype(np.int64), ends.astype(np.int64),
+            np.nan_to_num(heads).astype(np.int64), has_head)
+
+
+class VectorFieldLayer:
+    """
+    Cached rendering of the orbital vector field.
+
+    The field only depends on the screen geometry, so all arrows are computed in
+    one vectorized pass and drawn once into a color-keyed layer. Each frame is
+    then a single blit until the screen size, center or display scale changes.
+
+    Parameters:
+    - n_angles: Points per ring (default: 72)
+    - radius_factors: Ring radii as multiples of the orbit radius (default: 0.5, 1.0, 1.5)
+    """
+
+    def __init__(self, n_angles=72, radius_factors=(0.5, 1.0, 1.5)):
+        self.n_angles = n_angles
+        self.radius_factors = tuple(radius_factors)
+        self._key = None
+        self._layer = None
+
+    def invalidate(self):
+        self._key = None
+
+    def draw(self, screen, center, display_scale, orbit_radius, initial_velocity, arrow_size):
+        key = (screen.get_size(), tuple(center), display_scale, orbit_radius, initial_velocity, arrow_size)
+        if key != self._key:
+            self._layer = self._render(screen.get_size(), center, display_scale, orbit_radius,
+                                       initial_velocity, arrow_size)
+            self._key = key
+        screen.blit(self._layer, (0, 0))
+
+    def _render(self, size, center, display_scale, orbit_radius, initial_velocity, arrow_size):
+        positions, velocities, accelerations = field_vectors(center, orbit_radius, self.n_angles,
+                                                             self.radius_factors, initial_velocity)
+
+        layer = pygame.Surface(size)
+        layer.fill((0, 0, 0))
+        layer.set_colorkey((0, 0, 0))
+
+        # Draw vectors - scale with display size
+        draw_arrows(layer, positions, velocities, RED, 100.0 * display_scale, arrow_size)
+        draw_arrows(layer, positions, accelerations, GREEN, 200.0 * display_scale, arrow_size)
+        return layer
+
+
+def draw_arrows(surface, starts, directions, color, scale, arrow_size, thickness=1):
+    """Draw precomputed arrows; the geometry comes from a single arrow_geometry call"""
+    starts, ends, heads, has_head = arrow_geometry(starts, directions, scale, arrow_size)
+    for start, end in zip(starts.tolist(), ends.tolist()):
+        pygame.draw.line(surface, color, start, end, thickness)
+    for head in heads[has_head].tolist():
+        pygame.draw.polygon(surface, color, head)
+
+
+def benchmark(densities=((72, 3), (360, 10), (1000, 10), (2500, 20)), frames=60, size=(1000, 800)):
+    """Print compute, rebuild and per-frame cost of the cached field for each density"""
+    screen = pygame.Surface(size)
+    center = (size[0] // 2, size[1] // 2)
+
+    print(f"{'arrows':>8} {'compute (ms)':>13} {'rebuild (ms)':>13} {'frame (ms)':>11}")
+    for n_angles, n_rings in densities:
+        radius_factors = np.linspace(0.25, 1.75, n_rings)
+
+        start = time.perf_counter()
+        positions, velocities, accelerations = field_vectors(center, 300, n_angles, radius_factors)
+        arrow_geometry(positions, velocities, 100.0, 12)
+        arrow_geometry(positions, accelerations, 200.0, 12)
+        compute_ms = (time.perf_counter() - start) * 1000
+
+        layer = VectorFieldLayer(n_angles, radius_factors)
+        start = time.perf_counter()
+        layer.draw(screen, center, 1.0, 300, 0.5, 12)
+        rebuild_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        for _ in range(frames):
+            layer.draw(screen, center, 1.0, 300, 0.5, 12)
+        frame_ms = (time.perf_counter() - start) * 1000 / frames
+
+        print(f"{2 * len(positions):>8} {compute_ms:>13.3f} {rebuild_ms:>13.3f} {frame_ms:>11.3f}")
+
+
+if __name__ == "__main__":
+    pygame.init()
+    benchmark()
+    pygame.quit()
+    sys.exit()
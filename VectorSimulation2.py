@@ -3,12 +3,22 @@ import numpy as np
 import sys
 import datetime
 import math
-import os
-from urllib.request import urlretrieve
+
+from EarthTexture import TextureCache, load_earth_texture
+from FrameExporter import FrameExporter, export_arguments, report
+from FrameProfiler import FrameProfiler, profile_arguments
+from Hud import TextCache
+from PhysicsWorker import PhysicsWorker, RotationModel
+from RingBuffer import RingBuffer
+from RotationAtlas import RotationAtlas
+from Starfield import Starfield
+
+# Command-line options; --export DIR renders frames offscreen instead
+export_options = export_arguments("Earth Rotation Simulation with Vectors", [profile_arguments()])
 
 # Initialize Pygame
 pygame.init()
-width, height = 800, 800
+width, height = export_options.size or (800, 800)
 screen = pygame.display.set_mode((width, height))
 pygame.display.set_caption("Earth Rotation Simulation with Vectors")
 
@@ -24,60 +34,59 @@ GRAY = (100, 100, 100)
 # Earth parameters
 center_x, center_y = width // 2, height // 2
 earth_radius = 250  # Pixels
+smooth_earth_edge = True  # Anti-alias the edge of the texture disc
+
+# Pre-rotated Earth frames (set rotation_steps = 0 to rotate every frame instead)
+rotation_steps = 360
+rotation_memory_mb = 384
+
+# Background stars, generated once from a fixed seed
+star_count = 100
+star_seed = 42
+twinkle_stars = False
+starfield = Starfield(width, height, star_count, star_seed, twinkle=twinkle_stars)
 
 # Earth's rotation parameters
 sidereal_day = 23.9344696 * 60 * 60  # Earth's sidereal day in seconds
 omega_earth = 2 * np.pi / sidereal_day  # Angular velocity in radians/second
 custom_omega = omega_earth * 1000  # Start with default value (scaled)
 
-
-# Load Earth texture
-def load_earth_texture():
-    texture_file = "earth_texture.jpg"
-    if not os.path.exists(texture_file):
-        print("Downloading Earth texture...")
-        # NASA Blue Marble image URL
-        url = "https://eoimages.gsfc.nasa.gov/images/imagerecords/74000/74092/world.200407.3x5400x2700.jpg"
-        urlretrieve(url, texture_file)
-
-    # Load the image
-    original_img = pygame.image.load(texture_file)
-
-    # Scale the image to fit our Earth radius
-    scaled_img = pygame.transform.scale(original_img, (earth_radius * 2, earth_radius * 2))
-
-    # Create a surface with alpha channel for the circular crop
-    earth_img = pygame.Surface((earth_radius * 2, earth_radius * 2), pygame.SRCALPHA)
-
-    # Create a circular mask
-    for x in range(earth_radius * 2):
-        for y in range(earth_radius * 2):
-            # Calculate distance from center
-            distance = ((x - earth_radius) ** 2 + (y - earth_radius) ** 2) ** 0.5
-
-            # If within radius, copy the pixel, otherwise leave transparent
-            if distance <= earth_radius:
-                earth_img.set_at((x, y), scaled_img.get_at((x, y)))
-
-    return earth_img
+# The rotation is stepped at a fixed rate in real time by a worker thread (or
+# process), independent of how long each frame takes to draw
+physics_rate = 120  # Steps per second
+physics_in_process = False
 
 
+# Load Earth texture
 try:
-    earth_img = load_earth_texture()
+    earth_img = load_earth_texture(earth_radius, antialias=smooth_earth_edge, cache=TextureCache())
     use_texture = True
 except Exception as e:
     print(f"Could not load Earth texture: {e}")
     use_texture = False
 
+rotation_atlas = None
+if use_texture and rotation_steps > 0:
+    # The texture is a disc, so rotated frames can be cropped back to its size
+    rotation_atlas = RotationAtlas(earth_img, rotation_steps, rotation_memory_mb * 1024 * 1024,
+                                   keep_size=True, background=True)
+
 # Font for displaying information
 font = pygame.font.SysFont('Arial', 20)
 title_font = pygame.font.SysFont('Arial', 28, bold=True)
 input_font = pygame.font.SysFont('Courier New', 22)
+text_cache = TextCache()
+
+# Frame-time profiler; P shows its flame bar, --profile-csv records every frame
+profiler = FrameProfiler(("events", "physics", "starfield", "texture rotation", "draw", "text", "export", "overlay",
+                          "flip", "idle"), csv_path=export_options.profile_csv)
+profiler.visible = export_options.profile
+profiler_font = pygame.font.SysFont('Courier New', 14)
 
 # Initialize simulation parameters
 angle = 0  # Will be set based on current time
-trail = []
 max_trail_length = 100
+trail = RingBuffer(max_trail_length, 2, dtype=np.int32)
 show_vectors = True
 show_trail = True
 paused = False
@@ -161,7 +170,23 @@ running = True
 # Initial angle based on current time
 angle = get_earth_angle()
 
+# Exporting steps the rotation in this loop at a fixed dt per frame instead,
+# starting from the angle recorded by the first run so a resume matches it
+exporter = None
+frame_index = 0
+if export_options.export:
+    exporter = FrameExporter(export_options.export, export_options.workers, resume=export_options.resume,
+                             image_format=export_options.format)
+    angle = exporter.setting("angle", angle)
+    steps_per_frame = max(1, round(physics_rate / export_options.fps))
+
+physics = PhysicsWorker(RotationModel(angle, custom_omega), 1.0 / physics_rate, physics_rate, physics_in_process,
+                        manual=exporter is not None)
+
 while running:
+    profiler.frame()
+    if profiler.frames == export_options.profile_frames:
+        break
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
             running = False
@@ -172,6 +197,7 @@ while running:
                     try:
                         custom_omega = float(input_text)
                         time_scale = custom_omega / omega_earth  # FIX: Update time_scale based on custom omega
+                        physics.set("omega", custom_omega)
                         input_active = False
                     except ValueError:
                         input_text = str(custom_omega)  # Revert to previous value if invalid
@@ -189,23 +215,30 @@ while running:
                 if event.key == pygame.K_UP:
                     time_scale *= 1.5
                     custom_omega = omega_earth * time_scale  # Update omega based on new time scale
+                    physics.set("omega", custom_omega)
                     input_text = str(custom_omega)  # Update the display text as well
                 elif event.key == pygame.K_DOWN:
                     time_scale /= 1.5
                     custom_omega = omega_earth * time_scale  # Update omega based on new time scale
+                    physics.set("omega", custom_omega)
                     input_text = str(custom_omega)  # Update the display text as well
                 elif event.key == pygame.K_v:
                     show_vectors = not show_vectors
                 elif event.key == pygame.K_t:
                     show_trail = not show_trail
+                elif event.key == pygame.K_p:
+                    profiler.toggle()
                 elif event.key == pygame.K_SPACE:
                     paused = not paused
+                    physics.set("paused", paused)
                 elif event.key == pygame.K_r:
                     # Reset to real-time
                     angle = get_earth_angle()
                     time_scale = 1000
                     custom_omega = omega_earth * time_scale
                     input_text = str(custom_omega)
+                    physics.set("angle", angle)
+                    physics.set("omega", custom_omega)
                 elif event.key == pygame.K_o:
                     # Activate omega input
                     input_active = True
@@ -222,14 +255,16 @@ while running:
                 cursor_timer = 0
             else:
                 input_active = False
+    profiler.mark("events")
 
-    if not paused:
-        # Update angle based on custom omega value
-        dt = clock.get_time() / 1000.0  # Time since last frame in seconds
-        angle += custom_omega * dt
+    if exporter is not None:
+        for _ in range(steps_per_frame):
+            physics.step()
 
-        # Keep angle within 0-2π range
-        angle %= 2 * np.pi
+    # Draw between the worker's two latest steps, keeping the angle within 0-2π range
+    physics.poll()
+    angle = physics.interpolate()[0] % (2 * np.pi)
+    profiler.mark("physics")
 
     # Update cursor blink timer
     cursor_timer += clock.get_time()
@@ -249,26 +284,23 @@ while running:
     ax = -earth_radius * custom_omega ** 2 * np.cos(angle)
     ay = -earth_radius * custom_omega ** 2 * np.sin(angle)
 
-    # Add to trail
+    # Add to trail (the ring buffer drops the oldest point when full)
     if show_trail:
         trail.append((int(x), int(y)))
-        if len(trail) > max_trail_length:
-            trail = trail[-max_trail_length:]
-
-    # Clear screen
-    screen.fill(BLACK)
 
-    # Draw stars in background
-    for _ in range(100):
-        star_x = np.random.randint(0, width)
-        star_y = np.random.randint(0, height)
-        brightness = np.random.randint(100, 255)
-        pygame.draw.circle(screen, (brightness, brightness, brightness), (star_x, star_y), 1)
+    # Clear screen to the star background
+    frame_time = frame_index / export_options.fps if exporter is not None else pygame.time.get_ticks() / 1000.0
+    starfield.draw(screen, frame_time)
+    profiler.mark("starfield")
 
     # Draw Earth
     if use_texture:
-        # Create a rotated copy of the Earth image
-        rotated_earth = pygame.transform.rotate(earth_img, math.degrees(-angle))
+        # Look up (or create) a rotated copy of the Earth image
+        with profiler.scope("texture rotation"):
+            if rotation_atlas is not None:
+                rotated_earth = rotation_atlas.get(math.degrees(-angle))
+            else:
+                rotated_earth = pygame.transform.rotate(earth_img, math.degrees(-angle))
         # Get the rect of the rotated image and center it
         rect = rotated_earth.get_rect()
         rect.center = (center_x, center_y)
@@ -288,7 +320,7 @@ while running:
 
     # Draw trail if enabled
     if show_trail and len(trail) > 1:
-        pygame.draw.lines(screen, YELLOW, False, trail, 2)
+        pygame.draw.lines(screen, YELLOW, False, trail.view(), 2)
 
     # Draw vectors if enabled
     if show_vectors:
@@ -307,6 +339,7 @@ while running:
 
         # Draw stickman on Earth's surface
         draw_stickman(screen, x, y, WHITE, 1.5)
+    profiler.mark("draw")
 
     # Calculate real-time values
     real_omega = custom_omega
@@ -314,13 +347,14 @@ while running:
     real_acceleration = earth_radius * real_omega ** 2
 
     # Display title
-    title = title_font.render("Earth Rotation Simulation", True, WHITE)
+    title = text_cache.render(title_font, "Earth Rotation Simulation", WHITE)
     screen.blit(title, (width // 2 - title.get_width() // 2, 20))
 
     # Display information
-    info_text = font.render(
+    info_text = text_cache.render_line(
+        "info", font,
         f"ω = {real_omega:.8f} rad/s, |v| = {real_velocity:.2f} m/s, |a| = {real_acceleration:.2f} m/s²",
-        True, WHITE)
+        WHITE)
     screen.blit(info_text, (20, height - 100))
 
     # Draw omega input box
@@ -328,11 +362,11 @@ while running:
     pygame.draw.rect(screen, input_color, input_rect, 2)
 
     # Draw input box label
-    omega_label = font.render("Custom ω (rad/s):", True, WHITE)
+    omega_label = text_cache.render(font, "Custom ω (rad/s):", WHITE)
     screen.blit(omega_label, (width - 220 - omega_label.get_width() - 10, input_rect.y + 5))
 
     # Render the input text
-    text_surface = input_font.render(input_text, True, WHITE)
+    text_surface = text_cache.render_line("input", input_font, input_text, WHITE)
     # Ensure text fits within input box
     text_width = min(input_rect.w - 10, text_surface.get_width())
     screen.blit(text_surface, (input_rect.x + 5, input_rect.y + 5))
@@ -345,7 +379,7 @@ while running:
                          (cursor_pos, input_rect.y + input_rect.h - 5), 2)
 
     # Display time scale
-    time_text = font.render(f"Time scale: {time_scale:.1f}x real-time", True, WHITE)
+    time_text = text_cache.render_line("time scale", font, f"Time scale: {time_scale:.1f}x real-time", WHITE)
     screen.blit(time_text, (20, height - 70))
 
     # Calculate and display Earth time
@@ -354,18 +388,43 @@ while running:
     m = int((hours - h) * 60)
     s = int(((hours - h) * 60 - m) * 60)
     time_str = f"Earth time (at Greenwich): {h:02d}:{m:02d}:{s:02d} UTC"
-    time_display = font.render(time_str, True, WHITE)
+    time_display = text_cache.render_line("earth time", font, time_str, WHITE)
     screen.blit(time_display, (20, height - 40))
 
     # Display controls
-    controls1 = font.render("UP/DOWN: Change speed | V: Toggle vectors | T: Toggle trail | SPACE: Pause", True, WHITE)
-    controls2 = font.render("R: Reset | O: Enter custom omega value", True, WHITE)
+    controls1 = text_cache.render(font, "UP/DOWN: Change speed | V: Toggle vectors | T: Toggle trail | SPACE: Pause",
+                                  WHITE)
+    controls2 = text_cache.render(font, "R: Reset | O: Enter custom omega value | P: Profiler", WHITE)
     screen.blit(controls1, (20, height - 160))
     screen.blit(controls2, (20, height - 130))
+    profiler.mark("text")
+
+    if exporter is not None:
+        exporter.submit(frame_index, screen)
+        profiler.mark("export")
+        frame_index += 1
+        if frame_index >= export_options.frames:
+            running = False
+        continue
+
+    # Physics steps per second against frames drawn per second
+    rates_text = text_cache.render_line("rates", font, f"Physics: {physics.physics_hz:.0f} Hz, "
+                                        f"render: {clock.get_fps():.0f} FPS", WHITE)
+    screen.blit(rates_text, (20, 60))
+    profiler.draw(screen, profiler_font, text_cache, (20, 95))
+    profiler.mark("overlay")
 
     # Update display
     pygame.display.flip()
+    profiler.mark("flip")
     clock.tick(60)
-
+    profiler.mark("idle")
+
+physics.stop()
+profiler.close()
+if exporter is not None:
+    report(exporter, export_options.fps)
+    if export_options.video:
+        exporter.encode_video(export_options.video, export_options.fps)
 pygame.quit()
 sys.exit()
\ No newline at end of file
@@ -0,0 +1,12 @@
+"""
+Repeatable performance scenarios for the simulations and curve computations.
+
+Run them from the repository root with
+
+    python -m benchmarks [names or groups] [--json results.json] [--compare baseline.json]
+
+Each scenario reports n, min, median, mean, stdev and p95 in milliseconds
+per call or per frame. Saving a run with --json and passing it to --compare
+on a later commit prints the change in every median.
+"""
+from benchmarks.harness import SCENARIOS, Scenario, Stats, compare, load, run, save, scenario, summarize, time_calls
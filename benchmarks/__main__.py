@@ -0,0 +1,36 @@
+import pygame
+import argparse
+import os
+import sys
+
+# Scenario modules register themselves on import
+from benchmarks import curves, rendering, symbolic, texture, vector_field
+from benchmarks.harness import SCENARIOS, compare, load, run, save
+
+parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Run the performance scenarios")
+parser.add_argument("names", nargs="*", help="scenario or group names to run (default: all)")
+parser.add_argument("--repeats", type=int, default=None, help="override every scenario's repeat or frame count")
+parser.add_argument("--json", metavar="PATH", default=None, help="save the results and environment to PATH")
+parser.add_argument("--compare", metavar="PATH", default=None, help="compare medians with a saved run")
+parser.add_argument("--threshold", type=float, default=10, help="percent change flagged by --compare")
+parser.add_argument("--list", action="store_true", help="list the scenarios and exit")
+args = parser.parse_args()
+
+if args.list:
+    for item in SCENARIOS.values():
+        print(f"{item.group:<14}{item.name}")
+    sys.exit()
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+pygame.init()
+results = run(args.names, args.repeats)
+pygame.quit()
+
+if args.json:
+    save(results, args.json)
+if args.compare:
+    environment, baseline = load(args.compare)
+    print(f"\nAgainst {args.compare} (commit {environment.get('commit')}):")
+    slower = compare(baseline, results, args.threshold / 100)
+    sys.exit(1 if slower else 0)
+sys.exit()
@@ -0,0 +1,49 @@
+import numpy as np
+
+from ArcLength import ArcLengthIndex
+from benchmarks.harness import scenario, time_calls
+from CurveKernels import NOTEBOOK_CURVES, notebook_kernel
+from Frenet import frenet_frames
+from VectorIntegral import VectorIntegral
+
+SAMPLES = 1_000_000
+
+
+@scenario("curves.kernel_compile_helix", "curves")
+def kernel_compile_helix(repeats=5):
+    return time_calls(lambda: notebook_kernel("helix"), repeats)
+
+
+@scenario("curves.kernel_tangent_helix_1m", "curves")
+def kernel_tangent_helix(repeats=10):
+    kernel = notebook_kernel("helix")
+    t_values = np.linspace(0, 10, SAMPLES)
+    return time_calls(lambda: kernel.tangent(t_values), repeats)
+
+
+@scenario("curves.kernel_velocity_sec_tan_1m", "curves")
+def kernel_velocity_sec_tan(repeats=10):
+    kernel = notebook_kernel("sec_tan")
+    t_values = np.linspace(-1.5, 1.5, SAMPLES)
+    return time_calls(lambda: kernel.velocity(t_values), repeats)
+
+
+@scenario("curves.arc_length_resample_sin_cos_1m", "curves")
+def arc_length_resample(repeats=10):
+    index = ArcLengthIndex(notebook_kernel("sin_cos"), 0, 2 * np.pi)
+    return time_calls(lambda: index.resample(SAMPLES), repeats)
+
+
+@scenario("curves.frenet_helix_1m", "curves")
+def frenet_helix(repeats=5):
+    kernel = notebook_kernel("helix")
+    t_values = np.linspace(0, 10, SAMPLES)
+    return time_calls(lambda: frenet_frames(kernel, t_values), repeats)
+
+
+@scenario("curves.quadrature_integrand_1k", "curves")
+def quadrature_integrand(repeats=5):
+    # Adaptive Gauss-Kronrod alone, without the symbolic attempt
+    integral = VectorIntegral(NOTEBOOK_CURVES["integrand"], symbolic=False)
+    uppers = np.linspace(0.1, 10, 1000)
+    return time_calls(lambda: integral.integrate(0, uppers), repeats)
@@ -0,0 +1,149 @@
+import numpy as np
+import gc
+import json
+import os
+import platform
+import subprocess
+import time
+from collections import OrderedDict, namedtuple
+
+# Root of the repository: the simulations run and git is queried from here. Top-level
+# modules import only because `python -m benchmarks` is run from this directory
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+Scenario = namedtuple("Scenario", ["name", "group", "func", "unit"])
+Stats = namedtuple("Stats", ["n", "min", "median", "mean", "stdev", "p95"])
+
+# Registered scenarios in definition order
+SCENARIOS = OrderedDict()
+
+
+def scenario(name, group, unit="call"):
+    """
+    Register a benchmark scenario.
+
+    The decorated function takes the number of repeats and returns a list of
+    samples in seconds, one per call or frame as described by unit.
+    """
+    def register(func):
+        SCENARIOS[name] = Scenario(name, group, func, unit)
+        return func
+    return register
+
+
+def time_calls(func, repeats, setup=None, warmup=1):
+    """
+    Time func() repeats times after warmup untimed calls.
+
+    setup() runs untimed before every call, e.g. to clear a cache so each
+    call does the same work. The garbage collector is paused while timing.
+    """
+    samples = []
+    for i in range(warmup + repeats):
+        if setup is not None:
+            setup()
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - start
+        finally:
+            if gc_enabled:
+                gc.enable()
+        if i >= warmup:
+            samples.append(elapsed)
+    return samples
+
+
+def summarize(samples):
+    """Stats of samples in seconds, reported in milliseconds"""
+    values = np.asarray(samples, dtype=np.float64) * 1000
+    return Stats(len(values), float(values.min()), float(np.median(values)), float(values.mean()),
+                 float(values.std(ddof=1)) if len(values) > 1 else 0.0, float(np.percentile(values, 95)))
+
+
+def environment():
+    """Commit and library versions recorded with every result file"""
+    import pygame
+    import sympy
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR, capture_output=True,
+                                text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pygame": pygame.version.ver,
+        "sympy": sympy.__version__,
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def run(names=None, repeats=None, log=print):
+    """
+    Run the selected scenarios and return {name: Stats}.
+
+    Parameters:
+    - names: Scenario names or group names to run (default: None, all)
+    - repeats: Override every scenario's repeat count (default: None)
+    - log: Called with one formatted line per scenario (default: print)
+    """
+    results = OrderedDict()
+    log(f"{'scenario':<40}{'n':>5}{'min':>10}{'median':>10}{'mean':>10}{'stdev':>10}{'p95':>10}  ms per")
+    for item in SCENARIOS.values():
+        if names and item.name not in names and item.group not in names:
+            continue
+        try:
+            samples = item.func(repeats) if repeats is not None else item.func()
+        except Exception as e:
+            log(f"{item.name:<40} failed: {e}")
+            continue
+        stats = summarize(samples)
+        results[item.name] = stats
+        log(f"{item.name:<40}{stats.n:>5}{stats.min:>10.3f}{stats.median:>10.3f}{stats.mean:>10.3f}"
+            f"{stats.stdev:>10.3f}{stats.p95:>10.3f}  {item.unit}")
+    return results
+
+
+def save(results, path):
+    """Write results and the environment to a JSON file"""
+    data = {"environment": environment(),
+            "results": {name: stats._asdict() for name, stats in results.items()}}
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+
+
+def load(path):
+    """Read a result file written by save() into (environment, {name: Stats})"""
+    with open(path) as f:
+        data = json.load(f)
+    return data["environment"], OrderedDict((name, Stats(**values)) for name, values in data["results"].items())
+
+
+def compare(baseline, results, threshold=0.1, log=print):
+    """
+    Print the change in median of every scenario present in both runs.
+
+    Changes beyond threshold (a fraction) are flagged; returns the names of
+    the scenarios that got slower by more than that.
+    """
+    slower = []
+    log(f"{'scenario':<40}{'before':>10}{'after':>10}{'change':>10}")
+    for name, stats in results.items():
+        before = baseline.get(name)
+        if before is None or before.median <= 0:
+            continue
+        change = stats.median / before.median - 1
+        flag = ""
+        if change > threshold:
+            flag = "  slower"
+            slower.append(name)
+        elif change < -threshold:
+            flag = "  faster"
+        log(f"{name:<40}{before.median:>10.3f}{stats.median:>10.3f}{change * 100:>+9.1f}%{flag}")
+    return slower
@@ -0,0 +1,45 @@
+import os
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.harness import REPO_DIR, scenario
+from FrameProfiler import load_timings
+
+# Frames dropped from the start of every run while caches and the physics worker warm up
+WARMUP_FRAMES = 30
+
+
+def render_frames(script, size, frames=240):
+    """
+    Run a simulation headless at a fixed size and return its per-frame cost in seconds.
+
+    The script runs in its own process on the dummy video driver for a fixed
+    number of frames with the frame profiler recording to CSV. A frame's cost
+    is its total time less the wait for the 60 FPS frame cap.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = os.path.join(directory, "frames.csv")
+        command = [sys.executable, script, "--size", str(size[0]), str(size[1]),
+                   "--profile-frames", str(frames + WARMUP_FRAMES), "--profile-csv", csv_path]
+        env = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy")
+        completed = subprocess.run(command, cwd=REPO_DIR, env=env, capture_output=True, text=True)
+        if completed.returncode != 0 or not os.path.exists(csv_path):
+            raise RuntimeError(f"{script} exited with {completed.returncode}: {completed.stderr.strip()[-200:]}")
+        timings = load_timings(csv_path)
+
+    cost = timings["total"] - timings["idle"]
+    return list(cost[WARMUP_FRAMES:] / 1000)
+
+
+def _register(script, size):
+    name = os.path.splitext(script)[0]
+
+    @scenario(f"render.{name}_{size[0]}x{size[1]}", "render", "frame")
+    def run(repeats=240):
+        return render_frames(script, size, repeats)
+
+
+for script, size in (("VectorSimulation.py", (800, 800)), ("VectorSimulation.py", (1200, 1200)),
+                     ("EarthOrbitalDecay.py", (1000, 800)), ("EarthOrbitalDecay.py", (1600, 1200))):
+    _register(script, size)
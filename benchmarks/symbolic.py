@@ -0,0 +1,57 @@
+import sympy as sp
+from sympy.core.cache import clear_cache
+
+from benchmarks.harness import scenario, time_calls
+
+# The derivations worked through in sample.ipynb. SymPy memoizes results, so
+# its cache is cleared before every call to time the full derivation each time
+t, omega = sp.symbols('t omega')
+
+
+def sec_tan_derivative():
+    r = sp.Matrix([sp.sec(t), sp.tan(t)])
+    return sp.simplify(sp.diff(r, t))
+
+
+def exp_log_derivative():
+    r = sp.Matrix([sp.exp(-t) * sp.cos(t), sp.exp(-t) * sp.sin(t), sp.log(abs(t))])
+    return r.diff(t)
+
+
+def unit_tangent():
+    r_prime = sp.Matrix([t, 2 * sp.sin(t), 3 * sp.cos(t)]).diff(t)
+    T = r_prime / sp.sqrt(r_prime.dot(r_prime))
+    return sp.simplify(T.subs(t, sp.pi / 6))
+
+
+def vector_integral():
+    r = sp.Matrix([sp.cos(2 * t), sp.sin(2 * t), t * sp.sin(t)])
+    return sp.simplify(r.integrate((t, 0, sp.pi / 4)))
+
+
+def circular_motion():
+    r = sp.Matrix([sp.cos(omega * t), sp.sin(omega * t), 0])
+    v = r.diff(t)
+    a = v.diff(t)
+    return sp.simplify(r.dot(v)), sp.simplify(r.cross(v)), a
+
+
+def helix_motion():
+    r = sp.Matrix([2 * sp.sin(3 * t), 2 * sp.cos(3 * t), 8 * t])
+    v = r.diff(t)
+    a = v.diff(t)
+    speed = sp.sqrt(v.dot(v))
+    return v.subs(t, sp.pi / 2), a.subs(t, sp.pi / 2), sp.simplify(speed.subs(t, sp.pi / 2))
+
+
+WORKLOADS = (sec_tan_derivative, exp_log_derivative, unit_tangent, vector_integral, circular_motion, helix_motion)
+
+
+def _register(workload):
+    @scenario(f"symbolic.{workload.__name__}", "symbolic")
+    def run(repeats=5):
+        return time_calls(workload, repeats, setup=clear_cache)
+
+
+for workload in WORKLOADS:
+    _register(workload)
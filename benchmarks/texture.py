@@ -0,0 +1,55 @@
+import pygame
+import os
+import shutil
+import tempfile
+
+from benchmarks.harness import REPO_DIR, scenario, time_calls
+from EarthTexture import TEXTURE_FILE, TextureCache, build_circular_mask, crop_to_disc, load_earth_texture
+
+TEXTURE_PATH = os.path.join(REPO_DIR, TEXTURE_FILE)
+
+
+def _cold_load(radius, antialias=False, repeats=5):
+    return time_calls(lambda: load_earth_texture(radius, TEXTURE_PATH, antialias), repeats)
+
+
+@scenario("texture.load_r100", "texture")
+def load_r100(repeats=5):
+    return _cold_load(100, repeats=repeats)
+
+
+@scenario("texture.load_r250", "texture")
+def load_r250(repeats=5):
+    return _cold_load(250, repeats=repeats)
+
+
+@scenario("texture.load_r250_antialias", "texture")
+def load_r250_antialias(repeats=5):
+    return _cold_load(250, True, repeats)
+
+
+@scenario("texture.load_r500", "texture")
+def load_r500(repeats=5):
+    return _cold_load(500, repeats=repeats)
+
+
+@scenario("texture.load_r250_cached", "texture")
+def load_r250_cached(repeats=10):
+    # Warm loads from a private cache, so the user's cache is left alone
+    directory = tempfile.mkdtemp()
+    try:
+        cache = TextureCache(directory)
+        return time_calls(lambda: load_earth_texture(250, TEXTURE_PATH, cache=cache), repeats)
+    finally:
+        shutil.rmtree(directory)
+
+
+@scenario("texture.mask_r1000", "texture")
+def mask_r1000(repeats=10):
+    return time_calls(lambda: build_circular_mask(1000), repeats)
+
+
+@scenario("texture.crop_r1000", "texture")
+def crop_r1000(repeats=10):
+    scaled_img = pygame.transform.scale(pygame.image.load(TEXTURE_PATH), (2000, 2000))
+    return time_calls(lambda: crop_to_disc(scaled_img, 1000), repeats)
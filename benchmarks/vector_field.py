@@ -0,0 +1,42 @@
+import pygame
+import numpy as np
+
+from benchmarks.harness import scenario, time_calls
+from VectorField import VectorFieldLayer, arrow_geometry, field_vectors
+
+SIZE = (1000, 800)
+CENTER = (SIZE[0] // 2, SIZE[1] // 2)
+
+# (points per ring, rings) from the interactive default up to a dense field
+DENSITIES = ((72, 3), (360, 10), (1000, 10), (2500, 20))
+
+
+def _compute(n_angles, n_rings):
+    positions, velocities, accelerations = field_vectors(CENTER, 300, n_angles, np.linspace(0.25, 1.75, n_rings))
+    arrow_geometry(positions, velocities, 100.0, 12)
+    arrow_geometry(positions, accelerations, 200.0, 12)
+
+
+def _register(n_angles, n_rings):
+    arrows = 2 * n_angles * n_rings
+
+    @scenario(f"vector_field.compute_{arrows}", "vector_field")
+    def compute(repeats=20):
+        return time_calls(lambda: _compute(n_angles, n_rings), repeats)
+
+    @scenario(f"vector_field.rebuild_{arrows}", "vector_field")
+    def rebuild(repeats=10):
+        # A changed geometry forces the layer to be drawn again
+        screen = pygame.Surface(SIZE)
+        layer = VectorFieldLayer(n_angles, np.linspace(0.25, 1.75, n_rings))
+        return time_calls(lambda: layer.draw(screen, CENTER, 1.0, 300, 0.5, 12), repeats, setup=layer.invalidate)
+
+    @scenario(f"vector_field.frame_{arrows}", "vector_field", "frame")
+    def frame(repeats=60):
+        screen = pygame.Surface(SIZE)
+        layer = VectorFieldLayer(n_angles, np.linspace(0.25, 1.75, n_rings))
+        return time_calls(lambda: layer.draw(screen, CENTER, 1.0, 300, 0.5, 12), repeats)
+
+
+for density in DENSITIES:
+    _register(*density)